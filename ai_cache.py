@@ -0,0 +1,105 @@
+import hashlib
+import os
+import threading
+import time
+
+import metrics
+from database import get_connection
+
+# Entries older than this are treated as misses and removed
+CACHE_TTL_SECONDS = int(os.getenv("AI_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Least recently used entries are evicted beyond this many rows
+CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "2000"))
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+EVENTS = metrics.counter("todo_ai_cache_events_total", "AI response cache hits, misses, stores and evictions", ("event",))
+
+def cache_key(model_name, prompt):
+    """Return the content address for a model + prompt pair"""
+    return hashlib.sha256(f"{model_name}\n{prompt}".encode("utf-8")).hexdigest()
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+    EVENTS.inc(name, amount=amount)
+
+def get_cached_response(model_name, prompt):
+    """
+    Look up a cached AI response
+    
+    Args:
+        model_name: Name of the model that produced the response
+        prompt: The exact prompt sent to the model
+    
+    Returns:
+        The cached response text, or None on a miss or expired entry
+    """
+    conn = get_connection()
+    key = cache_key(model_name, prompt)
+    now = time.time()
+    
+    row = conn.execute(
+        "SELECT response, created_at FROM ai_cache WHERE cache_key = ?", (key,)
+    ).fetchone()
+    
+    if row is None:
+        _count("misses")
+        return None
+    
+    response, created_at = row
+    with conn:
+        if now - created_at > CACHE_TTL_SECONDS:
+            conn.execute("DELETE FROM ai_cache WHERE cache_key = ?", (key,))
+            _count("misses")
+            return None
+        conn.execute("UPDATE ai_cache SET last_used_at = ? WHERE cache_key = ?", (now, key))
+    
+    _count("hits")
+    return response
+
+def store_response(model_name, prompt, response):
+    """Store an AI response and evict least recently used entries beyond CACHE_MAX_ENTRIES"""
+    conn = get_connection()
+    now = time.time()
+    
+    with conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO ai_cache (cache_key, model, response, created_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (cache_key(model_name, prompt), model_name, response, now, now))
+        
+        overflow = conn.execute("SELECT COUNT(*) FROM ai_cache").fetchone()[0] - CACHE_MAX_ENTRIES
+        if overflow > 0:
+            conn.execute("""
+                DELETE FROM ai_cache WHERE cache_key IN (
+                    SELECT cache_key FROM ai_cache ORDER BY last_used_at ASC LIMIT ?
+                )
+            """, (overflow,))
+            _count("evictions", overflow)
+    
+    _count("stores")
+
+def clear_cache():
+    """Remove every cached AI response"""
+    conn = get_connection()
+    
+    with conn:
+        conn.execute("DELETE FROM ai_cache")
+
+def cache_stats():
+    """
+    Return cache counters for this process plus the current number of stored entries
+    
+    Returns:
+        A dict with hits, misses, stores, evictions, entries and hit_rate
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    
+    stats["entries"] = get_connection().execute("SELECT COUNT(*) FROM ai_cache").fetchone()[0]
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
@@ -1,6 +1,13 @@
+import json
 import os
+import re
+import threading
+import time
+from typing import NamedTuple
 from dotenv import load_dotenv
-import google.generativeai as genai
+import metrics
+from ai_cache import get_cached_response, store_response
+from llm_client import LLMClient, LLMError, LLMNotConfiguredError, LLMResponseError
 
 # Load environment variables
 load_dotenv()
@@ -8,71 +15,211 @@ load_dotenv()
 # Configure Gemini API
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
+# Use the gemini-flash-lite-latest model as requested
+MODEL_NAME = 'gemini-flash-lite-latest'
+
+# Tasks packed into one request by the batch generators
+DEFAULT_BATCH_SIZE = 10
+
+if not GEMINI_API_KEY:
     print("Warning: GEMINI_API_KEY not found in environment variables")
 
-def generate_task_breakdown(task_title, task_description):
+_model = None
+_model_lock = threading.Lock()
+
+_client = None
+
+GENERATE_SECONDS = metrics.histogram(
+    "todo_llm_generate_seconds", "Time to produce AI output by generator, cache hits included", ("generator",)
+)
+TOKENS = metrics.counter("todo_llm_tokens_total", "Gemini tokens by generator and direction", ("generator", "kind"))
+BATCH_FALLBACKS = metrics.counter(
+    "todo_llm_batch_fallbacks_total", "Batch items regenerated with a single request", ("generator",)
+)
+
+class BatchStats(NamedTuple):
+    """Cost of one batched model request"""
+    size: int
+    cached: int
+    fallbacks: int
+    prompt_tokens: int
+    response_tokens: int
+    latency_seconds: float
+
+def get_model():
     """
-    Generate a detailed breakdown of a complex task using Gemini AI
+    Return the shared model client, created on first use
     
-    Args:
-        task_title: The title of the task
-        task_description: Detailed description of the task
+    The Gemini SDK (with its gRPC and protobuf stack) is imported and configured
+    here rather than at module import, so code that never calls the model does
+    not pay the most of a second that importing it takes.
+    """
+    global _model
     
-    Returns:
-        A formatted string with task breakdown
+    with _model_lock:
+        if _model is None:
+            import google.generativeai as genai
+            
+            genai.configure(api_key=GEMINI_API_KEY)
+            _model = genai.GenerativeModel(MODEL_NAME)
+        return _model
+
+def set_model(model):
     """
-    if not GEMINI_API_KEY:
-        return "❌ Error: GEMINI_API_KEY not configured. Please add it to your .env file."
+    Replace the shared model client, e.g. with a local fake for tests and benchmarks
     
-    try:
-        # Use the gemini-flash-lite-latest model as requested
-        model = genai.GenerativeModel('gemini-flash-lite-latest')
-        
-        prompt = f"""You are a productivity expert. Break down the following task into clear, actionable subtasks.
+    The replacement only needs a generate_content(prompt) method returning an
+    object with a .text attribute. Pass None to go back to Gemini.
+    """
+    global _model
+    
+    with _model_lock:
+        _model = model
 
-Task Title: {task_title}
-Task Description: {task_description}
+def get_client():
+    """Return the shared LLMClient that every Gemini request goes through"""
+    global _client
+    
+    with _model_lock:
+        if _client is None:
+            _client = LLMClient(get_model)
+        return _client
 
-Please provide:
-1. A brief analysis of the task
-2. 5-8 specific, actionable subtasks (numbered)
-3. Estimated time for each subtask
-4. Any dependencies between subtasks
-5. Tips for successful completion
+def set_client(client):
+    """Replace the shared LLMClient, e.g. with one using shorter timeouts; None restores the default"""
+    global _client
+    
+    with _model_lock:
+        _client = client
 
-Format your response in a clear, organized markdown format."""
-        
-        response = model.generate_content(prompt)
-        
-        return response.text
+metrics.gauge("todo_llm_circuit_open", "1 while the LLM circuit breaker is refusing requests",
+              lambda: int(get_client().circuit.state == "open"))
+
+def _require_configured():
+    if not (GEMINI_API_KEY or _model is not None):
+        raise LLMNotConfiguredError("GEMINI_API_KEY not configured. Please add it to your .env file.")
+
+def _count_tokens(generator, prompt_tokens, response_tokens):
+    TOKENS.inc(generator, "prompt", amount=prompt_tokens)
+    TOKENS.inc(generator, "response", amount=response_tokens)
+
+def _generate(prompt, generator):
+    """
+    Return the model's response text for a prompt, serving repeats from the response cache
     
-    except Exception as e:
-        return f"❌ Error generating task breakdown: {str(e)}\n\nPlease check your API key and internet connection."
+    Only successful responses are cached, so errors are retried on the next call.
+    
+    Raises:
+        LLMError: If the model could not produce a response
+    """
+    cached = get_cached_response(MODEL_NAME, prompt)
+    if cached is not None:
+        return cached
+    
+    _require_configured()
+    response = get_client().generate(prompt)
+    _count_tokens(generator, *_token_counts(response, prompt))
+    
+    store_response(MODEL_NAME, prompt, response.text)
+    return response.text
 
-def generate_reminder_email(task_title, task_description, deadline, priority):
+def _token_counts(response, prompt):
+    """Prompt and response token counts, estimated at ~4 characters per token if not reported"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        return usage.prompt_token_count, usage.candidates_token_count
+    return len(prompt) // 4, len(response.text) // 4
+
+def _parse_json_array(text):
+    """Parse a JSON array from a model response, tolerating markdown code fences"""
+    text = re.sub(r"^\s*```(?:json)?\s*|\s*```\s*$", "", text.strip())
+    items = json.loads(text)
+    if not isinstance(items, list):
+        raise ValueError("expected a JSON array")
+    return items
+
+def _generate_batch(items, single_prompt, batch_prompt, field, fallback, generator):
     """
-    Generate a personalized reminder email using Gemini AI
+    Generate one output per item with a single structured request
     
-    Args:
-        task_title: The title of the task
-        task_description: Description of the task
-        deadline: Deadline date string
-        priority: Priority level (Low/Medium/High)
+    Items already in the response cache (under their single-item prompt) are not
+    sent; fresh results are cached under that same prompt, so later single calls
+    hit the cache too. Items missing or invalid in the batch response, or all of
+    them if the model rejects the request or returns something unparseable, fall
+    back to an individual call. Any other model error fails every pending item.
     
     Returns:
-        A formatted email message
+        (outputs in input order, BatchStats); an item that could not be generated
+        holds the LLMError raised for it instead of text
     """
-    if not GEMINI_API_KEY:
-        return "Error: GEMINI_API_KEY not configured. Please add it to your .env file."
+    outputs = [None] * len(items)
+    prompts = [single_prompt(*item) for item in items]
     
-    try:
-        # Use the gemini-flash-lite-latest model as requested
-        model = genai.GenerativeModel('gemini-flash-lite-latest')
-        
-        prompt = f"""Generate a friendly but professional email reminder for the following task:
+    pending = []
+    for index, prompt in enumerate(prompts):
+        cached = get_cached_response(MODEL_NAME, prompt)
+        if cached is None:
+            pending.append(index)
+        else:
+            outputs[index] = cached
+    
+    prompt_tokens = response_tokens = 0
+    start = time.perf_counter()
+    if pending:
+        request = batch_prompt([(index, items[index]) for index in pending])
+        try:
+            _require_configured()
+            response = get_client().generate(request)
+            prompt_tokens, response_tokens = _token_counts(response, request)
+            _count_tokens(generator, prompt_tokens, response_tokens)
+            requested = set(pending)
+            for entry in _parse_json_array(response.text):
+                if not isinstance(entry, dict):
+                    continue
+                index, value = entry.get("id"), entry.get(field)
+                if index in requested and outputs[index] is None and isinstance(value, str) and value.strip():
+                    outputs[index] = value.strip()
+                    store_response(MODEL_NAME, prompts[index], outputs[index])
+        except (LLMResponseError, ValueError):
+            # The model rejected or garbled the batch; each item may still work on its own
+            pass
+        except LLMError as e:
+            # Timeouts, rate limits, outages and an open circuit would fail single
+            # requests the same way, and sending them would only add to the load
+            for index in pending:
+                outputs[index] = e
+    latency = time.perf_counter() - start
+    
+    fallbacks = 0
+    for index in pending:
+        if outputs[index] is None:
+            try:
+                outputs[index] = fallback(*items[index])
+            except LLMError as e:
+                outputs[index] = e
+            fallbacks += 1
+    BATCH_FALLBACKS.inc(generator, amount=fallbacks)
+    
+    stats = BatchStats(len(items), len(items) - len(pending), fallbacks, prompt_tokens, response_tokens, latency)
+    return outputs, stats
+
+def _breakdown_prompt(task_title, task_description):
+    return f"""You are a productivity expert. Break down the following task into clear, actionable subtasks.
+
+Task Title: {task_title}
+Task Description: {task_description}
+
+Please provide:
+1. A brief analysis of the task
+2. 5-8 specific, actionable subtasks as a numbered list, one subtask per line, each written as:
+   N. **Subtask title** - Estimated time: X hours (depends on: M, K)
+   using "(depends on: none)" for subtasks that can start right away
+3. Tips for successful completion
+
+Format your response in a clear, organized markdown format."""
+
+def _reminder_prompt(task_title, task_description, deadline, priority):
+    return f"""Generate a friendly but professional email reminder for the following task:
 
 Task: {task_title}
 Description: {task_description}
@@ -89,14 +236,171 @@ The email should:
 7. It should end with Kumar Arpit
 
 Write the email in a warm, encouraging tone."""
-        
-        response = model.generate_content(prompt)
-        
-        return response.text
+
+def _batch_reminder_prompt(indexed_tasks):
+    tasks_json = json.dumps([
+        {"id": index, "task": title, "description": description, "deadline": deadline, "priority": priority}
+        for index, (title, description, deadline, priority) in indexed_tasks
+    ], ensure_ascii=False, indent=1)
+    
+    return f"""Generate a friendly but professional email reminder for each of the following tasks.
+
+Each email should:
+1. Start with a friendly greeting
+2. Remind about the task and its importance
+3. Mention the deadline and urgency based on its priority
+4. Provide a brief motivational message
+5. End with an encouraging note
+6. Keep it concise (max 150 words)
+7. It should end with Kumar Arpit
+
+Write each email in a warm, encouraging tone.
+
+Respond with only a JSON array containing one object per task, in the form
+{{"id": <task id>, "email": "<email text>"}}, and nothing else.
+
+Tasks:
+{tasks_json}"""
+
+def _batch_breakdown_prompt(indexed_tasks):
+    tasks_json = json.dumps([
+        {"id": index, "title": title, "description": description}
+        for index, (title, description) in indexed_tasks
+    ], ensure_ascii=False, indent=1)
     
-    except Exception as e:
-        return f"Error generating email: {str(e)}"
+    return f"""You are a productivity expert. Break down each of the following tasks into clear, actionable subtasks.
+
+For each task, provide:
+1. A brief analysis of the task
+2. 5-8 specific, actionable subtasks as a numbered list, one subtask per line, each written as:
+   N. **Subtask title** - Estimated time: X hours (depends on: M, K)
+   using "(depends on: none)" for subtasks that can start right away
+3. Tips for successful completion
+
+Format each breakdown in a clear, organized markdown format.
+
+Respond with only a JSON array containing one object per task, in the form
+{{"id": <task id>, "breakdown": "<markdown breakdown>"}}, and nothing else.
+
+Tasks:
+{tasks_json}"""
 
+def _suggestions_prompt(completed_tasks_list):
+    tasks_text = "\n".join([f"- {task}" for task in completed_tasks_list])
+    
+    return f"""Based on these completed tasks:
+
+{tasks_text}
+
+Suggest 3-5 logical next tasks or related tasks that would be good to tackle next. 
+Consider natural progressions, related skills, and complementary activities.
+
+Return only the task titles as a simple bullet list."""
+
+@metrics.timed(GENERATE_SECONDS)
+def generate_task_breakdown(task_title, task_description):
+    """
+    Generate a detailed breakdown of a complex task using Gemini AI
+    
+    Args:
+        task_title: The title of the task
+        task_description: Detailed description of the task
+    
+    Returns:
+        A formatted string with task breakdown
+    
+    Raises:
+        LLMError: If the breakdown could not be generated
+    """
+    return _generate(_breakdown_prompt(task_title, task_description), "generate_task_breakdown")
+
+@metrics.timed(GENERATE_SECONDS)
+def generate_reminder_email(task_title, task_description, deadline, priority):
+    """
+    Generate a personalized reminder email using Gemini AI
+    
+    Args:
+        task_title: The title of the task
+        task_description: Description of the task
+        deadline: Deadline date string
+        priority: Priority level (Low/Medium/High)
+    
+    Returns:
+        A formatted email message
+    
+    Raises:
+        LLMError: If the email could not be generated
+    """
+    return _generate(_reminder_prompt(task_title, task_description, deadline, priority), "generate_reminder_email")
+
+@metrics.timed(GENERATE_SECONDS)
+def stream_task_breakdown(task_title, task_description):
+    """
+    Generate a task breakdown, yielding text chunks as Gemini produces them
+    
+    A breakdown already in the response cache is yielded in one piece; a
+    completed stream is stored in the cache so the next request replays instantly.
+    
+    Args:
+        task_title: The title of the task
+        task_description: Detailed description of the task
+    
+    Yields:
+        Markdown text chunks of the breakdown
+    
+    Raises:
+        LLMError: If the breakdown could not be generated or the stream broke off
+    """
+    prompt = _breakdown_prompt(task_title, task_description)
+    cached = get_cached_response(MODEL_NAME, prompt)
+    if cached is not None:
+        yield cached
+        return
+    
+    _require_configured()
+    chunks = []
+    for text in get_client().stream(prompt):
+        chunks.append(text)
+        yield text
+    
+    # Only complete responses are cached; streams report no usage, so tokens are estimated
+    text = "".join(chunks)
+    _count_tokens("stream_task_breakdown", len(prompt) // 4, len(text) // 4)
+    store_response(MODEL_NAME, prompt, text)
+
+@metrics.timed(GENERATE_SECONDS)
+def generate_task_breakdowns_batch(tasks):
+    """
+    Generate breakdowns for several tasks with one Gemini request
+    
+    Args:
+        tasks: List of (task_title, task_description) tuples
+    
+    Returns:
+        (breakdowns in the same order as tasks, BatchStats); failed items hold an LLMError
+    """
+    return _generate_batch(
+        tasks, _breakdown_prompt, _batch_breakdown_prompt, "breakdown", generate_task_breakdown,
+        "generate_task_breakdowns_batch"
+    )
+
+@metrics.timed(GENERATE_SECONDS)
+def generate_reminder_emails_batch(tasks):
+    """
+    Generate reminder emails for several tasks with one Gemini request
+    
+    Args:
+        tasks: List of (task_title, task_description, deadline, priority) tuples
+    
+    Returns:
+        (emails in the same order as tasks, BatchStats); failed items hold an LLMError
+    """
+    return _generate_batch(
+        tasks, _reminder_prompt, _batch_reminder_prompt, "email", generate_reminder_email,
+        "generate_reminder_emails_batch"
+    )
+
+@metrics.timed(GENERATE_SECONDS)
 def generate_task_suggestions(completed_tasks_list):
     """
     Generate suggestions for new tasks based on completed tasks
@@ -106,30 +410,13 @@ def generate_task_suggestions(completed_tasks_list):
     
     Returns:
         A list of suggested tasks
+    
+    Raises:
+        LLMError: If the suggestions could not be generated
     """
-    if not GEMINI_API_KEY:
-        return ["Error: GEMINI_API_KEY not configured"]
+    text = _generate(_suggestions_prompt(completed_tasks_list), "generate_task_suggestions")
     
-    try:
-        model = genai.GenerativeModel('gemini-flash-lite-latest')
-        
-        tasks_text = "\n".join([f"- {task}" for task in completed_tasks_list])
-        
-        prompt = f"""Based on these completed tasks:
-
-{tasks_text}
-
-Suggest 3-5 logical next tasks or related tasks that would be good to tackle next. 
-Consider natural progressions, related skills, and complementary activities.
-
-Return only the task titles as a simple bullet list."""
-        
-        response = model.generate_content(prompt)
-        
-        # Parse response into list
-        suggestions = [line.strip('- ').strip() for line in response.text.split('\n') if line.strip()]
-        
-        return suggestions[:5]  # Limit to 5 suggestions
-    
-    except Exception as e:
-        return [f"Error generating suggestions: {str(e)}"]
+    # Parse response into list
+    suggestions = [line.strip('- ').strip() for line in text.split('\n') if line.strip()]
+    
+    return suggestions[:5]  # Limit to 5 suggestions
@@ -0,0 +1,245 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Literal, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+
+import metrics
+from ai_features import generate_task_breakdown
+from breakdown import critical_path, parse_breakdown, topological_order
+from database import (init_db, add_task, get_tasks_page, get_task_by_id, search_tasks,
+                      update_task_status_many, delete_tasks, get_subtasks, save_subtasks, get_outbox_entry_status)
+from llm_client import LLMError, LLMRateLimitError, LLMResponseError, LLMTimeoutError
+from reminder_outbox import enqueue_task_reminder, start_worker
+from similarity import similar_tasks
+
+# Worker threads for blocking calls; each pool bounds how many requests of that kind run at once.
+# Every database thread keeps its own pooled SQLite connection, so reads run in parallel under WAL.
+# Reminder emails are sent by the outbox worker thread, not from a request.
+API_DB_THREADS = int(os.getenv("API_DB_THREADS", "8"))
+API_LLM_THREADS = int(os.getenv("API_LLM_THREADS", "4"))
+
+_db_pool = ThreadPoolExecutor(max_workers=API_DB_THREADS, thread_name_prefix="api-db")
+_llm_pool = ThreadPoolExecutor(max_workers=API_LLM_THREADS, thread_name_prefix="api-llm")
+
+REQUEST_SECONDS = metrics.histogram("todo_api_request_seconds", "HTTP API latency by route and method",
+                                    ("route", "method"))
+RESPONSES = metrics.counter("todo_api_responses_total", "HTTP API responses by route and status", ("route", "status"))
+
+# HTTP status for each kind of model failure; anything else means the AI service is unavailable
+_LLM_ERROR_STATUS = ((LLMRateLimitError, 429), (LLMTimeoutError, 504), (LLMResponseError, 502))
+
+Status = Literal["All", "Pending", "Completed"]
+Urgency = Literal["Overdue", "Due today", "Due soon"]
+SortBy = Literal["Deadline", "Priority", "Date Added"]
+
+class TaskCreate(BaseModel):
+    title: str = Field(min_length=1)
+    description: str = Field(min_length=1)
+    deadline: date
+    priority: Literal["Low", "Medium", "High"]
+    email: str = Field(min_length=3)
+
+class TaskStatusUpdate(BaseModel):
+    status: Literal["Pending", "Completed"]
+
+@asynccontextmanager
+async def lifespan(_app):
+    init_db()
+    start_worker()
+    yield
+
+app = FastAPI(title="AI-Powered Todo API", lifespan=lifespan)
+
+async def _run(pool, func, *args):
+    """Run a blocking call on a worker pool without blocking the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+
+def _task_json(task):
+    return {
+        "id": task.id, "title": task.title, "description": task.description, "deadline": task.deadline,
+        "priority": task.priority, "status": task.status, "email": task.email, "created_at": task.created_at,
+        "days_left": task.days_left, "urgency": task.urgency,
+    }
+
+def _subtasks_json(subtasks):
+    path, path_minutes = critical_path(subtasks)
+    return {
+        "subtasks": [subtask._asdict() for subtask in subtasks],
+        "order": [subtask.position for subtask in topological_order(subtasks)],
+        "critical_path": {"positions": [subtask.position for subtask in path], "minutes": path_minutes},
+    }
+
+def _encode_cursor(cursor):
+    if cursor is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode("utf-8")).decode("ascii")
+
+def _decode_cursor(cursor):
+    if cursor is None:
+        return None
+    try:
+        key, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # The sort key is a deadline/created_at string, a priority rank or NULL; bool is not an id
+    if not isinstance(key, (str, int, type(None))) or not isinstance(task_id, int) or isinstance(task_id, bool):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key, task_id
+
+def _json_body(payload):
+    """Serialize a payload, returning (body, etag); the ETag is a hash of the exact bytes"""
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+def _conditional_response(request, body, etag):
+    """
+    Answer a GET with 304 Not Modified if the client already has this representation
+    
+    The database is still read to compute the ETag, but an unchanged response
+    costs no transfer and no parsing on the client.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")) or if_none_match == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def _get_task_or_404(task_id):
+    task = await _run(_db_pool, get_task_by_id, task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    return task
+
+@app.middleware("http")
+async def record_metrics(request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template (/tasks/{task_id}), not by path, to keep the series bounded
+    route = request.scope.get("route")
+    route = route.path if route is not None else "unmatched"
+    REQUEST_SECONDS.observe(time.perf_counter() - start, route, request.method)
+    RESPONSES.inc(route, str(response.status_code))
+    return response
+
+@app.exception_handler(LLMError)
+async def llm_error_handler(_request, error):
+    status = next((code for kind, code in _LLM_ERROR_STATUS if isinstance(error, kind)), 503)
+    return JSONResponse(status_code=status, content={"detail": str(error), "error": type(error).__name__})
+
+def _list_body(status, sort, page_size, cursor, urgency):
+    tasks, next_cursor = get_tasks_page(status, sort, page_size, cursor, urgency)
+    return _json_body({"tasks": [_task_json(task) for task in tasks], "next_cursor": _encode_cursor(next_cursor)})
+
+@app.get("/tasks")
+async def list_tasks(request: Request, status: Status = "All", urgency: Optional[Urgency] = None,
+                     sort: SortBy = "Deadline", page_size: int = Query(25, ge=1, le=100),
+                     cursor: Optional[str] = None):
+    """One page of tasks; pass next_cursor back as cursor for the following page"""
+    body, etag = await _run(_db_pool, _list_body, status, sort, page_size, _decode_cursor(cursor), urgency)
+    return _conditional_response(request, body, etag)
+
+def _search_body(q, status, limit, urgency):
+    results = search_tasks(q, status, limit, urgency)
+    return _json_body({"results": [dict(_task_json(task), snippet=snippet) for task, snippet in results]})
+
+@app.get("/tasks/search")
+async def search(request: Request, q: str = Query(min_length=1), status: Status = "All",
+                 urgency: Optional[Urgency] = None, limit: int = Query(20, ge=1, le=100)):
+    """Full-text search over titles and descriptions, best match first"""
+    body, etag = await _run(_db_pool, _search_body, q, status, limit, urgency)
+    return _conditional_response(request, body, etag)
+
+@app.get("/tasks/{task_id}")
+async def get_task(request: Request, task_id: int):
+    task = await _get_task_or_404(task_id)
+    return _conditional_response(request, *_json_body(_task_json(task)))
+
+@app.post("/tasks", status_code=201)
+async def create_task(task: TaskCreate):
+    task_id = await _run(_db_pool, add_task, task.title, task.description, task.deadline.isoformat(),
+                         task.priority, task.email)
+    return _task_json(await _run(_db_pool, get_task_by_id, task_id))
+
+@app.patch("/tasks/{task_id}")
+async def update_task(task_id: int, update: TaskStatusUpdate):
+    if not await _run(_db_pool, update_task_status_many, [task_id], update.status):
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    return _task_json(await _get_task_or_404(task_id))
+
+@app.delete("/tasks/{task_id}", status_code=204)
+async def delete_task(task_id: int):
+    if not await _run(_db_pool, delete_tasks, [task_id]):
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    return Response(status_code=204)
+
+@app.get("/tasks/{task_id}/subtasks")
+async def list_subtasks(request: Request, task_id: int):
+    """The task's stored subtasks, their dependency order and critical path"""
+    await _get_task_or_404(task_id)
+    subtasks = await _run(_db_pool, get_subtasks, task_id)
+    return _conditional_response(request, *_json_body(dict(_subtasks_json(subtasks), task_id=task_id)))
+
+def _similar_body(task, status, limit):
+    results = similar_tasks(task, limit, status)
+    return _json_body({"task_id": task.id,
+                       "results": [dict(_task_json(match), score=round(score, 4)) for match, score in results]})
+
+@app.get("/tasks/{task_id}/similar")
+async def list_similar(request: Request, task_id: int, status: Status = "All",
+                       limit: int = Query(5, ge=1, le=50)):
+    """Tasks with the most similar title and description, from the local TF-IDF index (no LLM call)"""
+    task = await _get_task_or_404(task_id)
+    body, etag = await _run(_db_pool, _similar_body, task, status, limit)
+    return _conditional_response(request, body, etag)
+
+@app.post("/tasks/{task_id}/breakdown")
+async def breakdown(task_id: int):
+    """Generate (or replay from the AI cache) a breakdown of the task and store its subtasks"""
+    task = await _get_task_or_404(task_id)
+    text = await _run(_llm_pool, generate_task_breakdown, task.title, task.description)
+    subtasks = parse_breakdown(text)
+    if subtasks:
+        await _run(_db_pool, save_subtasks, task_id, subtasks)
+    return dict(_subtasks_json(subtasks), task_id=task_id, breakdown=text)
+
+@app.post("/tasks/{task_id}/reminder", status_code=202)
+async def send_reminder(task_id: int):
+    """
+    Queue a reminder email for the task, sent in the background by the outbox worker
+    
+    Only one reminder per task per day is sent; repeating the request returns
+    the entry queued first, with its current status.
+    """
+    task = await _get_task_or_404(task_id)
+    entry_id, created = await _run(_db_pool, enqueue_task_reminder, task)
+    status, attempts, last_error = await _run(_db_pool, get_outbox_entry_status, entry_id)
+    return {"task_id": task_id, "recipient": task.email, "reminder_id": entry_id, "queued": created,
+            "status": status, "attempts": attempts, "last_error": last_error}
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the todo app's tasks over a JSON HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+    
+    uvicorn.run(app, host=args.host, port=args.port)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
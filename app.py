@@ -1,10 +1,37 @@
 import streamlit as st
 import sqlite3
 from datetime import datetime, timedelta
+import io
 import os
-from email_sender import send_reminder_email
-from ai_features import generate_task_breakdown, generate_reminder_email
-from database import init_db, add_task, get_all_tasks, update_task_status, delete_task, get_task_by_id
+import statistics
+import time
+import metrics
+from ai_cache import cache_stats
+from llm_client import LLMError, LLMNotConfiguredError
+from task_io import FORMATS, export_tasks_bytes, format_for_filename, import_tasks
+from breakdown import critical_path, format_minutes, parse_breakdown, topological_order
+from reminder_outbox import enqueue_task_reminder, start_worker
+from similarity import similar_tasks, suggestion_context
+from database import URGENCY_DAY_RANGES, init_db, add_task, get_tasks_page, count_tasks, search_tasks, update_task_status, update_task_status_many, delete_task, delete_tasks, get_task_by_id, get_task_ids, get_write_version, get_subtasks, save_subtasks, set_subtask_completed, get_outbox_entry_status, count_outbox, get_priority_stats, get_weekly_throughput
+
+# Rerun timing shown in the footer
+run_started = time.perf_counter()
+
+# How long a cached read may be reused; writes from this process invalidate it at once,
+# so this only bounds how stale changes from other processes (scheduler, imports) can be
+READ_CACHE_TTL_SECONDS = 10
+
+RERUN_SECONDS = metrics.histogram("todo_app_rerun_seconds", "Time to run app.py once")
+
+# Weeks of created/completed history shown in the Analytics tab
+ANALYTICS_WEEKS = 12
+
+# Similar tasks listed under a task card when its "Similar tasks" toggle is on
+SIMILAR_TASKS_SHOWN = 5
+
+# Badges for the urgency bucket and priority of each task card
+URGENCY_COLORS = {"Overdue": "🔴", "Due today": "🟠", "Due soon": "🟡", "Upcoming": "🟢"}
+PRIORITY_EMOJI = {"Low": "🟦", "Medium": "🟧", "High": "🟥"}
 
 # Page configuration
 st.set_page_config(
@@ -13,8 +40,56 @@ st.set_page_config(
     layout="wide"
 )
 
+@st.cache_resource
+def initialize_database():
+    """Apply schema migrations once per server process instead of on every rerun"""
+    init_db()
+
+# Cached reads are keyed on the database write version, so they re-run only after a write
+@st.cache_data(ttl=READ_CACHE_TTL_SECONDS, max_entries=256, show_spinner=False)
+def load_tasks_page(filter_status, sort_by, page_size, cursor, urgency, write_version):
+    return get_tasks_page(filter_status, sort_by, page_size, cursor, urgency)
+
+@st.cache_data(ttl=READ_CACHE_TTL_SECONDS, max_entries=64, show_spinner=False)
+def load_task_count(filter_status, urgency, write_version):
+    return count_tasks(filter_status, urgency)
+
+@st.cache_data(ttl=READ_CACHE_TTL_SECONDS, max_entries=256, show_spinner=False)
+def load_search_results(query, filter_status, limit, urgency, write_version):
+    return search_tasks(query, filter_status, limit=limit, urgency=urgency)
+
+@st.cache_data(ttl=READ_CACHE_TTL_SECONDS, max_entries=16, show_spinner=False)
+def load_analytics(weeks, today, write_version):
+    return get_priority_stats(today), get_weekly_throughput(weeks, today)
+
+@st.cache_resource
+def start_metrics_endpoint():
+    """Serve Prometheus metrics on METRICS_PORT, once per server process"""
+    return metrics.start_http_server()
+
+# The AI and email modules are imported on first use, so viewing the task list does not
+# wait for the Gemini SDK and SMTP stack to load
+@st.cache_resource
+def load_ai_features():
+    """Import and return ai_features, once per server process"""
+    import ai_features
+    return ai_features
+
+@st.cache_resource
+def load_email_sender():
+    """Import and return email_sender, once per server process"""
+    import email_sender
+    return email_sender
+
+@st.cache_resource
+def start_reminder_worker():
+    """Send queued reminder emails on a background thread, once per server process"""
+    return start_worker()
+
 # Initialize database
-init_db()
+initialize_database()
+start_metrics_endpoint()
+start_reminder_worker()
 
 # Custom CSS for better UI
 st.markdown("""
@@ -68,117 +143,321 @@ with st.sidebar:
                 st.rerun()
             else:
                 st.error("Please fill in all required fields!")
+    
+    st.header("📦 Import / Export")
+    
+    uploaded_file = st.file_uploader("Import tasks", type=["csv", "jsonl", "ndjson"])
+    if uploaded_file is not None and st.button("Import"):
+        with st.spinner("Importing tasks..."):
+            # Rows are parsed and inserted as they are read from the upload
+            stream = io.TextIOWrapper(uploaded_file, encoding="utf-8-sig", newline="")
+            report = import_tasks(stream, format_for_filename(uploaded_file.name))
+        st.success(f"Imported {report.imported} tasks in {report.seconds:.1f}s")
+        if report.rejected:
+            st.warning(f"{report.rejected} rows were skipped:\n\n" + "\n\n".join(report.errors))
+    
+    export_format = st.selectbox("Export format", FORMATS)
+    if st.button("Prepare export"):
+        st.download_button(
+            "Download tasks",
+            data=export_tasks_bytes(export_format),
+            file_name=f"tasks.{export_format}",
+            mime="text/csv" if export_format == "csv" else "application/x-ndjson"
+        )
+
+# Widget callbacks run before the next script run, so each action costs a single rerun
+def toggle_task_status(task_id):
+    completed = st.session_state[f"task_{task_id}"]
+    update_task_status(task_id, "Completed" if completed else "Pending")
+
+def toggle_subtask(task_id, position):
+    set_subtask_completed(task_id, position, st.session_state[f"subtask_{task_id}_{position}"])
+
+def delete_task_and_notify(task_id):
+    delete_task(task_id)
+    st.toast("Task deleted!")
+
+def queue_reminder(task):
+    """Queue a reminder email for the task; repeated clicks on the same day do not send another"""
+    entry_id, created = enqueue_task_reminder(task)
+    if created:
+        st.toast("Reminder queued, it will be sent in the background")
+        return
+    status, _, last_error = get_outbox_entry_status(entry_id)
+    if status == "sent":
+        st.toast("A reminder for this task was already sent today")
+    elif status == "failed":
+        st.toast(f"Today's reminder could not be sent: {last_error}")
+    else:
+        st.toast("A reminder for this task is already queued")
+
+def apply_bulk_action(action, task_ids, filter_status, urgency=None):
+    """Apply a bulk action to the selected tasks, or to every task matching the filters"""
+    if task_ids is None:
+        task_ids = get_task_ids(filter_status, urgency)
+    if action == "Delete":
+        count = delete_tasks(task_ids)
+    else:
+        count = update_task_status_many(task_ids, action)
+    st.session_state["bulk_selection"] = []
+    st.session_state["bulk_select_all"] = False
+    st.toast(f"Deleted {count} tasks" if action == "Delete" else f"Marked {count} tasks as {action}")
+
+def render_bulk_actions(tasks, filter_status, total_tasks=None, urgency=None):
+    """Render the multi-select and buttons that act on many tasks at once"""
+    with st.expander("☑️ Bulk actions"):
+        titles = {task.id: task.title for task in tasks}
+        matching = f"{filter_status}, {urgency}" if urgency else filter_status
+        select_all = total_tasks is not None and st.checkbox(
+            f"Select all {total_tasks} tasks matching \"{matching}\"", key="bulk_select_all"
+        )
+        if select_all:
+            task_ids = None
+            selected = total_tasks
+        else:
+            task_ids = st.multiselect("Tasks", list(titles), format_func=titles.get, key="bulk_selection")
+            selected = len(task_ids)
+        
+        for column, (label, action) in zip(st.columns(3), [("✅ Complete", "Completed"),
+                                                           ("↩️ Reopen", "Pending"),
+                                                           ("🗑️ Delete", "Delete")]):
+            with column:
+                st.button(f"{label} ({selected})", key=f"bulk_{action}", disabled=not selected,
+                          on_click=apply_bulk_action, args=(action, task_ids, filter_status, urgency))
+
+def render_subtasks(task_id, subtasks):
+    """Render a stored breakdown in dependency order, marking the critical path"""
+    path, path_minutes = critical_path(subtasks)
+    on_path = {subtask.position for subtask in path}
+    done = sum(subtask.completed for subtask in subtasks)
+    total_minutes = sum(subtask.estimate_minutes or 0 for subtask in subtasks)
+    st.caption(f"{done}/{len(subtasks)} done · {format_minutes(total_minutes)} of work · "
+               f"⭐ critical path {' → '.join(str(subtask.position) for subtask in path)} "
+               f"({format_minutes(path_minutes)})")
+    
+    for subtask in topological_order(subtasks):
+        details = [format_minutes(subtask.estimate_minutes)]
+        if subtask.depends_on:
+            details.append("after " + ", ".join(str(position) for position in subtask.depends_on))
+        st.checkbox(
+            f"{subtask.position}. {subtask.title}{' ⭐' if subtask.position in on_path else ''} · {' · '.join(details)}",
+            value=subtask.completed,
+            key=f"subtask_{task_id}_{subtask.position}",
+            on_change=toggle_subtask,
+            args=(task_id, subtask.position)
+        )
+
+def render_task_card(task, match_snippet=None):
+    """Render one task with its completion checkbox and action buttons"""
+    task_id, title, description, deadline, priority, status, email = task[:7]
+    
+    # Days left and the urgency bucket come precomputed with the task
+    if task.urgency == "Overdue":
+        urgency_text = f"Overdue by {-task.days_left} days"
+    elif task.urgency == "Due today":
+        urgency_text = "Due today!"
+    else:
+        urgency_text = f"Due in {task.days_left} days"
+    
+    # Task card
+    with st.container():
+        col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
+        
+        with col1:
+            st.checkbox(
+                f"**{title}**",
+                value=status == "Completed",
+                key=f"task_{task_id}",
+                on_change=toggle_task_status,
+                args=(task_id,)
+            )
+            
+            st.write(f"📝 {description}")
+            if match_snippet:
+                st.caption(f"🔎 {match_snippet}")
+            st.caption(f"📅 Deadline: {deadline} {URGENCY_COLORS[task.urgency]} {urgency_text}")
+            st.caption(f"{PRIORITY_EMOJI[priority]} Priority: {priority}")
+            st.caption(f"📧 Email: {email}")
+            
+            # Looked up in the local similarity index, so no API call is made
+            if st.toggle("Similar tasks", key=f"similar_{task_id}"):
+                matches = similar_tasks(task, SIMILAR_TASKS_SHOWN)
+                for match, score in matches:
+                    st.caption(f"{'✅' if match.status == 'Completed' else '⏳'} {match.title} · {score:.0%} match")
+                if not matches:
+                    st.caption("No similar tasks yet")
+        
+        with col2:
+            st.button("Delete", key=f"del_{task_id}", on_click=delete_task_and_notify, args=(task_id,))
+        
+        with col3:
+            st.button("Send Reminder", key=f"reminder_{task_id}", on_click=queue_reminder, args=(task,))
+        
+        with col4:
+            if st.button("Breakdown", key=f"breakdown_{task_id}"):
+                st.session_state[f'show_breakdown_{task_id}'] = True
+        
+        # Show breakdown if requested
+        if st.session_state.get(f'show_breakdown_{task_id}', False):
+            with st.expander("AI Task Breakdown", expanded=True):
+                # A breakdown generated before is rendered from its stored subtasks
+                subtasks = get_subtasks(task_id)
+                if subtasks:
+                    render_subtasks(task_id, subtasks)
+                else:
+                    try:
+                        # Render chunks as they arrive; cached breakdowns appear at once
+                        text = st.write_stream(load_ai_features().stream_task_breakdown(title, description))
+                        subtasks = parse_breakdown(text)
+                        if subtasks:
+                            save_subtasks(task_id, subtasks)
+                            st.caption(f"Saved {len(subtasks)} subtasks to track on this task")
+                    except LLMError as e:
+                        st.error(f"Error generating breakdown: {str(e)}")
+                if st.button("Close", key=f"close_breakdown_{task_id}"):
+                    st.session_state[f'show_breakdown_{task_id}'] = False
+                    st.rerun()
+        
+        st.divider()
+
+def render_analytics():
+    """Completion and overdue counts by priority and weekly throughput, from the aggregate tables"""
+    st.header("Analytics")
+    priority_stats, weeks = load_analytics(ANALYTICS_WEEKS, datetime.now().date(), get_write_version())
+    
+    total = sum(stats.total for stats in priority_stats)
+    completed = sum(stats.completed for stats in priority_stats)
+    this_week, last_week = weeks[-1], weeks[-2]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Tasks", total)
+    col2.metric("Completion rate", f"{completed / total:.0%}" if total else "n/a")
+    col3.metric("Overdue", sum(stats.overdue for stats in priority_stats))
+    col4.metric("Completed this week", this_week.completed, this_week.completed - last_week.completed)
+    
+    st.subheader("By priority")
+    st.dataframe([
+        {"priority": f"{PRIORITY_EMOJI.get(stats.priority, '')} {stats.priority}", "tasks": stats.total,
+         "completed": stats.completed, "completion rate": f"{stats.completed / stats.total:.0%}",
+         "overdue": stats.overdue, "due today": stats.due_today, "due soon": stats.due_soon}
+        for stats in priority_stats
+    ], use_container_width=True, hide_index=True)
+    
+    st.subheader("Weekly throughput")
+    st.line_chart({
+        "week": [week.week_start.isoformat() for week in weeks],
+        "created": [week.created for week in weeks],
+        "completed": [week.completed for week in weeks],
+    }, x="week")
+    st.caption("Weeks start on Monday. Tasks completed before completion times were recorded, "
+               "and imported completed tasks, are not in the completed line.")
+
+def render_diagnostics():
+    """Summarize the in-process metrics (shown with ?diagnostics=1 in the URL)"""
+    st.header("Diagnostics")
+    rows = metrics.snapshot()
+    
+    stats = cache_stats()
+    lookups = stats["hits"] + stats["misses"]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("AI cache hit rate", f"{stats['hits'] / lookups:.0%}" if lookups else "n/a", f"{lookups} lookups")
+    col2.metric("LLM circuit", load_ai_features().get_client().circuit.state)
+    col3.metric("Metrics endpoint", f":{metrics.METRICS_PORT}/metrics" if metrics.METRICS_PORT else "disabled")
+    
+    outbox = count_outbox()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Reminders due", outbox["due"])
+    col2.metric("Reminders retrying", outbox["waiting"])
+    col3.metric("Reminders sent", outbox["sent"])
+    col4.metric("Reminders failed", outbox["failed"])
+    
+    def as_ms(value):
+        return None if value is None else round(value * 1000, 2)
+    
+    latencies = [
+        {"metric": row["metric"], "labels": row["labels"], "count": row["count"], "mean ms": as_ms(row["mean"]),
+         "p50 ms": as_ms(row["p50"]), "p95 ms": as_ms(row["p95"])}
+        for row in rows if row["kind"] == "histogram" and row["count"]
+    ]
+    st.subheader("Latency")
+    st.dataframe(latencies, use_container_width=True, hide_index=True)
+    
+    st.subheader("Counters")
+    st.dataframe([{"metric": row["metric"], "labels": row["labels"], "value": row["value"]}
+                  for row in rows if row["kind"] != "histogram"], use_container_width=True, hide_index=True)
 
 # Main content area
-tab1, tab2, tab3 = st.tabs(["All Tasks", "AI Task Breakdown", "Email Reminders"])
+tab_names = ["All Tasks", "AI Task Breakdown", "Email Reminders", "Analytics"]
+show_diagnostics = st.query_params.get("diagnostics") == "1"
+if show_diagnostics:
+    tab_names.append("Diagnostics")
+tab1, tab2, tab3, tab4, *diagnostics_tab = st.tabs(tab_names)
 
 with tab1:
     st.header("Your Tasks")
     
     # Filter options
-    col1, col2 = st.columns([3, 1])
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
     with col1:
         filter_option = st.selectbox(
             "Filter by status",
             ["All", "Pending", "Completed"]
         )
     with col2:
+        urgency_option = st.selectbox("Urgency", ["Any", *URGENCY_DAY_RANGES])
+        urgency = None if urgency_option == "Any" else urgency_option
+    with col3:
         sort_option = st.selectbox(
             "Sort by",
             ["Deadline", "Priority", "Date Added"]
         )
+    with col4:
+        page_size = st.selectbox("Tasks per page", [10, 25, 50, 100], index=1)
     
-    # Get tasks from database
-    tasks = get_all_tasks(filter_option, sort_option)
+    search_query = st.text_input("🔎 Search tasks", placeholder="Search titles and descriptions...")
     
-    if tasks:
-        for task in tasks:
-            task_id, title, description, deadline, priority, status, email, created_at = task
-            
-            # Calculate days until deadline
-            deadline_date = datetime.strptime(deadline, "%Y-%m-%d").date()
-            days_left = (deadline_date - datetime.now().date()).days
-            
-            # Color coding based on days left
-            if days_left < 0:
-                urgency_color = "🔴"
-                urgency_text = f"Overdue by {abs(days_left)} days"
-            elif days_left == 0:
-                urgency_color = "🟠"
-                urgency_text = "Due today!"
-            elif days_left <= 3:
-                urgency_color = "🟡"
-                urgency_text = f"Due in {days_left} days"
-            else:
-                urgency_color = "🟢"
-                urgency_text = f"Due in {days_left} days"
-            
-            # Priority emoji
-            priority_emoji = {"Low": "🟦", "Medium": "🟧", "High": "🟥"}
-            
-            # Task card
-            with st.container():
-                col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
-                
-                with col1:
-                    checkbox_status = status == "Completed"
-                    if st.checkbox(
-                        f"**{title}**",
-                        value=checkbox_status,
-                        key=f"task_{task_id}"
-                    ):
-                        update_task_status(task_id, "Completed")
-                        st.rerun()
-                    elif not checkbox_status and status == "Completed":
-                        update_task_status(task_id, "Pending")
-                        st.rerun()
-                    
-                    st.write(f"📝 {description}")
-                    st.caption(f"📅 Deadline: {deadline} {urgency_color} {urgency_text}")
-                    st.caption(f"{priority_emoji[priority]} Priority: {priority}")
-                    st.caption(f"📧 Email: {email}")
-                
-                with col2:
-                    if st.button("Delete", key=f"del_{task_id}"):
-                        delete_task(task_id)
-                        st.success("Task deleted!")
-                        st.rerun()
-                
-                with col3:
-                    if st.button("Send Reminder", key=f"reminder_{task_id}"):
-                        # Generate AI email
-                        with st.spinner("Generating AI reminder email..."):
-                            try:
-                                email_content = generate_reminder_email(title, description, deadline, priority)
-                                success = send_reminder_email(email, title, email_content)
-                                
-                                if success:
-                                    st.success("Reminder email sent!")
-                                else:
-                                    st.error("Failed to send email. Check your configuration.")
-                            except Exception as e:
-                                st.error(f"Error: {str(e)}")
-                
-                with col4:
-                    if st.button("Breakdown", key=f"breakdown_{task_id}"):
-                        st.session_state[f'show_breakdown_{task_id}'] = True
-                
-                # Show breakdown if requested
-                if st.session_state.get(f'show_breakdown_{task_id}', False):
-                    with st.expander("AI Task Breakdown", expanded=True):
-                        with st.spinner("Generating task breakdown..."):
-                            try:
-                                breakdown = generate_task_breakdown(title, description)
-                                st.markdown(breakdown)
-                                if st.button("Close", key=f"close_breakdown_{task_id}"):
-                                    st.session_state[f'show_breakdown_{task_id}'] = False
-                                    st.rerun()
-                            except Exception as e:
-                                st.error(f"Error generating breakdown: {str(e)}")
-                
-                st.divider()
+    # Cursors for the start of each visited page; reset when the view changes
+    view_key = (filter_option, urgency, sort_option, page_size)
+    if st.session_state.get("task_view") != view_key:
+        st.session_state["task_view"] = view_key
+        st.session_state["task_page_cursors"] = [None]
+    page_cursors = st.session_state["task_page_cursors"]
+    
+    if search_query.strip():
+        # Ranked full-text matches replace the paginated list while searching
+        results = load_search_results(search_query, filter_option, page_size, urgency, get_write_version())
+        st.caption(f"{len(results)} best matches for \"{search_query}\"")
+        render_bulk_actions([task for task, _ in results], filter_option, urgency=urgency)
+        for task, snippet in results:
+            render_task_card(task, snippet)
+        if not results:
+            st.info("No matching tasks found.")
     else:
-        st.info("No tasks found. Add a new task from the sidebar!")
+        # Get only the current page of tasks from the database
+        total_tasks = load_task_count(filter_option, urgency, get_write_version())
+        tasks, next_cursor = load_tasks_page(filter_option, sort_option, page_size, page_cursors[-1], urgency,
+                                             get_write_version())
+        
+        if tasks:
+            render_bulk_actions(tasks, filter_option, total_tasks, urgency)
+            for task in tasks:
+                render_task_card(task)
+            
+            # Page navigation
+            total_pages = max(1, -(-total_tasks // page_size))
+            nav_prev, nav_info, nav_next = st.columns([1, 3, 1])
+            # Callbacks update the cursor stack before the next run, so no extra rerun is needed
+            with nav_prev:
+                st.button("◀ Previous", disabled=len(page_cursors) == 1, on_click=page_cursors.pop)
+            with nav_info:
+                st.caption(f"Page {len(page_cursors)} of {total_pages} · {total_tasks} tasks")
+            with nav_next:
+                st.button("Next ▶", disabled=next_cursor is None, on_click=page_cursors.append, args=(next_cursor,))
+        elif len(page_cursors) > 1:
+            # The page emptied (e.g. its last task was deleted); step back one page
+            page_cursors.pop()
+            st.rerun()
+        else:
+            st.info("No tasks found. Add a new task from the sidebar!")
 
 with tab2:
     st.header("AI Task Breakdown Generator")
@@ -193,17 +472,43 @@ with tab2:
         
         if st.form_submit_button("Generate Breakdown"):
             if breakdown_title and breakdown_description:
-                with st.spinner("AI is analyzing and breaking down your task..."):
-                    try:
-                        breakdown = generate_task_breakdown(breakdown_title, breakdown_description)
-                        st.success("Task breakdown generated!")
-                        st.markdown("---")
-                        st.markdown(breakdown)
-                    except Exception as e:
-                        st.error(f"Error: {str(e)}")
-                        st.info("Make sure your GEMINI_API_KEY is set in the .env file")
+                try:
+                    st.markdown("---")
+                    st.write_stream(load_ai_features().stream_task_breakdown(breakdown_title, breakdown_description))
+                    st.success("Task breakdown generated!")
+                except LLMNotConfiguredError as e:
+                    st.error(f"Error: {str(e)}")
+                    st.info("Make sure your GEMINI_API_KEY is set in the .env file")
+                except LLMError as e:
+                    st.error(f"Error: {str(e)}")
             else:
                 st.warning("Please fill in both title and description")
+    
+    st.subheader("💡 Suggest Next Tasks")
+    st.write("Get ideas for what to tackle next, based on the completed tasks most related to your current work.")
+    
+    with st.form("suggestions_form"):
+        suggestion_focus = st.text_input(
+            "Focus (optional)",
+            placeholder="E.g., launch the marketing site; leave empty to use your pending tasks"
+        )
+        
+        if st.form_submit_button("Suggest Tasks"):
+            # Only the most relevant completed tasks go into the prompt, however many there are
+            context = suggestion_context(suggestion_focus.strip() or None)
+            if context:
+                try:
+                    with st.spinner("Generating suggestions..."):
+                        suggestions = load_ai_features().generate_task_suggestions(context)
+                    st.markdown("\n".join(f"- {suggestion}" for suggestion in suggestions))
+                    st.caption(f"Based on {len(context)} related completed tasks")
+                except LLMNotConfiguredError as e:
+                    st.error(f"Error: {str(e)}")
+                    st.info("Make sure your GEMINI_API_KEY is set in the .env file")
+                except LLMError as e:
+                    st.error(f"Error: {str(e)}")
+            else:
+                st.info("Complete a few tasks first, so suggestions have something to build on.")
 
 with tab3:
     st.header("Email Reminder Settings")
@@ -228,24 +533,33 @@ with tab3:
             if test_email and test_task:
                 with st.spinner("Generating and sending reminder..."):
                     try:
-                        email_content = generate_reminder_email(
+                        email_content = load_ai_features().generate_reminder_email(
                             test_task,
                             "This is a reminder email",
                             str((datetime.now() + timedelta(days=2)).date()),
                             "High"
                         )
-                        success = send_reminder_email(test_email, test_task, email_content)
+                        success = load_email_sender().send_reminder_email(test_email, test_task, email_content)
                         
                         if success:
                             st.success("Reminder sent successfully!")
                             st.info("Check your email inbox (and spam folder)")
                         else:
                             st.error("Failed to send email. Check your SMTP configuration in .env file")
+                    except LLMError as e:
+                        st.error(f"Could not generate the reminder: {str(e)}")
                     except Exception as e:
                         st.error(f"Error: {str(e)}")
             else:
                 st.warning("Please fill in all fields")
 
+with tab4:
+    render_analytics()
+
+if show_diagnostics:
+    with diagnostics_tab[0]:
+        render_diagnostics()
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -253,3 +567,11 @@ st.markdown("""
         <p>AI-Powered Todo App | Built with Streamlit, SQLite & Gemini AI</p>
     </div>
 """, unsafe_allow_html=True)
+
+run_times_ms = st.session_state.setdefault("run_times_ms", [])
+run_seconds = time.perf_counter() - run_started
+RERUN_SECONDS.observe(run_seconds)
+run_times_ms.append(run_seconds * 1000)
+del run_times_ms[:-20]
+st.caption(f"Rendered in {run_times_ms[-1]:.0f} ms "
+           f"(median {statistics.median(run_times_ms):.0f} ms over the last {len(run_times_ms)} runs)")
@@ -0,0 +1,84 @@
+"""
+Batched prompting harness: N single generate_reminder_email() calls versus
+generate_reminder_emails_batch(), against a local fake model.
+
+Also checks that outputs come back in input order, that items the model drops
+or garbles fall back to single requests, and that batch results are cached
+under the single-item prompts.
+
+Usage:
+    python benchmarks/bench_ai_batching.py --tasks 50 --batch-size 10
+"""
+import argparse
+import contextlib
+import io
+from datetime import date, timedelta
+
+from common import database, timed, use_temp_database
+from fakes import FakeGeminiModel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--request-ms", type=float, default=300)
+    args = parser.parse_args()
+
+    use_temp_database()
+    database.init_db()
+    with contextlib.redirect_stdout(io.StringIO()):
+        import ai_features
+        from ai_cache import clear_cache
+        from llm_client import LLMClient
+
+    deadline = (date.today() + timedelta(days=2)).isoformat()
+    tasks = [(f"Task {i}", f"Description {i}", deadline, "High") for i in range(args.tasks)]
+
+    # The fake has no quota, so lift the client-side rate limit
+    ai_features.set_client(LLMClient(ai_features.get_model, requests_per_minute=1e6, burst=1000))
+
+    model = FakeGeminiModel(request_ms=args.request_ms)
+    ai_features.set_model(model)
+    singles, seconds = timed(lambda: [ai_features.generate_reminder_email(*task) for task in tasks])
+    print(f"single:  {model.requests:>4} requests  {seconds:6.2f}s")
+
+    clear_cache()
+    model = FakeGeminiModel(request_ms=args.request_ms)
+    ai_features.set_model(model)
+
+    def batched():
+        outputs = []
+        for start in range(0, len(tasks), args.batch_size):
+            chunk_outputs, stats = ai_features.generate_reminder_emails_batch(tasks[start:start + args.batch_size])
+            print(f"    batch of {stats.size}: {stats.prompt_tokens} prompt + {stats.response_tokens} "
+                  f"response tokens, {stats.latency_seconds * 1000:.0f}ms, {stats.fallbacks} fallbacks")
+            outputs.extend(chunk_outputs)
+        return outputs
+
+    outputs, seconds = timed(batched)
+    print(f"batched: {model.requests:>4} requests  {seconds:6.2f}s")
+    assert outputs == singles, "batched output should match single-call output, in order"
+
+    # Every result is now cached under its single-item prompt
+    model.requests = 0
+    ai_features.generate_reminder_email(*tasks[0])
+    _, stats = ai_features.generate_reminder_emails_batch(tasks[:args.batch_size])
+    assert model.requests == 0 and stats.cached == stats.size, "repeat calls should be served from cache"
+    print("cached:     0 requests for repeats")
+
+    for label, fake in (("dropped items", FakeGeminiModel(request_ms=0, drop_every=3)),
+                        ("invalid JSON", FakeGeminiModel(request_ms=0, corrupt=True))):
+        clear_cache()
+        ai_features.set_model(fake)
+        with contextlib.redirect_stdout(io.StringIO()):
+            outputs, stats = ai_features.generate_reminder_emails_batch(tasks[:9])
+        assert outputs == singles[:9], label
+        print(f"fallback ({label}): {stats.fallbacks}/9 items regenerated individually, output intact")
+
+    ai_features.set_model(None)
+    database.close_connections()
+
+
+if __name__ == "__main__":
+    main()
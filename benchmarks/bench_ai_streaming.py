@@ -0,0 +1,53 @@
+"""
+Time to first chunk versus time to full response for stream_task_breakdown(),
+against a local fake model, plus the replay time once the stream is cached.
+
+Usage:
+    python benchmarks/bench_ai_streaming.py --request-ms 400 --per-token-ms 8
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from common import database, use_temp_database
+from fakes import FakeGeminiModel
+
+
+def consume(stream):
+    """(seconds to first chunk, seconds to last chunk, full text)"""
+    start = time.perf_counter()
+    first = None
+    chunks = []
+    for chunk in stream:
+        if first is None:
+            first = time.perf_counter() - start
+        chunks.append(chunk)
+    return first, time.perf_counter() - start, "".join(chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--request-ms", type=float, default=400)
+    parser.add_argument("--per-token-ms", type=float, default=8)
+    args = parser.parse_args()
+
+    use_temp_database()
+    database.init_db()
+    with contextlib.redirect_stdout(io.StringIO()):
+        import ai_features
+    ai_features.set_model(FakeGeminiModel(request_ms=args.request_ms, per_token_ms=args.per_token_ms))
+
+    first, total, text = consume(ai_features.stream_task_breakdown("Build a mobile app", "Fitness tracker"))
+    print(f"streamed: first chunk {first * 1000:7.1f}ms, full response {total * 1000:7.1f}ms")
+
+    first, total, replay = consume(ai_features.stream_task_breakdown("Build a mobile app", "Fitness tracker"))
+    assert replay == text, "cached replay should match the streamed text"
+    print(f"cached:   first chunk {first * 1000:7.1f}ms, full response {total * 1000:7.1f}ms")
+
+    ai_features.set_model(None)
+    database.close_connections()
+
+
+if __name__ == "__main__":
+    main()
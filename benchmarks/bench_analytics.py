@@ -0,0 +1,124 @@
+"""
+Analytics dashboard queries: per-priority completion/overdue counts and weekly
+throughput read from the trigger-maintained aggregate tables, versus the same
+numbers computed by scanning tasks, plus what the triggers add to each write.
+
+Usage:
+    python benchmarks/bench_analytics.py --rows 1000000 --runs 20
+"""
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+
+from common import database, timed, use_temp_database
+from seed import synthetic_tasks
+
+WEEKS = 12
+
+ANALYTICS_TRIGGERS = ("tasks_analytics_insert", "tasks_analytics_delete",
+                      "tasks_analytics_update", "tasks_analytics_update_weeks")
+
+
+def scan_priority_stats(today):
+    """get_priority_stats() computed from the tasks table"""
+    iso = lambda days: (today + timedelta(days=days)).isoformat()
+    rows = database.get_connection().execute("""
+        SELECT priority, COUNT(*), SUM(status = 'Completed'),
+               SUM(status != 'Completed' AND deadline < ?),
+               SUM(status != 'Completed' AND deadline >= ? AND deadline < ?),
+               SUM(status != 'Completed' AND deadline >= ? AND deadline < ?)
+        FROM tasks GROUP BY priority ORDER BY MIN(priority_rank)
+    """, (iso(0), iso(0), iso(1), iso(1), iso(database.DUE_SOON_DAYS + 1))).fetchall()
+    return [database.PriorityStats(*row) for row in rows]
+
+
+def scan_weekly_throughput(today):
+    """get_weekly_throughput() computed from the tasks table"""
+    conn = database.get_connection()
+    last_week = today - timedelta(days=today.weekday())
+    first_week = (last_week - timedelta(weeks=WEEKS - 1)).isoformat()
+    counts = {}
+    for column, index in (("created_at", 0), ("completed_at", 1)):
+        for week_start, count in conn.execute(f"""
+            SELECT date({column}, 'weekday 0', '-6 days') AS week_start, COUNT(*) FROM tasks
+            WHERE {column} >= ? GROUP BY week_start
+        """, (first_week,)):
+            counts.setdefault(week_start, [0, 0])[index] = count
+    weeks = [last_week - timedelta(weeks=offset) for offset in range(WEEKS - 1, -1, -1)]
+    return [database.WeekStats(week, *counts.get(week.isoformat(), (0, 0))) for week in weeks]
+
+
+def median_ms(func, *args, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def write_costs(runs):
+    """Median ms of add_task() and of completing then reopening a task"""
+    task_ids = []
+
+    def add():
+        task_ids.append(database.add_task("Benchmark task", "Measure the write path", date.today().isoformat(),
+                                          "High", "bench@example.com"))
+
+    def toggle():
+        database.update_task_status(task_ids[-1], "Completed")
+        database.update_task_status(task_ids[-1], "Pending")
+
+    return median_ms(add, runs=runs), median_ms(toggle, runs=runs) / 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    use_temp_database()
+    database.init_db()
+    _, seconds = timed(database.bulk_insert_tasks, (
+        (title, description, deadline, priority, email, status, created_at)
+        for title, description, deadline, priority, status, email, created_at in synthetic_tasks(args.rows)
+    ), defer_indexes=True)
+    print(f"loaded {args.rows:,} tasks in {seconds:.1f}s (aggregates caught up after the load)")
+
+    # Give the seeded completed tasks completion times, through the update trigger
+    conn = database.get_connection()
+    with conn:
+        _, seconds = timed(conn.execute, """
+            UPDATE tasks SET completed_at = datetime(created_at, '+' || (id % 30) || ' days')
+            WHERE status = 'Completed'
+        """)
+    print(f"set completed_at on completed tasks in {seconds:.1f}s\n")
+
+    today = date.today()
+    assert database.get_priority_stats(today) == scan_priority_stats(today)
+    assert database.get_weekly_throughput(WEEKS, today) == scan_weekly_throughput(today)
+    buckets = conn.execute("SELECT (SELECT COUNT(*) FROM task_counts) + (SELECT COUNT(*) FROM weekly_task_counts)")
+    print(f"aggregates match a full scan; {buckets.fetchone()[0]:,} aggregate rows\n")
+
+    print(f"{'':<28} {'scan tasks':>12} {'aggregates':>12}")
+    for label, scan, aggregate in (
+        ("priority stats", lambda: scan_priority_stats(today), lambda: database.get_priority_stats(today)),
+        (f"weekly throughput ({WEEKS} wk)", lambda: scan_weekly_throughput(today),
+         lambda: database.get_weekly_throughput(WEEKS, today)),
+    ):
+        print(f"{label:<28} {median_ms(scan, runs=args.runs):10.2f}ms {median_ms(aggregate, runs=args.runs):10.3f}ms")
+
+    add_with, toggle_with = write_costs(args.runs * 10)
+    with conn:
+        for name in ANALYTICS_TRIGGERS:
+            conn.execute(f"DROP TRIGGER {name}")
+    add_without, toggle_without = write_costs(args.runs * 10)
+    print(f"\n{'':<28} {'no triggers':>12} {'triggers':>12}")
+    print(f"{'add_task':<28} {add_without:10.3f}ms {add_with:10.3f}ms")
+    print(f"{'update_task_status':<28} {toggle_without:10.3f}ms {toggle_with:10.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+HTTP API load test: requests/sec and latency percentiles for GET /tasks pages
+served by api_server.py under uvicorn (in a separate process, so client and
+server do not share a GIL), plain and with If-None-Match revalidation, next to
+the Streamlit path: a full app.py rerun through AppTest for the same page.
+
+Usage:
+    python benchmarks/bench_api.py --rows 100000 --clients 16 --requests 5000
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from common import REPO_ROOT, database, use_temp_database
+from seed import synthetic_tasks
+
+# Views requested round-robin by the clients
+QUERIES = (
+    "/tasks?page_size=25",
+    "/tasks?status=Pending&sort=Priority&page_size=25",
+    "/tasks?urgency=Overdue&page_size=25",
+    "/tasks?status=Completed&sort=Date%20Added&page_size=25",
+)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_dir, port):
+    """Run api_server under uvicorn against the benchmark database, waiting until it answers"""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, METRICS_PORT="0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api_server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=database_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/tasks?page_size=1")
+            conn.getresponse().read()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise SystemExit("API server did not start")
+
+
+def load(port, clients, requests, conditional):
+    """Issue requests GETs from clients keep-alive connections; return (latencies, elapsed)"""
+    etags = {}
+    # Prime the ETags the revalidating clients send
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    for path in QUERIES:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        response.read()
+        etags[path] = response.getheader("ETag")
+
+    latencies = []
+    lock = threading.Lock()
+    per_client = requests // clients
+
+    def client(offset):
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        samples = []
+        for i in range(per_client):
+            path = QUERIES[(offset + i) % len(QUERIES)]
+            headers = {"If-None-Match": etags[path]} if conditional else {}
+            start = time.perf_counter()
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+            if response.status == 200:
+                json.loads(body)
+            elif response.status != 304:
+                raise RuntimeError(f"{path}: HTTP {response.status}")
+            samples.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(samples)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - start
+
+
+def streamlit_reruns(runs):
+    """Time full app.py reruns, the Streamlit equivalent of fetching a page"""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(REPO_ROOT, "app.py"), default_timeout=120)
+    app.run()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        app.run()
+        samples.append(time.perf_counter() - start)
+    return samples, sum(samples)
+
+
+def print_row(label, latencies, elapsed):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{label:<34} {len(latencies) / elapsed:>10,.0f} req/s {p50:>9.2f}ms {p99:>9.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--reruns", type=int, default=20, help="AppTest reruns for the Streamlit comparison")
+    args = parser.parse_args()
+
+    # The server process opens todo_app.db in its working directory
+    path = use_temp_database("todo_app.db")
+    database.init_db()
+    database.bulk_insert_tasks(
+        ((title, description, deadline, priority, email, status, created_at)
+         for title, description, deadline, priority, status, email, created_at in synthetic_tasks(args.rows)),
+        defer_indexes=True
+    )
+
+    port = free_port()
+    server = start_server(os.path.dirname(path), port)
+    try:
+        print(f"{args.rows:,} tasks, {args.clients} clients, pages of 25\n")
+        print(f"{'':<34} {'throughput':>16} {'p50':>11} {'p99':>11}")
+        print_row("API GET /tasks", *load(port, args.clients, args.requests, conditional=False))
+        print_row("API GET /tasks, If-None-Match (304)", *load(port, args.clients, args.requests, conditional=True))
+    finally:
+        server.terminate()
+        server.wait()
+
+    os.environ["METRICS_PORT"] = "0"
+    print_row("Streamlit app.py rerun (AppTest)", *streamlit_reruns(args.reruns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Streamlit rerun cost: time full app.py reruns (as triggered by any widget
+interaction) with the cached database reads warm, versus with every cache
+cleared before each run as if nothing were cached, for a few task list views.
+Times are the script's own "Rendered in" figure, which excludes AppTest's
+harness overhead.
+
+Usage:
+    python benchmarks/bench_app_rerun.py --rows 100000 --runs 20
+"""
+import argparse
+import logging
+import os
+import re
+import statistics
+
+from common import REPO_ROOT, database, use_temp_database
+from seed import synthetic_tasks
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+
+# (label, status filter, search query)
+VIEWS = (
+    ("All tasks", "All", ""),
+    ("Pending filter", "Pending", ""),
+    ("Search 'budget'", "All", "budget"),
+)
+
+
+def time_reruns(app, runs, clear_caches):
+    samples = []
+    for _ in range(runs):
+        if clear_caches:
+            st.cache_data.clear()
+            st.cache_resource.clear()
+        app.run()
+        footer = app.caption[-1].value
+        samples.append(float(re.match(r"Rendered in (\d+) ms", footer).group(1)))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    use_temp_database()
+    database.init_db()
+    database.bulk_insert_tasks(
+        (title, description, deadline, priority, email, status, created_at)
+        for title, description, deadline, priority, status, email, created_at in synthetic_tasks(args.rows)
+    )
+
+    app = AppTest.from_file(os.path.join(REPO_ROOT, "app.py"), default_timeout=60)
+    app.run()
+    if app.exception:
+        raise SystemExit(app.exception[0].value)
+
+    # Clearing caches outside a server logs a warning each time
+    logging.getLogger("streamlit.runtime.caching.cache_data_api").setLevel(logging.ERROR)
+
+    print(f"{args.rows:,} tasks, median of {args.runs} reruns\n")
+    print(f"{'view':<18} {'uncached':>10} {'cached':>10}")
+    for label, status, query in VIEWS:
+        app.selectbox[0].set_value(status)
+        app.text_input[0].set_value(query)
+        app.run()
+        uncached = statistics.median(time_reruns(app, args.runs, True))
+        cached = statistics.median(time_reruns(app, args.runs, False))
+        print(f"{label:<18} {uncached:>8.1f}ms {cached:>8.1f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Bulk task actions: completing, reopening and deleting many tasks with one
+update_task_status() / delete_task() call (one transaction) per task versus
+update_task_status_many() / delete_tasks() (one transaction per batch).
+
+Usage:
+    python benchmarks/bench_bulk_actions.py --rows 100000 --batch 500
+"""
+import argparse
+
+from common import database, report, timed, use_temp_database
+from seed import synthetic_tasks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=500, help="tasks acted on at once")
+    args = parser.parse_args()
+
+    use_temp_database()
+    database.init_db()
+    database.bulk_insert_tasks(
+        (title, description, deadline, priority, email, "Pending", created_at)
+        for title, description, deadline, priority, _status, email, created_at in synthetic_tasks(args.rows)
+    )
+
+    one_by_one = list(range(1, args.batch + 1))
+    batched = list(range(args.batch + 1, 2 * args.batch + 1))
+
+    for status in ("Completed", "Pending"):
+        _, seconds = timed(lambda: [database.update_task_status(task_id, status) for task_id in one_by_one])
+        report(f"update_task_status() x{args.batch} -> {status}", args.batch, seconds)
+        _, seconds = timed(database.update_task_status_many, batched, status)
+        report(f"update_task_status_many() -> {status}", args.batch, seconds)
+
+    _, seconds = timed(lambda: [database.delete_task(task_id) for task_id in one_by_one])
+    report(f"delete_task() x{args.batch}", args.batch, seconds)
+    _, seconds = timed(database.delete_tasks, batched)
+    report("delete_tasks()", args.batch, seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Bulk import/export throughput: task_io's streaming CSV/JSONL loader (with and
+without deferred index maintenance) versus one add_task() call per row, and
+the streaming exporter in both formats.
+
+Usage:
+    python benchmarks/bench_bulk_io.py --rows 200000
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+
+from common import database, report, timed, use_temp_database
+from seed import synthetic_tasks
+
+import task_io
+
+COLUMNS = ("title", "description", "deadline", "priority", "status", "email", "created_at")
+
+
+def write_source_files(directory, rows):
+    """Write the same synthetic tasks as CSV and JSONL, returning both paths"""
+    csv_path = os.path.join(directory, "tasks.csv")
+    jsonl_path = os.path.join(directory, "tasks.jsonl")
+    with open(csv_path, "w", newline="") as csv_file, open(jsonl_path, "w") as jsonl_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(COLUMNS)
+        for row in synthetic_tasks(rows):
+            writer.writerow(row)
+            jsonl_file.write(json.dumps(dict(zip(COLUMNS, row))) + "\n")
+    return csv_path, jsonl_path
+
+
+def fresh_database():
+    use_temp_database()
+    database.init_db()
+
+
+def run_import(path, fmt, defer_indexes):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return task_io.import_tasks(f, fmt, defer_indexes=defer_indexes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--baseline-rows", type=int, default=5_000,
+                        help="rows inserted one add_task() call at a time")
+    args = parser.parse_args()
+
+    csv_path, jsonl_path = write_source_files(tempfile.mkdtemp(prefix="todo_bench_io_"), args.rows)
+
+    fresh_database()
+    rows = list(synthetic_tasks(args.baseline_rows))
+    _, seconds = timed(lambda: [database.add_task(r[0], r[1], r[2], r[3], r[5]) for r in rows])
+    report("add_task() per row", len(rows), seconds)
+
+    for path, fmt in ((csv_path, "csv"), (jsonl_path, "jsonl")):
+        for defer_indexes in (False, True):
+            fresh_database()
+            result = run_import(path, fmt, defer_indexes)
+            label = f"import {fmt}" + (" (deferred indexes)" if defer_indexes else "")
+            report(label, result.imported, result.seconds)
+
+    # Export from the last populated database
+    for fmt in task_io.FORMATS:
+        out_path = os.path.join(os.path.dirname(csv_path), f"export.{fmt}")
+        with open(out_path, "w", encoding="utf-8", newline="") as f:
+            count, seconds = timed(task_io.export_tasks, f, fmt)
+        report(f"export {fmt}", count, seconds)
+
+    # The search index must match the table after a deferred load
+    conn = database.get_connection()
+    indexed = conn.execute("SELECT COUNT(*) FROM tasks_fts").fetchone()[0]
+    print(f"\nsearch index rows after deferred load: {indexed:,} of {database.count_tasks():,}")
+
+
+if __name__ == "__main__":
+    main()
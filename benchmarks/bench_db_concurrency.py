@@ -0,0 +1,100 @@
+"""
+Concurrent reader/writer throughput: one-connection-per-call vs pooled WAL connections.
+
+The "before" numbers reproduce the original database.py behaviour (a fresh
+sqlite3.connect() in the default rollback-journal mode for every call);
+the "after" numbers go through the pooled public functions.
+
+Usage:
+    python benchmarks/bench_db_concurrency.py --writers 4 --readers 4 --ops 500
+"""
+import argparse
+import sqlite3
+import threading
+
+from common import database, report, timed, use_temp_database
+
+
+def legacy_add_task(path, title):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO tasks (title, description, deadline, priority, email)
+        VALUES (?, ?, ?, ?, ?)
+    """, (title, "benchmark task", "2030-01-01", "Medium", "bench@example.com"))
+    conn.commit()
+    conn.close()
+
+
+def legacy_get_all_tasks(path, _title):
+    conn = sqlite3.connect(path)
+    tasks = conn.execute("SELECT * FROM tasks WHERE status = 'Pending' ORDER BY deadline ASC LIMIT 50").fetchall()
+    conn.close()
+    return tasks
+
+
+def pooled_add_task(path, title):
+    database.add_task(title, "benchmark task", "2030-01-01", "Medium", "bench@example.com")
+
+
+def pooled_get_all_tasks(path, _title):
+    return database.get_connection().execute(
+        "SELECT * FROM tasks WHERE status = 'Pending' ORDER BY deadline ASC LIMIT 50"
+    ).fetchall()
+
+
+def run_workload(path, writer, reader, writers, readers, ops):
+    """Run writer and reader threads concurrently and return (completed_ops, errors)"""
+    errors = []
+    completed = [0]
+    lock = threading.Lock()
+
+    def loop(func, prefix):
+        done = 0
+        for i in range(ops):
+            try:
+                func(path, f"{prefix}-{i}")
+                done += 1
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+        with lock:
+            completed[0] += done
+
+    threads = [threading.Thread(target=loop, args=(writer, f"w{n}")) for n in range(writers)]
+    threads += [threading.Thread(target=loop, args=(reader, f"r{n}")) for n in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return completed[0], errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=500, help="operations per thread")
+    args = parser.parse_args()
+
+    for label, writer, reader in (
+        ("before: connect-per-call, rollback journal", legacy_add_task, legacy_get_all_tasks),
+        ("after:  pooled per-thread, WAL", pooled_add_task, pooled_get_all_tasks),
+    ):
+        path = use_temp_database()
+        database.init_db()
+        if writer is legacy_add_task:
+            # Undo the WAL switch made by init_db so the baseline matches the old defaults
+            database.get_connection().execute("PRAGMA journal_mode = DELETE")
+            database.close_connections()
+
+        (completed, errors), seconds = timed(
+            run_workload, path, writer, reader, args.writers, args.readers, args.ops
+        )
+        report(f"{label} ({args.writers}w/{args.readers}r)", completed, seconds)
+        if errors:
+            print(f"    {len(errors)} failed ops, e.g. {errors[0]!r}")
+        database.close_connections()
+
+
+if __name__ == "__main__":
+    main()
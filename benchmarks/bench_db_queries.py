@@ -0,0 +1,106 @@
+"""
+Query latency for every "Filter by status" x "Sort by" combination, before and after
+the indexed schema migration, on a large synthetic database.
+
+A version 1 (TEXT-only, unindexed) database is seeded, the original queries are timed,
+init_db() migrates the file in place, and the same combinations are timed again
+through get_all_tasks(). get_upcoming_tasks() is measured on both sides as well.
+
+Usage:
+    python benchmarks/bench_db_queries.py --rows 1000000
+"""
+import argparse
+import statistics
+import time
+
+from common import database, timed, use_temp_database
+from seed import seed_legacy_tasks
+
+FILTERS = ("All", "Pending", "Completed")
+SORTS = ("Deadline", "Priority", "Date Added")
+PAGE = 50
+
+
+def legacy_query(filter_status, sort_by):
+    """The query the original get_all_tasks() built"""
+    query = "SELECT * FROM tasks"
+    if filter_status != "All":
+        query += f" WHERE status = '{filter_status}'"
+    if sort_by == "Deadline":
+        query += " ORDER BY deadline ASC"
+    elif sort_by == "Priority":
+        query += " ORDER BY CASE priority WHEN 'High' THEN 1 WHEN 'Medium' THEN 2 WHEN 'Low' THEN 3 END"
+    elif sort_by == "Date Added":
+        query += " ORDER BY created_at DESC"
+    return query
+
+
+LEGACY_UPCOMING = """
+    SELECT * FROM tasks
+    WHERE status = 'Pending'
+    AND date(deadline) <= date('now', '+' || ? || ' days')
+    ORDER BY deadline ASC
+"""
+
+
+def measure(run, repeat):
+    """Median wall time in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def first_page(conn, query, params=()):
+    return conn.execute(query, params).fetchmany(PAGE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    use_temp_database()
+    conn = database.get_connection()
+    _, seconds = timed(seed_legacy_tasks, conn, args.rows)
+    print(f"seeded {args.rows:,} version-1 rows in {seconds:.1f}s\n")
+
+    print(f"{'filter':<10} {'sort':<11} {'before full':>12} {'before 1st page':>16}")
+    before = {}
+    for filter_status in FILTERS:
+        for sort_by in SORTS:
+            query = legacy_query(filter_status, sort_by)
+            full = measure(lambda: conn.execute(query).fetchall(), args.repeat)
+            page = measure(lambda: first_page(conn, query), args.repeat)
+            before[filter_status, sort_by] = (full, page)
+            print(f"{filter_status:<10} {sort_by:<11} {full:>10.1f}ms {page:>14.1f}ms")
+    upcoming_before = measure(lambda: conn.execute(LEGACY_UPCOMING, (3,)).fetchall(), args.repeat)
+
+    _, seconds = timed(database.init_db)
+    print(f"\nmigrated to schema v{database.get_schema_version()} in place in {seconds:.1f}s\n")
+
+    print(f"{'filter':<10} {'sort':<11} {'after full':>12} {'after 1st page':>16} {'1st page speedup':>17}")
+    for filter_status in FILTERS:
+        for sort_by in SORTS:
+            full = measure(lambda: database.get_all_tasks(filter_status, sort_by), args.repeat)
+            # Same SQL as get_all_tasks, but stop after one page like a paginated UI would
+            sql = f"SELECT {database.TASK_COLUMNS} FROM tasks"
+            params = ()
+            if filter_status != "All":
+                sql += " WHERE status = ?"
+                params = (filter_status,)
+            sql += f" ORDER BY {database.SORT_ORDERS[sort_by]}"
+            page = measure(lambda: first_page(conn, sql, params), args.repeat)
+            speedup = before[filter_status, sort_by][1] / page if page else float("inf")
+            print(f"{filter_status:<10} {sort_by:<11} {full:>10.1f}ms {page:>14.1f}ms {speedup:>16.0f}x")
+
+    upcoming_after = measure(lambda: database.get_upcoming_tasks(3), args.repeat)
+    print(f"\nget_upcoming_tasks(3): before {upcoming_before:.1f}ms, after {upcoming_after:.1f}ms")
+    database.close_connections()
+
+
+if __name__ == "__main__":
+    main()
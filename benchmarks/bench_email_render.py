@@ -0,0 +1,92 @@
+"""
+Reminder rendering microbenchmark: the original per-call f-string + MIMEMultipart +
+as_string() path versus the precompiled email_templates renderer.
+
+Reports messages rendered per second and, via tracemalloc, the peak memory
+allocated while rendering each message.
+
+Usage:
+    python benchmarks/bench_email_render.py --count 20000
+"""
+import argparse
+import time
+import tracemalloc
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from common import REPO_ROOT  # noqa: F401  (puts the repo on sys.path)
+from email_templates import render_reminder_message
+
+BODY = (
+    "Hi there,\n\nJust a friendly reminder that \"Quarterly budget review\" is due on "
+    "2026-10-20 and is marked High priority. Getting it done early will free up "
+    "the rest of your week!\n\nYou've got this 💪\n\nKumar Arpit"
+)
+
+
+def legacy_render(sender_email, recipient_email, task_title, email_body):
+    """The original send_reminder_email() message construction"""
+    message = MIMEMultipart("alternative")
+    message["Subject"] = f"⏰ Task Reminder: {task_title}"
+    message["From"] = sender_email
+    message["To"] = recipient_email
+    html = f"""
+    <html>
+      <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+        <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #ddd; border-radius: 10px;">
+          <h2 style="color: #1f77b4; border-bottom: 2px solid #1f77b4; padding-bottom: 10px;">
+            📋 Task Reminder
+          </h2>
+          <div style="background-color: #f0f8ff; padding: 15px; border-radius: 5px; margin: 20px 0;">
+            {email_body.replace(chr(10), '<br>')}
+          </div>
+          <div style="margin-top: 20px; padding-top: 20px; border-top: 1px solid #ddd; text-align: center; color: #666;">
+            <p style="font-size: 12px;">
+              This is an automated reminder from your AI-Powered Todo App
+            </p>
+          </div>
+        </div>
+      </body>
+    </html>
+    """
+    message.attach(MIMEText(email_body, "plain"))
+    message.attach(MIMEText(html, "html"))
+    return message.as_string()
+
+
+def throughput(render, count):
+    start = time.perf_counter()
+    for i in range(count):
+        render("todo-app@example.com", f"user{i}@example.com", f"Task {i}", BODY)
+    return count / (time.perf_counter() - start)
+
+
+def allocation_peak(render, count):
+    """Average peak bytes allocated while rendering one message"""
+    tracemalloc.start()
+    total = 0
+    for i in range(count):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        render("todo-app@example.com", f"user{i}@example.com", f"Task {i}", BODY)
+        total += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return total / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=20000)
+    args = parser.parse_args()
+
+    for label, render in (
+        ("before: f-string + MIMEMultipart.as_string()", legacy_render),
+        ("after:  precompiled email_templates", render_reminder_message),
+    ):
+        rate = throughput(render, args.count)
+        peak = allocation_peak(render, min(args.count, 1000))
+        print(f"{label:<46} {rate:>10,.0f} msgs/sec  {peak / 1024:>6.1f} KiB allocated at peak per msg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+LLM client resilience against a fake model that injects latency and failures:
+wrapper overhead, success rate with and without retries under 503/429 errors,
+tail latency with hung requests, fail-fast behaviour during an outage, and
+client-side rate limiting.
+
+Usage:
+    python benchmarks/bench_llm_client.py --requests 200
+"""
+import argparse
+import statistics
+import time
+
+from common import report, timed
+from fakes import FakeGeminiModel, FlakyModel
+
+from llm_client import LLMClient, LLMError
+
+
+def run(client, count):
+    """Send count distinct prompts; return (successes, per-request latencies, error types)"""
+    latencies, errors = [], {}
+    for i in range(count):
+        start = time.perf_counter()
+        try:
+            client.generate(f"Task: item {i}\n")
+        except LLMError as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+        latencies.append(time.perf_counter() - start)
+    return count - sum(errors.values()), latencies, errors
+
+
+def describe(label, count, result):
+    successes, latencies, errors = result
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{label:<40} {successes:>4}/{count} ok  median {statistics.median(latencies) * 1000:7.1f}ms"
+          f"  p99 {p99:7.1f}ms  {errors or ''}")
+
+
+def make_client(model, **settings):
+    settings.setdefault("requests_per_minute", 1e9)
+    settings.setdefault("burst", 1_000_000)
+    settings.setdefault("backoff_base_seconds", 0.01)
+    return LLMClient(lambda: model, **settings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    count = args.requests
+
+    instant = FakeGeminiModel(request_ms=0, per_token_ms=0)
+    _, seconds = timed(lambda: [instant.generate_content(f"Task: item {i}\n") for i in range(count)])
+    report("direct generate_content()", count, seconds)
+    _, seconds = timed(run, make_client(instant), count)
+    report("LLMClient.generate() (deadline thread)", count, seconds)
+    print()
+
+    model = FakeGeminiModel(request_ms=5, per_token_ms=0)
+    flaky = lambda: FlakyModel(model, error_rate=0.15, quota_rate=0.05)
+    describe("20% errors, no retries", count, run(make_client(flaky(), max_retries=0, failure_threshold=10**6), count))
+    describe("20% errors, 3 retries", count, run(make_client(flaky(), max_retries=3, failure_threshold=10**6), count))
+
+    hanging = lambda: FlakyModel(model, hang_rate=0.05, hang_seconds=2.0)
+    describe("5% hang 2s, 10s deadline", count // 4, run(make_client(hanging(), timeout_seconds=10), count // 4))
+    describe("5% hang 2s, 0.2s deadline + retry", count // 4,
+             run(make_client(hanging(), timeout_seconds=0.2), count // 4))
+    print()
+
+    # Outage: every request fails; the breaker opens after 5 and later calls fail fast
+    outage = FlakyModel(model)
+    outage.down = True
+    client = make_client(outage, max_retries=0, failure_threshold=5, reset_seconds=0.5)
+    describe("outage, circuit breaker", count, run(client, count))
+    print(f"{'':<40} model saw {outage.requests} of {count} requests")
+    outage.down = False
+    time.sleep(0.5)
+    client.generate("Task: recovered\n")
+    print(f"{'':<40} after cooldown: circuit {client.circuit.state}")
+    print()
+
+    # Rate limiting: 600/min with bursts of 5, so 30 requests take ~2.5s
+    client = make_client(instant, requests_per_minute=600, burst=5)
+    _, seconds = timed(run, client, 30)
+    report("30 requests at 600/min (burst 5)", 30, seconds)
+
+
+if __name__ == "__main__":
+    main()
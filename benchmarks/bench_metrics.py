@@ -0,0 +1,63 @@
+"""
+Instrumentation overhead: cost of a metrics.timed() decorated call versus a
+plain call, a decorated generator, counter increments, and rendering the
+Prometheus exposition text.
+
+Usage:
+    python benchmarks/bench_metrics.py --calls 1000000
+"""
+import argparse
+
+from common import database, report, timed, use_temp_database
+
+import metrics
+
+HISTOGRAM = metrics.histogram("bench_seconds", "Benchmark histogram", ("function",))
+COUNTER = metrics.counter("bench_total", "Benchmark counter", ("kind",))
+
+
+def plain(value):
+    return value
+
+
+@metrics.timed(HISTOGRAM)
+def decorated(value):
+    return value
+
+
+@metrics.timed(HISTOGRAM)
+def decorated_generator(count):
+    yield from range(count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    args = parser.parse_args()
+    calls = args.calls
+
+    _, plain_seconds = timed(lambda: [plain(i) for i in range(calls)])
+    report("plain call", calls, plain_seconds)
+    _, seconds = timed(lambda: [decorated(i) for i in range(calls)])
+    report("@metrics.timed call", calls, seconds)
+    print(f"{'':<48} overhead {(seconds - plain_seconds) / calls * 1e9:,.0f} ns/call\n")
+
+    _, seconds = timed(lambda: [sum(decorated_generator(1)) for _ in range(calls // 10)])
+    report("@metrics.timed generator (1 item)", calls // 10, seconds)
+    _, seconds = timed(lambda: [COUNTER.inc("a") for _ in range(calls)])
+    report("Counter.inc()", calls, seconds)
+
+    # A realistic registry: the app's own metrics after some database traffic
+    use_temp_database()
+    database.init_db()
+    for i in range(1000):
+        database.add_task(f"Task {i}", "Description", "2030-01-01", "Low", "user@example.com")
+        database.count_tasks()
+    text, seconds = timed(metrics.render_prometheus)
+    report(f"render_prometheus() ({len(text.splitlines())} lines)", 1, seconds)
+    _, seconds = timed(lambda: [database.count_tasks() for _ in range(10_000)])
+    report("database.count_tasks() (instrumented)", 10_000, seconds)
+
+
+if __name__ == "__main__":
+    main()
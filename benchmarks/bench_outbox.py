@@ -0,0 +1,135 @@
+"""
+Manual reminders through the outbox: a burst of "Send Reminder" clicks (with
+repeats, as from double clicks and reruns) from concurrent sessions is enqueued,
+then drained by reminder_outbox.drain_once() through a fake model with hosted-model
+latency and failures and a local SMTP sink.
+
+The baseline is the old click handler, generating and sending one email per click
+on the UI thread; it is timed for --baseline-clicks clicks.
+
+Usage:
+    python benchmarks/bench_outbox.py --tasks 1000 --clicks 5000 --sessions 16
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import threading
+import time
+
+from common import database, report, timed, use_temp_database
+from fakes import FakeGeminiModel, FlakyModel
+from seed import synthetic_tasks
+from smtp_sink import SMTPSink
+
+import ai_features
+from ai_cache import clear_cache
+from llm_client import LLMClient, LLMError
+
+
+def click_burst(tasks, clicks, sessions, click):
+    """Click a random task clicks times from sessions threads; return per-click latencies"""
+    latencies = []
+    lock = threading.Lock()
+
+    def session(seed):
+        rng = random.Random(seed)
+        samples = []
+        for _ in range(clicks // sessions):
+            task = rng.choice(tasks)
+            start = time.perf_counter()
+            click(task)
+            samples.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(samples)
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--clicks", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--baseline-clicks", type=int, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.1, help="share of model requests that fail with a 503")
+    args = parser.parse_args()
+
+    use_temp_database()
+    database.init_db()
+    database.bulk_insert_tasks(
+        ((title, description, deadline, priority, email, status, created_at)
+         for title, description, deadline, priority, status, email, created_at in synthetic_tasks(args.tasks)),
+        defer_indexes=True
+    )
+    tasks = [database.get_task_by_id(task_id) for task_id in range(1, args.tasks + 1)]
+
+    with SMTPSink() as sink:
+        os.environ.update(sink.environ())
+        # Imported after the environment points at the sink
+        from email_sender import send_reminder_email
+        import reminder_outbox
+
+        model = FlakyModel(FakeGeminiModel(), error_rate=args.error_rate)
+        ai_features.set_model(model)
+        # Retries are left to the outbox, so a failed request costs one attempt
+        ai_features.set_client(LLMClient(ai_features.get_model, requests_per_minute=1e9, burst=1_000_000,
+                                         max_retries=0))
+        clear_cache()
+
+        def send_now(task):
+            # The old handler showed an error and left retrying to the user
+            try:
+                body = ai_features.generate_reminder_email(task.title, task.description, task.deadline, task.priority)
+            except LLMError:
+                return
+            send_reminder_email(task.email, task.title, body)
+
+        print(f"{args.tasks:,} tasks, {args.clicks:,} clicks from {args.sessions} sessions\n")
+        with contextlib.redirect_stdout(io.StringIO()):
+            latencies = click_burst(tasks, args.baseline_clicks, 1, send_now)
+        report("before: generate + send per click", len(latencies), sum(latencies))
+        print(f"    click p50 {statistics.median(latencies) * 1000:.1f}ms, "
+              f"{sink.messages} emails for {len(latencies)} clicks")
+
+        sink.messages = 0
+        clear_cache()
+        start = time.perf_counter()
+        latencies = click_burst(tasks, args.clicks, args.sessions, reminder_outbox.enqueue_task_reminder)
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        counts = database.count_outbox()
+        report("after:  enqueue per click", len(latencies), elapsed)
+        print(f"    click p50 {statistics.median(latencies) * 1000:.2f}ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f}ms, "
+              f"{counts['due']} reminders queued for {len(latencies)} clicks")
+
+        def drain():
+            # Skip the backoff delays by draining as of a time far enough ahead
+            now = time.time()
+            results = []
+            while counts["due"] or counts["waiting"]:
+                batch = reminder_outbox.drain_once(now=now)
+                if not batch:
+                    now += reminder_outbox.OUTBOX_MAX_RETRY_SECONDS
+                results.extend(batch)
+                counts.update(database.count_outbox(now))
+            return results
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            results, seconds = timed(drain)
+        sent = sum(result.sent for result in results)
+        report("after:  outbox drain", sent, seconds)
+        print(f"    {len(results)} attempts, {len(results) - sent} retried, {counts['failed']} failed, "
+              f"{model.requests} model requests, {sink.messages} emails")
+
+
+if __name__ == "__main__":
+    main()
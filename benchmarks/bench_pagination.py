@@ -0,0 +1,61 @@
+"""
+Page latency at increasing depth: get_all_tasks() + slicing, LIMIT/OFFSET, and
+keyset pagination through get_tasks_page().
+
+Usage:
+    python benchmarks/bench_pagination.py --rows 1000000 --page-size 25
+"""
+import argparse
+import time
+
+from common import database, timed, use_temp_database
+from seed import seed_legacy_tasks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=25)
+    parser.add_argument("--sort", default="Deadline", choices=list(database.SORT_ORDERS))
+    parser.add_argument("--filter", default="Pending", choices=["All", "Pending", "Completed"])
+    args = parser.parse_args()
+
+    use_temp_database()
+    seed_legacy_tasks(database.get_connection(), args.rows)
+    database.init_db()
+    conn = database.get_connection()
+
+    total, seconds = timed(database.count_tasks, args.filter)
+    print(f"{total:,} matching tasks, count_tasks() {seconds * 1000:.1f}ms")
+
+    _, seconds = timed(database.get_all_tasks, args.filter, args.sort)
+    print(f"get_all_tasks() full materialization: {seconds * 1000:.1f}ms\n")
+
+    where = " WHERE status = ?" if args.filter != "All" else ""
+    params = (args.filter,) if args.filter != "All" else ()
+    offset_sql = (f"SELECT {database.TASK_COLUMNS} FROM tasks{where} "
+                  f"ORDER BY {database.SORT_ORDERS[args.sort]} LIMIT ? OFFSET ?")
+
+    print(f"{'page':>8} {'OFFSET':>10} {'keyset':>10}")
+    cursor = None
+    page = 1
+    checkpoints = {1, 10, 100, 1000, 10000}
+    max_page = total // args.page_size
+    while page <= max_page:
+        start = time.perf_counter()
+        rows, next_cursor = database.get_tasks_page(args.filter, args.sort, args.page_size, cursor)
+        keyset_ms = (time.perf_counter() - start) * 1000
+        if page in checkpoints:
+            _, offset_s = timed(
+                lambda: conn.execute(offset_sql, params + (args.page_size, (page - 1) * args.page_size)).fetchall()
+            )
+            print(f"{page:>8} {offset_s * 1000:>8.2f}ms {keyset_ms:>8.2f}ms")
+        if next_cursor is None or page >= max(checkpoints):
+            break
+        cursor = next_cursor
+        page += 1
+    database.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Reminder throughput: the one-at-a-time "Send Reminder" path versus
+reminder_dispatcher.dispatch_reminders(), against a local SMTP sink and a fake
+model with fixed latency.
+
+The baseline runs --baseline-count reminders sequentially (model call, then a
+new SMTP connection + login per message) and is extrapolated to --count.
+
+Usage:
+    python benchmarks/bench_reminder_dispatch.py --count 10000 --llm-latency-ms 50 --concurrency 16
+"""
+import argparse
+import contextlib
+import io
+import os
+from datetime import date, timedelta
+
+from common import report, timed
+from fakes import FakeReminderGenerator
+from smtp_sink import SMTPSink
+
+
+def synthetic_upcoming(count):
+    deadline = (date.today() + timedelta(days=2)).isoformat()
+    return [
+        (i, f"Task {i}", f"Description for task {i}", deadline, "High", "Pending",
+         f"user{i % 100}@example.com", "2026-01-01 00:00:00")
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--baseline-count", type=int, default=200)
+    parser.add_argument("--llm-latency-ms", type=float, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    with SMTPSink() as sink:
+        os.environ.update(sink.environ())
+        # Imported after the environment points at the sink
+        from email_sender import build_reminder_message, get_smtp_config, open_smtp_session
+        from reminder_dispatcher import dispatch_reminders
+
+        generate = FakeReminderGenerator(args.llm_latency_ms)
+
+        def sequential(tasks):
+            config = get_smtp_config()
+            for task in tasks:
+                body = generate(task[1], task[2], task[3], task[4])
+                message = build_reminder_message(config["sender"], task[6], task[1], body)
+                with open_smtp_session(config) as server:
+                    server.sendmail(config["sender"], task[6], message)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, seconds = timed(sequential, synthetic_upcoming(args.baseline_count))
+        report("before: sequential, connect per message", args.baseline_count, seconds)
+        print(f"    extrapolated to {args.count}: {seconds * args.count / args.baseline_count:.1f}s")
+
+        sink.connections = sink.logins = 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            results, seconds = timed(
+                dispatch_reminders, synthetic_upcoming(args.count), generate, args.concurrency
+            )
+        report(f"after:  dispatcher, {args.concurrency} concurrent generations", len(results), seconds)
+        failed = [r for r in results if not r.sent]
+        print(f"    sent {len(results) - len(failed)}, failed {len(failed)}, "
+              f"SMTP connections {sink.connections}, logins {sink.logins}")
+
+
+if __name__ == "__main__":
+    main()
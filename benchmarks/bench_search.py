@@ -0,0 +1,68 @@
+"""
+Search latency: search_tasks() on the FTS5 index versus a LIKE '%term%' scan,
+on a large synthetic database.
+
+Usage:
+    python benchmarks/bench_search.py --rows 1000000
+"""
+import argparse
+import statistics
+import time
+
+from common import database, timed, use_temp_database
+from seed import seed_legacy_tasks
+
+QUERIES = ("budget", "rev", "deploy client", "audit 4242", "onboard survey draft")
+
+
+def median_ms(run, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def like_search(conn, query, limit):
+    """A naive ranked search: every word must appear somewhere, title hits first (full scan)"""
+    words = query.split()
+    where = " AND ".join("(title LIKE ? OR description LIKE ?)" for _ in words)
+    rank = " + ".join("(title LIKE ?)" for _ in words)
+    params = [f"%{word}%" for word in words]
+    return conn.execute(
+        f"SELECT {database.TASK_COLUMNS} FROM tasks WHERE {where} ORDER BY {rank} DESC LIMIT ?",
+        [p for p in params for _ in range(2)] + params + [limit]
+    ).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    use_temp_database()
+    conn = database.get_connection()
+    seed_legacy_tasks(conn, args.rows)
+    _, seconds = timed(database.init_db)
+    print(f"{args.rows:,} tasks migrated and indexed in {seconds:.1f}s\n")
+
+    print(f"{'query':<22} {'matches':>9} {'LIKE ranked':>11} {'FTS5 ranked':>12} {'FTS5 Pending':>13}")
+    for query in QUERIES:
+        matches = conn.execute("SELECT COUNT(*) FROM tasks_fts WHERE tasks_fts MATCH ?",
+                               (database._fts_query(query),)).fetchone()[0]
+        like_ms = median_ms(lambda: like_search(conn, query, args.limit), args.repeat)
+        fts_ms = median_ms(lambda: database.search_tasks(query, limit=args.limit), args.repeat)
+        pending_ms = median_ms(lambda: database.search_tasks(query, "Pending", args.limit), args.repeat)
+        print(f"{query:<22} {matches:>9,} {like_ms:>9.1f}ms {fts_ms:>10.1f}ms {pending_ms:>11.1f}ms")
+
+    _, seconds = timed(database.add_task, "Fresh task", "Indexed by trigger", "2030-01-01", "Low", "a@b.c")
+    print(f"\nadd_task() with FTS trigger: {seconds * 1000:.2f}ms; "
+          f"found: {bool(database.search_tasks('fresh trigger'))}")
+    database.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Local similarity index: time to build it from the database, what catching it
+up adds to each new task, similar-task lookups against a brute-force cosine
+scan of every task, and the size of the task-suggestion prompt when it lists
+every completed task versus only the most related ones.
+
+Usage:
+    python benchmarks/bench_similarity.py --rows 100000 --runs 20
+"""
+import argparse
+import math
+import random
+import statistics
+import time
+from collections import Counter
+from datetime import date
+
+from common import database, timed, use_temp_database
+from seed import synthetic_tasks
+
+import ai_features
+import similarity
+
+
+def brute_force_similar(task, limit):
+    """Tokenize every task and score it against task, as a lookup would without an index"""
+    query = Counter(similarity.tokenize(f"{task.title} {task.description}"))
+    scores = []
+    for task_id, title, description in database.iter_task_texts():
+        if task_id == task.id:
+            continue
+        terms = Counter(similarity.tokenize(title) * similarity.TITLE_WEIGHT + similarity.tokenize(description))
+        dot = sum(count * terms[term] for term, count in query.items())
+        if dot:
+            norm = math.sqrt(sum(c * c for c in terms.values()) * sum(c * c for c in query.values()))
+            scores.append((dot / norm, task_id))
+    return sorted(scores, reverse=True)[:limit]
+
+
+def percentiles_ms(samples):
+    samples = sorted(samples)
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.95)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=5, help="similar tasks per lookup")
+    args = parser.parse_args()
+
+    use_temp_database()
+    database.init_db()
+    database.bulk_insert_tasks((
+        (title, description, deadline, priority, email, status, created_at)
+        for title, description, deadline, priority, status, email, created_at in synthetic_tasks(args.rows)
+    ), defer_indexes=True)
+
+    index, seconds = timed(similarity.get_index)
+    print(f"indexed {len(index):,} tasks in {seconds:.2f}s ({len(index._postings):,} terms)\n")
+
+    # Adding a task, then catching the index up as the next lookup does
+    plain, caught_up = [], []
+    for samples, refresh in ((plain, False), (caught_up, True)):
+        for i in range(args.runs * 10):
+            start = time.perf_counter()
+            database.add_task(f"Draft the launch plan {i}", "Outline the release and review steps",
+                              date.today().isoformat(), "Medium", "bench@example.com")
+            if refresh:
+                similarity.get_index()
+            samples.append(time.perf_counter() - start)
+    print(f"{'':<28} {'p50':>10} {'p95':>10}")
+    for label, samples in (("add_task", plain), ("add_task + index catch-up", caught_up)):
+        p50, p95 = percentiles_ms(samples)
+        print(f"{label:<28} {p50:8.3f}ms {p95:8.3f}ms")
+
+    rng = random.Random(7)
+    tasks = database.get_tasks_by_ids(rng.sample(range(1, args.rows + 1), args.runs))
+    indexed = [timed(similarity.similar_tasks, task, args.limit)[1] for task in tasks]
+    scanned = [timed(brute_force_similar, task, args.limit)[1] for task in tasks[:max(1, args.runs // 5)]]
+    print()
+    for label, samples in (("similar tasks (index)", indexed), ("similar tasks (scan)", scanned)):
+        p50, p95 = percentiles_ms(samples)
+        print(f"{label:<28} {p50:8.3f}ms {p95:8.3f}ms")
+
+    # What goes to the model for one round of suggestions
+    all_completed = [row[1] for row in database.iter_tasks("Completed")]
+    context, seconds = timed(similarity.suggestion_context)
+    print(f"\n{'suggestion prompt':<28} {'titles':>10} {'chars':>12} {'~tokens':>10}")
+    for label, titles in (("every completed task", all_completed), ("related (index)", context)):
+        chars = len(ai_features._suggestions_prompt(titles))
+        print(f"{label:<28} {len(titles):>10,} {chars:>12,} {chars // 4:>10,}")
+    print(f"picking the related tasks took {seconds * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
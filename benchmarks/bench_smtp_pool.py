@@ -0,0 +1,63 @@
+"""
+SMTP delivery throughput: a new connection + login per message (the original
+send_reminder_email path) versus the pooled SMTPClient, one message at a time
+and through send_many(), against a local SMTP sink.
+
+Usage:
+    python benchmarks/bench_smtp_pool.py --count 5000 --drop-after 500
+"""
+import argparse
+import os
+
+from common import report, timed
+from smtp_sink import SMTPSink
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--drop-after", type=int, default=None,
+                        help="have the sink drop each connection after N messages")
+    args = parser.parse_args()
+
+    with SMTPSink(drop_after=args.drop_after) as sink:
+        os.environ.update(sink.environ())
+        from email_sender import SMTPClient, build_reminder_message, get_smtp_config, open_smtp_session
+
+        config = get_smtp_config()
+        messages = [
+            (f"user{i}@example.com",
+             build_reminder_message(config["sender"], f"user{i}@example.com", f"Task {i}", "Reminder body\n" * 8))
+            for i in range(args.count)
+        ]
+
+        def connect_per_message():
+            for recipient, message in messages:
+                with open_smtp_session(config) as server:
+                    server.sendmail(config["sender"], recipient, message)
+
+        def pooled_send():
+            client = SMTPClient(config)
+            for recipient, message in messages:
+                client.send(recipient, message)
+            client.close()
+
+        def pooled_send_many():
+            client = SMTPClient(config)
+            results = client.send_many(messages)
+            client.close()
+            return results
+
+        for label, run in (
+            ("before: connect + login per message", connect_per_message),
+            ("after:  SMTPClient.send()", pooled_send),
+            ("after:  SMTPClient.send_many()", pooled_send_many),
+        ):
+            sink.connections = sink.logins = sink.messages = 0
+            _, seconds = timed(run)
+            report(label, sink.messages, seconds)
+            print(f"    connections {sink.connections}, logins {sink.logins}")
+
+
+if __name__ == "__main__":
+    main()
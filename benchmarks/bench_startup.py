@@ -0,0 +1,99 @@
+"""
+Cold start of the Streamlit app: time to first render (a fresh interpreter
+running app.py once through AppTest) and how much of it is spent importing
+modules, from python -X importtime, so nothing is cached between runs.
+
+"lazy" is the app as it is: the Gemini SDK and the SMTP stack are imported on
+first use. "eager" imports them before the app, as app.py used to at the top.
+
+Usage:
+    python benchmarks/bench_startup.py --rows 1000 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from common import REPO_ROOT, database, use_temp_database
+from seed import synthetic_tasks
+
+# What the old top-level imports of ai_features and email_sender pulled in
+EAGER_IMPORTS = ("google.generativeai", "ai_features", "email_sender")
+
+FIRST_RENDER = """
+import json, sys, time
+start = time.perf_counter()
+for name in {preload!r}:
+    __import__(name)
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({app!r}, default_timeout=120)
+app.run()
+print(json.dumps({{"seconds": time.perf_counter() - start, "errors": len(app.exception),
+                  "gemini_loaded": "google.generativeai" in sys.modules}}))
+"""
+
+
+def run_python(args, cwd):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, METRICS_PORT="0")
+    return subprocess.run([sys.executable, *args], cwd=cwd, env=env, capture_output=True, text=True, check=True)
+
+
+def cold_start(preload, cwd):
+    """
+    Render app.py once in a fresh interpreter
+
+    Returns:
+        (seconds to first render, {top-level module: cumulative import seconds}, Gemini SDK loaded)
+    """
+    code = FIRST_RENDER.format(preload=preload, app=os.path.join(REPO_ROOT, "app.py"))
+    result = run_python(["-X", "importtime", "-c", code], cwd)
+    render = json.loads(result.stdout.splitlines()[-1])
+    if render["errors"]:
+        raise SystemExit("app.py raised an exception on its first run")
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Nested imports are indented below the module that triggered them; site and
+        # encodings are interpreter startup, before the timer starts
+        if not name[1:].startswith(" ") and name.strip() not in ("site", "encodings"):
+            imports[name.strip()] = int(cumulative) / 1e6
+    return render["seconds"], imports, render["gemini_loaded"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="heaviest imports to list")
+    args = parser.parse_args()
+
+    # The app opens todo_app.db in its working directory
+    path = use_temp_database("todo_app.db")
+    database.init_db()
+    database.bulk_insert_tasks(
+        ((title, description, deadline, priority, email, status, created_at)
+         for title, description, deadline, priority, status, email, created_at in synthetic_tasks(args.rows)),
+        defer_indexes=True
+    )
+    database.close_connections()
+    cwd = os.path.dirname(path)
+
+    print(f"{args.rows:,} tasks, median of {args.runs} fresh processes\n")
+    for label, preload in (("eager", EAGER_IMPORTS), ("lazy", ())):
+        runs = [cold_start(preload, cwd) for _ in range(args.runs)]
+        render = statistics.median(seconds for seconds, _, _ in runs)
+        imports = statistics.median(sum(times.values()) for _, times, _ in runs)
+        print(f"{label}: first render {render * 1000:7.0f}ms   of which imports {imports * 1000:7.0f}ms   "
+              f"Gemini SDK loaded: {runs[0][2]}")
+        heaviest = sorted(runs[0][1].items(), key=lambda item: item[1], reverse=True)[:args.top]
+        for name, seconds in heaviest:
+            print(f"    {name:<32} {seconds * 1000:7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Reopening a breakdown: streaming it from the model (fake, with hosted-model
+latency), replaying it from the AI response cache and re-parsing it, versus
+reading the stored subtasks with get_subtasks() and ordering them with
+topological_order()/critical_path(), on a database where every task has a
+stored breakdown.
+
+Usage:
+    python benchmarks/bench_subtasks.py --tasks 100000 --reads 2000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from common import database, use_temp_database
+from fakes import FakeGeminiModel
+from seed import synthetic_tasks
+
+import ai_features
+from ai_cache import clear_cache
+from breakdown import critical_path, parse_breakdown, topological_order
+from llm_client import LLMClient
+
+
+def median_ms(func, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--model-calls", type=int, default=5)
+    args = parser.parse_args()
+
+    use_temp_database()
+    database.init_db()
+    database.bulk_insert_tasks(
+        ((title, description, deadline, priority, email, status, created_at)
+         for title, description, deadline, priority, status, email, created_at in synthetic_tasks(args.tasks)),
+        defer_indexes=True
+    )
+
+    model = FakeGeminiModel()
+    ai_features.set_model(model)
+    ai_features.set_client(LLMClient(ai_features.get_model, requests_per_minute=1e9, burst=1_000_000))
+
+    subtasks = parse_breakdown(model._breakdown_for("Benchmark task"))
+    start = time.perf_counter()
+    for task_id in range(1, args.tasks + 1):
+        database.save_subtasks(task_id, subtasks)
+    print(f"stored {len(subtasks)} subtasks for each of {args.tasks:,} tasks "
+          f"in {time.perf_counter() - start:.1f}s\n")
+
+    task_ids = [(random.randint(1, args.tasks),) for _ in range(args.reads)]
+    titles = [(f"Task {n}", "Plan and ship it") for n in range(args.model_calls)]
+
+    def stream(title, description):
+        return parse_breakdown("".join(ai_features.stream_task_breakdown(title, description)))
+
+    def stored(task_id):
+        rows = database.get_subtasks(task_id)
+        return topological_order(rows), critical_path(rows)
+
+    clear_cache()
+    print(f"{'model stream + parse':<36} {median_ms(stream, titles):10.3f}ms")
+    print(f"{'AI cache replay + parse':<36} {median_ms(stream, titles * (args.reads // len(titles))):10.3f}ms")
+    print(f"{'stored subtasks + DAG':<36} {median_ms(stored, task_ids):10.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Per-row urgency cost: the app's old per-card date math (strptime, now(), branch
+on days left) over raw tuples versus Task records whose days left and urgency
+bucket come from the query, and an "Overdue" view found by scanning every task
+in Python versus the indexed urgency filter.
+
+Usage:
+    python benchmarks/bench_task_records.py --rows 1000000 --pages 200
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime
+
+from common import database, timed, use_temp_database
+from seed import synthetic_tasks
+
+
+def legacy_urgency(task):
+    """What render_task_card used to work out for every task on every rerun"""
+    task_id, title, description, deadline, priority, status, email, created_at = task
+    deadline_date = datetime.strptime(deadline, "%Y-%m-%d").date()
+    days_left = (deadline_date - datetime.now().date()).days
+    priority_emoji = {"Low": "🟦", "Medium": "🟧", "High": "🟥"}
+    if days_left < 0:
+        return "🔴", f"Overdue by {abs(days_left)} days", priority_emoji[priority]
+    elif days_left == 0:
+        return "🟠", "Due today!", priority_emoji[priority]
+    elif days_left <= 3:
+        return "🟡", f"Due in {days_left} days", priority_emoji[priority]
+    return "🟢", f"Due in {days_left} days", priority_emoji[priority]
+
+
+def legacy_page(conn, page_size):
+    rows = conn.execute(f"""
+        SELECT {database.TASK_COLUMNS} FROM tasks ORDER BY deadline_ts, id LIMIT ?
+    """, (page_size,)).fetchall()
+    return [legacy_urgency(row) for row in rows]
+
+
+def median_ms(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=200, help="page reads timed per variant")
+    args = parser.parse_args()
+
+    use_temp_database()
+    database.init_db()
+    database.bulk_insert_tasks(
+        ((title, description, deadline, priority, email, status, created_at)
+         for title, description, deadline, priority, status, email, created_at in synthetic_tasks(args.rows)),
+        defer_indexes=True
+    )
+    conn = database.get_connection()
+
+    legacy = median_ms(lambda: legacy_page(conn, args.page_size), args.pages)
+    records = median_ms(lambda: database.get_tasks_page("All", "Deadline", args.page_size), args.pages)
+    print(f"{args.rows:,} tasks, page of {args.page_size}, median of {args.pages} reads")
+    print(f"raw rows + per-row date math: {legacy:8.3f}ms")
+    print(f"Task records from the query:  {records:8.3f}ms\n")
+
+    def scan_overdue():
+        return [row for row in conn.execute(f"SELECT {database.TASK_COLUMNS} FROM tasks WHERE status = 'Pending'")
+                if legacy_urgency(row)[0] == "🔴"]
+
+    overdue, scan_seconds = timed(scan_overdue)
+    count, count_seconds = timed(database.count_tasks, "Pending", "Overdue")
+    (page, _), page_seconds = timed(database.get_tasks_page, "Pending", "Deadline", args.page_size, None, "Overdue")
+    print(f"pending overdue tasks: {len(overdue):,} (indexed count {count:,})")
+    print(f"Python scan of every pending task:     {scan_seconds * 1000:10.1f}ms")
+    print(f"count_tasks(urgency='Overdue'):         {count_seconds * 1000:10.1f}ms")
+    print(f"first page, urgency='Overdue':          {page_seconds * 1000:10.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
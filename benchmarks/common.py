@@ -0,0 +1,43 @@
+"""
+Shared helpers for the standalone benchmark scripts.
+
+Every script can be run directly from the repository root, e.g.
+``python benchmarks/bench_db_concurrency.py``.
+"""
+import os
+import sys
+import tempfile
+import time
+
+# Make the app modules importable when running a script from any directory
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import database
+
+
+def use_temp_database(name="bench.db"):
+    """
+    Point database.py at a fresh database file in a temporary directory
+
+    Returns:
+        The path of the new database file
+    """
+    path = os.path.join(tempfile.mkdtemp(prefix="todo_bench_"), name)
+    database.close_connections()
+    database.DATABASE_NAME = path
+    return path
+
+
+def timed(func, *args, **kwargs):
+    """Run func once and return (result, elapsed_seconds)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def report(label, ops, seconds):
+    """Print a single aligned ops/sec line"""
+    rate = ops / seconds if seconds else float("inf")
+    print(f"{label:<48} {ops:>9} ops  {seconds:8.3f}s  {rate:>12,.0f} ops/sec")
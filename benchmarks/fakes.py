@@ -0,0 +1,144 @@
+"""
+Stand-ins for the Gemini client used by benchmarks.
+"""
+import random
+import time
+
+
+class FakeReminderGenerator:
+    """Drop-in for generate_reminder_email that sleeps to mimic model latency"""
+
+    def __init__(self, latency_ms=50):
+        self.latency = latency_ms / 1000
+        self.calls = 0
+
+    def __call__(self, task_title, task_description, deadline, priority):
+        self.calls += 1
+        time.sleep(self.latency)
+        return (
+            f"Hi there,\n\nThis is a friendly reminder about \"{task_title}\" "
+            f"({priority} priority), due on {deadline}.\n\n{task_description}\n\n"
+            "You've got this!\n\nKumar Arpit"
+        )
+
+
+class _FakeUsage:
+    def __init__(self, prompt_token_count, candidates_token_count):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+
+
+class _FakeResponse:
+    def __init__(self, text, prompt):
+        self.text = text
+        self.usage_metadata = _FakeUsage(len(prompt) // 4, len(text) // 4)
+
+
+class _FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """
+    Local stand-in for genai.GenerativeModel, installed with ai_features.set_model()
+
+    Latency is a fixed per-request overhead plus a per-output-token cost, roughly
+    how a hosted model behaves; stream=True yields the text in small chunks.
+    Batch prompts (JSON array requests) are answered with a JSON array;
+    drop_every=N omits every Nth item and corrupt=True returns invalid JSON, to
+    exercise the per-item fallback.
+    """
+
+    def __init__(self, request_ms=300, per_token_ms=0.5, drop_every=None, corrupt=False):
+        self.request_ms = request_ms
+        self.per_token_ms = per_token_ms
+        self.drop_every = drop_every
+        self.corrupt = corrupt
+        self.requests = 0
+
+    def _reply_for(self, task):
+        if "title" in task:
+            return self._breakdown_for(task["title"])
+        return f"Hi there,\n\nA quick note about \"{task['task']}\". You've got this!\n\nKumar Arpit"
+
+    def _breakdown_for(self, title):
+        steps = ("Clarify requirements", "Design the approach", "Build the core pieces",
+                 "Test end to end", "Review and polish", "Ship and follow up")
+        lines = [f"## Analysis\n\n\"{title}\" splits naturally into design, build and release work.\n",
+                 "## Subtasks\n"]
+        for number, step in enumerate(steps, start=1):
+            depends = f" (depends on {number - 1})" if number > 1 else ""
+            lines.append(f"{number}. **{step}** - Estimated time: {number + 1} hours{depends}")
+        lines.append("\n## Tips\n\n- Timebox each step\n- Share progress early")
+        return "\n".join(lines)
+
+    def generate_content(self, prompt, **kwargs):
+        import json
+
+        self.requests += 1
+        if "Respond with only a JSON array" in prompt:
+            tasks = json.loads(prompt[prompt.index("Tasks:\n") + len("Tasks:\n"):])
+            field = "email" if '"email"' in prompt else "breakdown"
+            items = [
+                {"id": task["id"], field: self._reply_for(task)}
+                for position, task in enumerate(tasks, start=1)
+                if not (self.drop_every and position % self.drop_every == 0)
+            ]
+            text = "not json" if self.corrupt else "```json\n" + json.dumps(items) + "\n```"
+        elif "Based on these completed tasks:" in prompt:
+            done = [line[2:] for line in prompt.splitlines() if line.startswith("- ")]
+            text = "\n".join(f"- Follow up on {title}" for title in done[:4]) or "- Plan the week"
+        elif "Task Title: " in prompt:
+            text = self._breakdown_for(prompt.split("Task Title: ", 1)[1].split("\n", 1)[0])
+        else:
+            title = prompt.split("Task: ", 1)[-1].split("\n", 1)[0] if "Task: " in prompt else "task"
+            text = self._reply_for({"task": title})
+        if kwargs.get("stream"):
+            return self._stream(text)
+        time.sleep((self.request_ms + self.per_token_ms * len(text) / 4) / 1000)
+        return _FakeResponse(text, prompt)
+
+    def _stream(self, text, chunk_chars=40):
+        time.sleep(self.request_ms / 1000)
+        for start in range(0, len(text), chunk_chars):
+            chunk = text[start:start + chunk_chars]
+            time.sleep(self.per_token_ms * len(chunk) / 4 / 1000)
+            yield _FakeChunk(chunk)
+
+
+class FakeAPIError(Exception):
+    """An API error carrying an HTTP status in .code, like google.api_core's exceptions"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class FlakyModel:
+    """
+    Wraps a fake model and injects failures: error_rate of requests raise a 503,
+    quota_rate raise a 429, and hang_rate stall for hang_seconds before answering.
+    Setting down=True makes every request fail, as in an outage.
+    """
+
+    def __init__(self, model, error_rate=0.0, quota_rate=0.0, hang_rate=0.0, hang_seconds=5.0, seed=7):
+        self.model = model
+        self.error_rate = error_rate
+        self.quota_rate = quota_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.down = False
+        self.requests = 0
+        self._rng = random.Random(seed)
+
+    def generate_content(self, prompt, **kwargs):
+        self.requests += 1
+        roll = self._rng.random()
+        if self.down or roll < self.error_rate:
+            raise FakeAPIError(503, "The model is overloaded. Please try again later.")
+        if roll < self.error_rate + self.quota_rate:
+            raise FakeAPIError(429, "Resource has been exhausted (e.g. check quota).")
+        if roll < self.error_rate + self.quota_rate + self.hang_rate:
+            time.sleep(self.hang_seconds)
+        return self.model.generate_content(prompt, **kwargs)
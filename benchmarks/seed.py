@@ -0,0 +1,63 @@
+"""
+Synthetic task data for benchmarks.
+"""
+import random
+from datetime import date, timedelta
+
+PRIORITIES = ("Low", "Medium", "High")
+STATUSES = ("Pending", "Completed")
+WORDS = (
+    "report", "design", "review", "deploy", "budget", "meeting", "client", "draft",
+    "invoice", "release", "migrate", "refactor", "backup", "onboard", "survey", "audit",
+)
+
+
+def synthetic_tasks(count, seed=42, start=None):
+    """Yield (title, description, deadline, priority, status, email, created_at) tuples"""
+    rng = random.Random(seed)
+    start = start or date.today() - timedelta(days=180)
+    for i in range(count):
+        words = rng.sample(WORDS, 3)
+        created = start + timedelta(days=rng.randrange(360))
+        deadline = created + timedelta(days=rng.randrange(-10, 60))
+        yield (
+            f"{words[0].title()} the {words[1]} {i}",
+            f"Prepare and {words[2]} the {words[1]} for task {i}",
+            deadline.isoformat(),
+            rng.choice(PRIORITIES),
+            rng.choice(STATUSES),
+            f"user{i % 500}@example.com",
+            f"{created.isoformat()} {rng.randrange(24):02d}:{rng.randrange(60):02d}:00",
+        )
+
+
+def seed_legacy_tasks(conn, count, batch_size=50000):
+    """Create the original (version 1) tasks table and fill it with count rows"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            deadline TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            status TEXT DEFAULT 'Pending',
+            email TEXT NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    batch = []
+    for row in synthetic_tasks(count):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            _insert_legacy(conn, batch)
+            batch = []
+    if batch:
+        _insert_legacy(conn, batch)
+
+
+def _insert_legacy(conn, rows):
+    with conn:
+        conn.executemany("""
+            INSERT INTO tasks (title, description, deadline, priority, status, email, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
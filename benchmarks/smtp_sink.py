@@ -0,0 +1,117 @@
+"""
+A minimal local SMTP server that accepts and counts messages, for benchmarks.
+
+It speaks just enough ESMTP for smtplib: EHLO/HELO, AUTH PLAIN/LOGIN (any
+credentials), MAIL, RCPT, DATA, RSET, NOOP and QUIT. STARTTLS is not offered,
+so point the app at it with SMTP_USE_TLS=false. drop_after=N makes it close
+each connection without warning after N messages. The recipients of every
+accepted message are kept in .recipients.
+"""
+import socketserver
+import threading
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        sink = self.server.sink
+        received = 0
+        recipients = []
+        with sink.lock:
+            sink.connections += 1
+        self.reply("220 localhost benchmark sink ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.wfile.write(b"250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+            elif verb == "HELO":
+                self.reply("250 localhost")
+            elif verb == "AUTH":
+                parts = command.split()
+                if len(parts) == 2 and parts[1].upper() == "LOGIN":
+                    self.reply("334 VXNlcm5hbWU6")
+                    self.rfile.readline()
+                    self.reply("334 UGFzc3dvcmQ6")
+                    self.rfile.readline()
+                elif len(parts) == 2:
+                    self.reply("334 ")
+                    self.rfile.readline()
+                with sink.lock:
+                    sink.logins += 1
+                self.reply("235 2.7.0 Authentication successful")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[-1].strip(" <>"))
+                self.reply("250 OK")
+            elif verb in ("MAIL", "RSET"):
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "NOOP":
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data == b".\r\n":
+                        break
+                    size += len(data)
+                with sink.lock:
+                    sink.messages += 1
+                    sink.bytes += size
+                    sink.recipients.extend(recipients)
+                self.reply("250 OK queued")
+                received += 1
+                if sink.drop_after and received >= sink.drop_after:
+                    # Simulate a server that silently closes long-lived sessions
+                    return
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink:
+    """Run the sink on a background thread; use as a context manager"""
+
+    def __init__(self, host="127.0.0.1", port=0, drop_after=None):
+        self.drop_after = drop_after
+        self.lock = threading.Lock()
+        self.messages = 0
+        self.bytes = 0
+        self.connections = 0
+        self.logins = 0
+        self.recipients = []
+        self._server = _ThreadingServer((host, port), _SMTPHandler)
+        self._server.sink = self
+        self.host, self.port = self._server.server_address
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def environ(self):
+        """Environment variables pointing email_sender.py at this sink"""
+        return {
+            "SMTP_SERVER": self.host,
+            "SMTP_PORT": str(self.port),
+            "SMTP_USE_TLS": "false",
+            "SENDER_EMAIL": "todo-app@example.com",
+            "SENDER_PASSWORD": "benchmark",
+        }
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
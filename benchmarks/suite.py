@@ -0,0 +1,231 @@
+"""
+Reproducible benchmark suite for the app's hot paths.
+
+For each database size, a fresh database is seeded with deterministic synthetic
+tasks and the suite times add_task, get_all_tasks and get_tasks_page for every
+filter/sort combination, get_upcoming_tasks, update_task_status, delete_task,
+search_tasks and full app.py runs through Streamlit's AppTest. It also times
+send_reminder_email against a local SMTP sink. Results are written as JSON;
+compare two result files to spot regressions.
+
+Usage:
+    python benchmarks/suite.py run --sizes 1000,100000,1000000 --output results.json
+    python benchmarks/suite.py compare baseline.json results.json --threshold 10
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+# The app would otherwise start its metrics endpoint inside the benchmark process
+os.environ.setdefault("METRICS_PORT", "0")
+
+from common import REPO_ROOT, database, use_temp_database
+from seed import synthetic_tasks
+from smtp_sink import SMTPSink
+
+FILTERS = ("All", "Pending", "Completed")
+SORTS = tuple(database.SORT_ORDERS)
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+
+
+def summarize(samples):
+    """Reduce per-call timings (seconds) to the statistics stored in the results file"""
+    samples_ms = sorted(sample * 1000 for sample in samples)
+    return {
+        "n": len(samples_ms),
+        "median_ms": round(statistics.median(samples_ms), 4),
+        "mean_ms": round(statistics.fmean(samples_ms), 4),
+        "min_ms": round(samples_ms[0], 4),
+        "p95_ms": round(samples_ms[math.ceil(len(samples_ms) * 0.95) - 1], 4),
+    }
+
+
+def sample(func, args_list):
+    """Call func once per argument tuple, returning the individual call times"""
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def seed_database(size):
+    use_temp_database()
+    database.init_db()
+    database.bulk_insert_tasks(
+        ((title, description, deadline, priority, email, status, created_at)
+         for title, description, deadline, priority, status, email, created_at in synthetic_tasks(size)),
+        defer_indexes=True
+    )
+
+
+def bench_database(size, repeat, writes, record):
+    """Time the database.py entry points against a database of size tasks"""
+    seed_database(size)
+
+    for filter_status in FILTERS:
+        for sort_by in SORTS:
+            record(f"{size}/get_all_tasks[{filter_status},{sort_by}]",
+                   sample(database.get_all_tasks, [(filter_status, sort_by)] * repeat))
+            record(f"{size}/get_tasks_page[{filter_status},{sort_by}]",
+                   sample(database.get_tasks_page, [(filter_status, sort_by, 25)] * repeat * 10))
+
+    record(f"{size}/get_upcoming_tasks", sample(database.get_upcoming_tasks, [(3,)] * repeat * 10))
+    record(f"{size}/search_tasks", sample(database.search_tasks, [("budget review",)] * repeat * 10))
+    record(f"{size}/add_task", sample(database.add_task, [
+        (f"Benchmark task {i}", "Added by the benchmark suite", "2030-01-01", "Medium", "bench@example.com")
+        for i in range(writes)
+    ]))
+
+    task_ids = list(range(1, size + 1, max(1, size // writes)))[:writes]
+    record(f"{size}/update_task_status", sample(database.update_task_status, [
+        (task_id, "Completed" if i % 2 else "Pending") for i, task_id in enumerate(task_ids)
+    ]))
+    record(f"{size}/delete_task", sample(database.delete_task, [(task_id,) for task_id in task_ids]))
+
+
+def bench_app(size, reruns, record):
+    """Time app.py runs with AppTest against a database of size tasks"""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    seed_database(size)
+    # Cached reads are keyed on the write version, which restarts with each database;
+    # clearing caches outside a server logs a warning
+    logging.getLogger("streamlit.runtime.caching.cache_data_api").setLevel(logging.ERROR)
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+    app = AppTest.from_file(os.path.join(REPO_ROOT, "app.py"), default_timeout=120)
+    start = time.perf_counter()
+    app.run()
+    first = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    record(f"{size}/app_first_run", [first])
+    record(f"{size}/app_rerun", sample(app.run, [()] * reruns))
+
+
+def bench_email(count, record):
+    """Time send_reminder_email end to end (render + pooled SMTP send) against a local sink"""
+    with SMTPSink() as sink:
+        os.environ.update(sink.environ())
+        import email_sender
+        email_sender.reset_smtp_client()
+        body = "Hi there,\n\nA friendly reminder about your task.\n\nKumar Arpit\n" * 3
+        with contextlib.redirect_stdout(io.StringIO()):
+            samples = sample(email_sender.send_reminder_email, [
+                (f"user{i}@example.com", f"Task {i}", body) for i in range(count)
+            ])
+        email_sender.reset_smtp_client()
+    if sink.messages != count:
+        raise RuntimeError(f"SMTP sink received {sink.messages} of {count} messages")
+    record("send_reminder_email", samples)
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def run(args):
+    results = {}
+
+    def record(name, samples):
+        results[name] = summarize(samples)
+        stats = results[name]
+        print(f"{name:<56} median {stats['median_ms']:>10.3f}ms  p95 {stats['p95_ms']:>10.3f}ms  n={stats['n']}")
+
+    for size in args.sizes:
+        bench_database(size, args.repeat, args.writes, record)
+        if not args.skip_app:
+            bench_app(size, args.reruns, record)
+    bench_email(args.writes, record)
+
+    document = {"environment": environment(), "settings": {
+        "sizes": args.sizes, "repeat": args.repeat, "writes": args.writes, "reruns": args.reruns,
+    }, "results": results}
+    with open(args.output, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+    print(f"\nWrote {len(results)} results to {args.output}")
+    return 0
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    print(f"baseline: {baseline['environment'].get('commit')}  {baseline['environment']['timestamp']}")
+    print(f"current:  {current['environment'].get('commit')}  {current['environment']['timestamp']}\n")
+    print(f"{'benchmark':<56} {'baseline':>11} {'current':>11} {'change':>8}")
+
+    regressions = 0
+    for name in sorted(set(baseline["results"]) & set(current["results"])):
+        before = baseline["results"][name]["median_ms"]
+        after = current["results"][name]["median_ms"]
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(f"{name:<56} {before:>9.3f}ms {after:>9.3f}ms {change:>+7.1f}%{flag}")
+
+    for name in sorted(set(baseline["results"]) ^ set(current["results"])):
+        print(f"{name:<56} only in {'baseline' if name in baseline['results'] else 'current'}")
+
+    print(f"\n{regressions} regressions beyond {args.threshold:g}%")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the suite and write a results file")
+    run_parser.add_argument("--sizes", type=lambda text: [int(size) for size in text.split(",")],
+                            default=list(DEFAULT_SIZES), help="comma-separated database sizes")
+    run_parser.add_argument("--repeat", type=int, default=3, help="repetitions of each full-table read")
+    run_parser.add_argument("--writes", type=int, default=200, help="calls per write benchmark")
+    run_parser.add_argument("--reruns", type=int, default=10, help="AppTest reruns per size")
+    run_parser.add_argument("--skip-app", action="store_true", help="skip the AppTest render benchmarks")
+    run_parser.add_argument("--output", default="benchmark-results.json")
+
+    compare_parser = subparsers.add_parser("compare", help="compare two results files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0,
+                                help="percent slowdown in the median reported as a regression")
+
+    args = parser.parse_args()
+    return run(args) if args.command == "run" else compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+import heapq
+import re
+
+from database import Subtask
+
+# Minutes per unit for subtask estimates; days and weeks are working days and weeks
+_MINUTES_PER_UNIT = {"m": 1, "h": 60, "d": 8 * 60, "w": 5 * 8 * 60}
+
+# "1. ...", "2) ...", "- 3. ..." or "**4.** ..."
+_NUMBERED_LINE = re.compile(r"^\s*(?:[-*]\s+)?(?:\*\*)?(\d{1,3})[.)](?:\*\*)?\s+(.+)$")
+
+# "3 hours", "1.5h", "2-3 days" (the upper bound is used), "30 min"
+_ESTIMATE = re.compile(
+    r"(\d+(?:\.\d+)?)(?:\s*(?:-|–|to)\s*(\d+(?:\.\d+)?))?\s*"
+    r"(minutes?|mins?|m|hours?|hrs?|h|days?|d|weeks?|wks?|w)\b",
+    re.IGNORECASE
+)
+
+# "(depends on: 1, 2)", "depends on 3 and 4", "Dependencies: none"
+_DEPENDENCIES = re.compile(
+    r"\(?\s*(?:depends on\b|dependencies\s*:)\s*:?((?:[\s,&#]|and\b|steps?\b|subtasks?\b|none\b|n/a\b|\d+)*)\)?",
+    re.IGNORECASE
+)
+
+# Separators between a subtask title and its details, when the title is not in bold
+_TITLE_END = re.compile(r"\s+[-–—|]\s+|\s*\(")
+
+_BOLD_TITLE = re.compile(r"^\s*(?:\*\*|__)(.+?)(?:\*\*|__)")
+
+def parse_estimate(text):
+    """Return the first time estimate in text as minutes, or None if there is none"""
+    match = _ESTIMATE.search(text)
+    if not match:
+        return None
+    amount = float(match.group(2) or match.group(1))
+    return round(amount * _MINUTES_PER_UNIT[match.group(3)[0].lower()])
+
+def _parse_line(position, text):
+    dependencies = _DEPENDENCIES.search(text)
+    depends_on = ()
+    if dependencies:
+        depends_on = tuple(int(number) for number in re.findall(r"\d+", dependencies.group(1)))
+        text = text[:dependencies.start()] + " " + text[dependencies.end():]
+    
+    bold = _BOLD_TITLE.match(text)
+    title = bold.group(1) if bold else _TITLE_END.split(text, 1)[0]
+    return Subtask(position, title.replace("**", "").strip(" .,:;-*_`"), parse_estimate(text), depends_on, False)
+
+def _numbered_lists(markdown):
+    """Yield each numbered list in the text as a list of (number, item text) pairs"""
+    items = []
+    for line in markdown.splitlines():
+        match = _NUMBERED_LINE.match(line)
+        if match:
+            items.append((int(match.group(1)), match.group(2)))
+        elif line.strip() and items:
+            # Any other non-blank line (a heading, a paragraph) ends the list
+            yield items
+            items = []
+    if items:
+        yield items
+
+def parse_breakdown(markdown):
+    """
+    Extract structured subtasks from a breakdown written by generate_task_breakdown()
+    
+    The subtasks are the first numbered list that states dependencies or,
+    failing that, the first one with time estimates; other numbered lists, such
+    as tips, are ignored. References to unknown steps are dropped, and if the
+    remaining dependencies contain a cycle only those on earlier steps are
+    kept, so the result is always a DAG.
+    
+    Args:
+        markdown: The breakdown text
+    
+    Returns:
+        A list of Subtask in list order, empty if no subtasks were found
+    """
+    lists = list(_numbered_lists(markdown))
+    items = next((items for items in lists if any(_DEPENDENCIES.search(text) for _, text in items)), None)
+    if items is None:
+        items = next((items for items in lists if any(_ESTIMATE.search(text) for _, text in items)), [])
+    
+    parsed = {}
+    for number, text in items:
+        if number not in parsed:
+            parsed[number] = _parse_line(number, text)
+    subtasks = [subtask for subtask in parsed.values() if subtask.title]
+    
+    positions = {subtask.position for subtask in subtasks}
+    subtasks = [
+        subtask._replace(depends_on=tuple(sorted((set(subtask.depends_on) & positions) - {subtask.position})))
+        for subtask in subtasks
+    ]
+    try:
+        topological_order(subtasks)
+    except ValueError:
+        subtasks = [
+            subtask._replace(depends_on=tuple(p for p in subtask.depends_on if p < subtask.position))
+            for subtask in subtasks
+        ]
+    return subtasks
+
+def topological_order(subtasks):
+    """
+    Order subtasks so each comes after everything it depends on
+    
+    Among subtasks that are ready at the same time, lower positions come first.
+    
+    Returns:
+        The subtasks, reordered
+    
+    Raises:
+        ValueError: If the dependencies contain a cycle
+    """
+    by_position = {subtask.position: subtask for subtask in subtasks}
+    waiting_on = {subtask.position: set(subtask.depends_on) & by_position.keys() for subtask in subtasks}
+    dependents = {position: [] for position in by_position}
+    for position, depends_on in waiting_on.items():
+        for dependency in depends_on:
+            dependents[dependency].append(position)
+    
+    ready = [position for position, depends_on in waiting_on.items() if not depends_on]
+    heapq.heapify(ready)
+    ordered = []
+    while ready:
+        position = heapq.heappop(ready)
+        ordered.append(by_position[position])
+        for dependent in dependents[position]:
+            waiting_on[dependent].discard(position)
+            if not waiting_on[dependent]:
+                heapq.heappush(ready, dependent)
+    
+    if len(ordered) != len(by_position):
+        raise ValueError("subtask dependencies contain a cycle")
+    return ordered
+
+def critical_path(subtasks):
+    """
+    Find the chain of dependent subtasks with the largest total estimate
+    
+    Subtasks without an estimate count as zero minutes. With unlimited people
+    working in parallel, this chain is how long the whole task takes.
+    
+    Returns:
+        (subtasks on the path in order, total minutes)
+    """
+    finish = {}
+    previous = {}
+    for subtask in topological_order(subtasks):
+        start = 0
+        for dependency in subtask.depends_on:
+            # The first dependency is on the path even if it takes no time
+            if dependency in finish and (subtask.position not in previous or finish[dependency] > start):
+                start = finish[dependency]
+                previous[subtask.position] = dependency
+        finish[subtask.position] = start + (subtask.estimate_minutes or 0)
+    
+    if not finish:
+        return [], 0
+    
+    by_position = {subtask.position: subtask for subtask in subtasks}
+    # Ties go to the lowest position, like topological_order
+    position = max(finish, key=lambda p: (finish[p], -p))
+    total = finish[position]
+    path = [by_position[position]]
+    while position in previous:
+        position = previous[position]
+        path.append(by_position[position])
+    return path[::-1], total
+
+def format_minutes(minutes):
+    """Format an estimate for display, e.g. 90 -> '1h 30m'"""
+    if minutes is None:
+        return "no estimate"
+    hours, minutes = divmod(minutes, 60)
+    if hours and minutes:
+        return f"{hours}h {minutes}m"
+    return f"{hours}h" if hours else f"{minutes}m"
@@ -1,19 +1,312 @@
+import calendar
+import re
 import sqlite3
-from datetime import datetime
+import threading
+import time
+import weakref
+from datetime import date, datetime, timedelta
+from typing import NamedTuple, Optional, Tuple
+
+import metrics
 
 DATABASE_NAME = "todo_app.db"
 
-def get_connection():
-    """Create and return a database connection"""
-    conn = sqlite3.connect(DATABASE_NAME)
+# How long a writer waits for a competing lock before raising "database is locked"
+BUSY_TIMEOUT_MS = 5000
+
+# Connection tuning applied once when a pooled connection is opened.
+# WAL lets readers proceed while a writer commits, and NORMAL sync is
+# durable in WAL mode except for the last commit on power loss.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",        # ~16 MB page cache per connection
+    "PRAGMA mmap_size = 268435456",      # 256 MB memory-mapped I/O
+    "PRAGMA temp_store = MEMORY",
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+)
+
+# One connection per thread, held in a thread-local so it is never shared
+# concurrently. Streamlit runs each rerun on a new script thread, so a
+# connection is closed as soon as the thread that opened it exits; otherwise
+# every interaction would leave an open connection (and its file handles) behind.
+_local = threading.local()
+_pool_lock = threading.Lock()
+_pooled_connections = set()
+_pool_generation = 0
+
+class _PooledConnection:
+    """Thread-local holder of a connection; closes it when the thread's locals are released"""
+    
+    def __init__(self, conn, pool_key):
+        self.conn = conn
+        self.pool_key = pool_key
+        # Daemon threads (e.g. the reminder worker) may still be querying at interpreter exit
+        weakref.finalize(self, _release_connection, conn).atexit = False
+
+def _release_connection(conn):
+    with _pool_lock:
+        _pooled_connections.discard(conn)
+    conn.close()
+
+def _open_connection():
+    """Open a new tuned connection to DATABASE_NAME"""
+    conn = sqlite3.connect(
+        DATABASE_NAME,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False
+    )
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
-def init_db():
-    """Initialize the database with tasks table"""
-    conn = get_connection()
-    cursor = conn.cursor()
+def get_connection():
+    """Return this thread's pooled database connection, opening it on first use"""
+    pooled = getattr(_local, "pooled", None)
+    pool_key = (DATABASE_NAME, _pool_generation)
+    
+    # Reopen if the pool was closed or the database file was switched
+    if pooled is None or pooled.pool_key != pool_key:
+        conn = _open_connection()
+        with _pool_lock:
+            _pooled_connections.add(conn)
+        # Replacing the holder releases the previous connection, if any
+        pooled = _local.pooled = _PooledConnection(conn, pool_key)
+    
+    return pooled.conn
+
+def open_connection_count():
+    """Number of pooled connections currently open, across all threads"""
+    with _pool_lock:
+        return len(_pooled_connections)
+
+def close_connections():
+    """Close every pooled connection (call on shutdown or after switching databases)"""
+    global _pool_generation
+    
+    with _pool_lock:
+        _pool_generation += 1
+        while _pooled_connections:
+            _pooled_connections.pop().close()
+
+# Sort rank stored alongside the priority label so "Sort by Priority" can use an index
+PRIORITY_RANKS = {"High": 1, "Medium": 2, "Low": 3}
+
+# Columns returned to callers, in the order app.py unpacks them
+TASK_COLUMNS = "id, title, description, deadline, priority, status, email, created_at"
+
+# Tasks due within this many days (after today) are "Due soon"
+DUE_SOON_DAYS = 3
+
+# Urgency filters offered by the UI, as [start, end) day offsets from today (None = unbounded);
+# each is a deadline_ts range, so it is served by the deadline indexes, over pending tasks only
+URGENCY_DAY_RANGES = {
+    "Overdue": (None, 0),
+    "Due today": (0, 1),
+    "Due soon": (1, DUE_SOON_DAYS + 1),
+}
+
+# Days left and urgency bucket, worked out by SQLite for every task row; ?1 is today's
+# deadline_ts, so it must be the first parameter of any query selecting these
+_DAYS_LEFT_SQL = "({0}deadline_ts - ?1) / 86400"
+_URGENCY_SQL = f"""CASE WHEN {{0}}deadline_ts < ?1 THEN 'Overdue'
+    WHEN {{0}}deadline_ts = ?1 THEN 'Due today'
+    WHEN {{0}}deadline_ts <= ?1 + {DUE_SOON_DAYS * 86400} THEN 'Due soon'
+    ELSE 'Upcoming' END"""
+
+def _task_select(prefix=""):
+    """SELECT list producing Task rows, for tasks optionally aliased by prefix (e.g. "t.")"""
+    columns = ", ".join(prefix + column for column in TASK_COLUMNS.split(", "))
+    return f"{columns}, {_DAYS_LEFT_SQL.format(prefix)}, {_URGENCY_SQL.format(prefix)}"
+
+_TASK_SELECT = _task_select()
+
+class Task(NamedTuple):
+    """A task row, with its deadline parsed and urgency worked out by the query"""
+    id: int
+    title: str
+    description: str
+    deadline: str
+    priority: str
+    status: str
+    email: str
+    created_at: str
+    deadline_date: date
+    days_left: int
+    urgency: str
+
+class Subtask(NamedTuple):
+    """One step of a task's AI breakdown; depends_on holds the positions of earlier steps"""
+    position: int
+    title: str
+    estimate_minutes: Optional[int]
+    depends_on: Tuple[int, ...]
+    completed: bool
+
+class PriorityStats(NamedTuple):
+    """Task counts for one priority; the due counts only include pending tasks"""
+    priority: str
+    total: int
+    completed: int
+    overdue: int
+    due_today: int
+    due_soon: int
+
+class WeekStats(NamedTuple):
+    """Tasks created and completed in the week starting on Monday week_start"""
+    week_start: date
+    created: int
+    completed: int
+
+class OutboxEntry(NamedTuple):
+    """A reminder claimed from the outbox; body is None until it has been generated"""
+    id: int
+    task_id: int
+    recipient: str
+    title: str
+    body: Optional[str]
+    attempts: int
+
+def _make_task(row):
+    """Build a Task from a row starting with the _TASK_SELECT columns"""
+    return Task(*row[:8], date.fromisoformat(row[3]), row[8], row[9])
+
+# ORDER BY clause for each "Sort by" option; id breaks ties so the order is stable.
+# Priority sorts High, Medium, Low via the indexed priority_rank column.
+SORT_ORDERS = {
+    "Deadline": "deadline_ts ASC, id ASC",
+    "Priority": "priority_rank ASC, id ASC",
+    "Date Added": "created_at DESC, id DESC",
+}
+
+# Keyset column and comparison for paging past the last row of each sort order
+_KEYSET_COLUMNS = {
+    "Deadline": ("deadline_ts", ">"),
+    "Priority": ("priority_rank", ">"),
+    "Date Added": ("created_at", "<"),
+}
+
+# Secondary indexes on tasks, keyed by name; every status filter / sort combination
+# offered by the UI (and get_upcoming_tasks) is served by one of these
+TASK_INDEXES = {
+    "idx_tasks_status_deadline": "tasks (status, deadline_ts)",
+    "idx_tasks_status_priority": "tasks (status, priority_rank)",
+    "idx_tasks_status_created_at": "tasks (status, created_at)",
+    "idx_tasks_deadline": "tasks (deadline_ts)",
+    "idx_tasks_priority": "tasks (priority_rank)",
+    "idx_tasks_created_at": "tasks (created_at)",
+}
+
+# Rows updated per transaction while backfilling new columns on existing databases
+MIGRATION_BATCH_SIZE = 5000
+
+# SQL equivalents of priority_rank() / deadline_to_epoch() for triggers and backfills
+_PRIORITY_RANK_SQL = "CASE {0} WHEN 'High' THEN 1 WHEN 'Medium' THEN 2 WHEN 'Low' THEN 3 END"
+_DEADLINE_TS_SQL = "CAST(strftime('%s', {0}) AS INTEGER)"
+
+# Reminders go out this many days before a deadline (0 = on the day itself)
+REMINDER_OFFSETS_DAYS = (3, 1, 0)
+
+SECONDS_PER_DAY = 86400
+
+_migration_lock = threading.Lock()
+
+QUERY_SECONDS = metrics.histogram("todo_db_query_seconds", "Time spent in database.py functions", ("function",))
+
+metrics.gauge("todo_db_open_connections", "Pooled SQLite connections currently open", open_connection_count)
+
+# Bumped after every task write made through this module, so callers can key cached
+# reads on it and only re-query when something actually changed
+_write_version = 0
+_write_version_lock = threading.Lock()
+
+def priority_rank(priority):
+    """Return the sort rank for a priority label (High sorts first)"""
+    return PRIORITY_RANKS.get(priority)
+
+def deadline_to_epoch(deadline):
+    """Convert a 'YYYY-MM-DD' deadline into epoch seconds at UTC midnight"""
+    # fromisoformat is far cheaper than strptime, which matters for bulk imports
+    return calendar.timegm(date.fromisoformat(deadline).timetuple())
+
+def _today_epoch():
+    """Today's local date as a deadline_ts, the reference point for days left"""
+    return deadline_to_epoch(date.today().isoformat())
+
+def _task_filters(filter_status, urgency, today_ts, prefix=""):
+    """
+    Build WHERE conditions for the status and urgency filters
+    
+    Returns:
+        (conditions, params) to be joined with AND
+    """
+    conditions = []
+    params = []
+    if filter_status and filter_status != "All":
+        conditions.append(f"{prefix}status = ?")
+        params.append(filter_status)
+    if urgency:
+        # A completed task is not overdue or due, however old its deadline
+        if filter_status != "Pending":
+            conditions.append(f"{prefix}status = 'Pending'")
+        start, end = URGENCY_DAY_RANGES[urgency]
+        if start is not None:
+            conditions.append(f"{prefix}deadline_ts >= ?")
+            params.append(today_ts + start * SECONDS_PER_DAY)
+        if end is not None:
+            conditions.append(f"{prefix}deadline_ts < ?")
+            params.append(today_ts + end * SECONDS_PER_DAY)
+    return conditions, params
+
+def next_reminder_at(deadline_ts, now, last_sent_at=None):
+    """
+    Work out when a task's next reminder is due
     
-    cursor.execute("""
+    Thresholds that were missed (e.g. the task was created two days before its
+    deadline, or the scheduler was down) collapse into a single reminder due now
+    rather than a burst of catch-up emails.
+    
+    Args:
+        deadline_ts: Deadline as epoch seconds (UTC midnight)
+        now: Current time as epoch seconds
+        last_sent_at: Threshold of the last reminder already sent, if any
+    
+    Returns:
+        Epoch seconds of the next reminder threshold, or None when no reminder remains
+    """
+    # Nothing left to remind about once the deadline day is over
+    if now >= deadline_ts + SECONDS_PER_DAY:
+        return None
+    
+    thresholds = sorted(deadline_ts - days * SECONDS_PER_DAY for days in REMINDER_OFFSETS_DAYS)
+    if last_sent_at is not None:
+        thresholds = [t for t in thresholds if t > last_sent_at]
+    
+    due = [t for t in thresholds if t <= now]
+    if due:
+        return due[-1]
+    return thresholds[0] if thresholds else None
+
+def get_write_version():
+    """Return a counter that changes whenever this process modifies tasks"""
+    return _write_version
+
+def _bump_write_version():
+    global _write_version
+    with _write_version_lock:
+        _write_version += 1
+
+def get_schema_version(conn=None):
+    """Return the schema version recorded in the database file"""
+    conn = conn or get_connection()
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def _column_names(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+def _migrate_v1_create_tasks(conn):
+    """Version 1: the original tasks table"""
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS tasks (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             title TEXT NOT NULL,
@@ -25,98 +318,1111 @@ def init_db():
             created_at TEXT DEFAULT CURRENT_TIMESTAMP
         )
     """)
+
+def _migrate_v2_sort_columns(conn):
+    """Version 2: integer priority_rank and epoch deadline_ts columns"""
+    columns = _column_names(conn, "tasks")
+    if "priority_rank" not in columns:
+        conn.execute("ALTER TABLE tasks ADD COLUMN priority_rank INTEGER")
+    if "deadline_ts" not in columns:
+        conn.execute("ALTER TABLE tasks ADD COLUMN deadline_ts INTEGER")
     
-    conn.commit()
-    conn.close()
+    # Keep the derived columns correct for writers that only set deadline/priority
+    # (older app versions still running against the same file during an upgrade)
+    rank_sql = _PRIORITY_RANK_SQL.format("NEW.priority")
+    deadline_sql = _DEADLINE_TS_SQL.format("NEW.deadline")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tasks_fill_sort_columns
+        AFTER INSERT ON tasks
+        WHEN NEW.priority_rank IS NULL OR NEW.deadline_ts IS NULL
+        BEGIN
+            UPDATE tasks SET priority_rank = {rank_sql}, deadline_ts = {deadline_sql}
+            WHERE id = NEW.id;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tasks_sync_sort_columns
+        AFTER UPDATE OF deadline, priority ON tasks
+        BEGIN
+            UPDATE tasks SET priority_rank = {rank_sql}, deadline_ts = {deadline_sql}
+            WHERE id = NEW.id;
+        END
+    """)
+
+def _backfill_v2_sort_columns(conn, _state=None):
+    """Fill priority_rank/deadline_ts for existing rows in short, separate transactions"""
+    max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM tasks").fetchone()[0]
+    
+    for start in range(0, max_id, MIGRATION_BATCH_SIZE):
+        with conn:
+            conn.execute(f"""
+                UPDATE tasks
+                SET priority_rank = {_PRIORITY_RANK_SQL.format("priority")},
+                    deadline_ts = {_DEADLINE_TS_SQL.format("deadline")}
+                WHERE id > ? AND id <= ?
+                AND (priority_rank IS NULL OR deadline_ts IS NULL)
+            """, (start, start + MIGRATION_BATCH_SIZE))
 
+def _migrate_v3_indexes(conn):
+    """Version 3: indexes for every status filter and sort order"""
+    for name, target in TASK_INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+def _migrate_v4_ai_cache(conn):
+    """Version 4: content-addressed cache of AI responses (see ai_cache.py)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ai_cache (
+            cache_key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ai_cache_last_used ON ai_cache (last_used_at)")
+
+def _migrate_v5_reminder_schedule(conn):
+    """Version 5: next_reminder_at schedule column and the sent reminder log"""
+    if "next_reminder_at" not in _column_names(conn, "tasks"):
+        conn.execute("ALTER TABLE tasks ADD COLUMN next_reminder_at INTEGER")
+    
+    # Partial index: only tasks that still have a reminder coming are indexed
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tasks_next_reminder ON tasks (next_reminder_at)
+        WHERE next_reminder_at IS NOT NULL
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sent_reminders (
+            task_id INTEGER NOT NULL,
+            threshold_at INTEGER NOT NULL,
+            sent_at REAL NOT NULL,
+            PRIMARY KEY (task_id, threshold_at)
+        ) WITHOUT ROWID
+    """)
+
+def _backfill_v5_reminder_schedule(conn, _state=None):
+    """Schedule reminders for existing pending tasks in short, separate transactions"""
+    max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM tasks").fetchone()[0]
+    now = int(time.time())
+    
+    for start in range(0, max_id, MIGRATION_BATCH_SIZE):
+        rows = conn.execute("""
+            SELECT id, deadline_ts FROM tasks
+            WHERE id > ? AND id <= ? AND status = 'Pending' AND next_reminder_at IS NULL
+        """, (start, start + MIGRATION_BATCH_SIZE)).fetchall()
+        updates = [(next_reminder_at(deadline_ts, now), task_id) for task_id, deadline_ts in rows]
+        with conn:
+            conn.executemany("UPDATE tasks SET next_reminder_at = ? WHERE id = ?",
+                             [update for update in updates if update[0] is not None])
+
+def _migrate_v6_search_index(conn):
+    """Version 6: FTS5 full-text index over task titles and descriptions"""
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            title, description,
+            content='tasks', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    
+    # Keep the external-content index in step with every write to tasks
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, title, description) VALUES (NEW.id, NEW.title, NEW.description);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', OLD.id, OLD.title, OLD.description);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', OLD.id, OLD.title, OLD.description);
+            INSERT INTO tasks_fts (rowid, title, description) VALUES (NEW.id, NEW.title, NEW.description);
+        END
+    """)
+    
+    # Index the existing rows from the content table. 'rebuild' replaces whatever the
+    # index holds, so a rerun after an interrupted migration cannot double-index a row
+    conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+def _migrate_v7_subtasks(conn):
+    """Version 7: subtasks parsed from AI breakdowns, clustered by parent task"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS subtasks (
+            task_id INTEGER NOT NULL REFERENCES tasks (id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            estimate_minutes INTEGER,
+            depends_on TEXT NOT NULL DEFAULT '',
+            completed INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (task_id, position)
+        ) WITHOUT ROWID
+    """)
+
+def _migrate_v8_reminder_outbox(conn):
+    """Version 8: outbox of reminder emails waiting to be generated and sent"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS reminder_outbox (
+            id INTEGER PRIMARY KEY,
+            idempotency_key TEXT NOT NULL UNIQUE,
+            task_id INTEGER NOT NULL,
+            recipient TEXT NOT NULL,
+            title TEXT NOT NULL,
+            body TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            created_at REAL NOT NULL,
+            sent_at REAL
+        )
+    """)
+    # Partial index: workers only ever look for pending entries that are due
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_reminder_outbox_due ON reminder_outbox (next_attempt_at)
+        WHERE status = 'pending'
+    """)
+
+# Monday of the week a 'YYYY-MM-DD[ HH:MM:SS]' timestamp falls in, or NULL
+_WEEK_START_SQL = "date({0}, 'weekday 0', '-6 days')"
+
+def _task_counts_sql(row, delta):
+    """Trigger statements adding delta to the task_counts bucket of row (NEW or OLD)"""
+    key = f"status = {row}.status AND priority = {row}.priority AND deadline = {row}.deadline"
+    sql = f"""
+        INSERT INTO task_counts (status, priority, deadline, task_count)
+        VALUES ({row}.status, {row}.priority, {row}.deadline, {delta})
+        ON CONFLICT (status, priority, deadline) DO UPDATE SET task_count = task_count + excluded.task_count;
+    """
+    if delta < 0:
+        sql += f"DELETE FROM task_counts WHERE {key} AND task_count = 0;"
+    return sql
+
+def _weekly_counts_sql(row, delta):
+    """Trigger statements adding delta to the created/completed weeks of row (NEW or OLD)"""
+    created_week = _WEEK_START_SQL.format(f"{row}.created_at")
+    completed_week = _WEEK_START_SQL.format(f"{row}.completed_at")
+    sql = f"""
+        INSERT INTO weekly_task_counts (week_start, created, completed)
+        SELECT week_start, SUM(created), SUM(completed) FROM (
+            SELECT {created_week} AS week_start, {delta} AS created, 0 AS completed
+            UNION ALL
+            SELECT {completed_week}, 0, {delta}
+        )
+        WHERE week_start IS NOT NULL GROUP BY week_start
+        ON CONFLICT (week_start) DO UPDATE SET
+            created = created + excluded.created, completed = completed + excluded.completed;
+    """
+    if delta < 0:
+        sql += f"""
+            DELETE FROM weekly_task_counts WHERE week_start IN ({created_week}, {completed_week})
+            AND created = 0 AND completed = 0;
+        """
+    return sql
+
+# Aggregate the tasks after a given id into the analytics tables (used with 0 to
+# build them, and to catch up after a bulk load that dropped the insert trigger)
+_ANALYTICS_CATCH_UP_SQL = (
+    """
+    INSERT INTO task_counts (status, priority, deadline, task_count)
+    SELECT status, priority, deadline, COUNT(*) FROM tasks WHERE id > ?
+    GROUP BY status, priority, deadline
+    ON CONFLICT (status, priority, deadline) DO UPDATE SET task_count = task_count + excluded.task_count
+    """,
+    f"""
+    INSERT INTO weekly_task_counts (week_start, created, completed)
+    SELECT week_start, SUM(created), SUM(completed) FROM (
+        SELECT {_WEEK_START_SQL.format("created_at")} AS week_start, 1 AS created, 0 AS completed
+        FROM tasks WHERE id > ?1
+        UNION ALL
+        SELECT {_WEEK_START_SQL.format("completed_at")}, 0, 1
+        FROM tasks WHERE id > ?1 AND completed_at IS NOT NULL
+    )
+    WHERE week_start IS NOT NULL GROUP BY week_start
+    ON CONFLICT (week_start) DO UPDATE SET
+        created = created + excluded.created, completed = completed + excluded.completed
+    """,
+)
+
+def _migrate_v9_analytics(conn):
+    """Version 9: completed_at, and aggregate tables for the analytics dashboard kept current by triggers"""
+    if "completed_at" not in _column_names(conn, "tasks"):
+        conn.execute("ALTER TABLE tasks ADD COLUMN completed_at TEXT")
+    
+    # Pending/completed counts per priority and deadline day: the dashboard sums a few
+    # hundred buckets, and overdue counts stay correct as days pass without any writes
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS task_counts (
+            status TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            deadline TEXT NOT NULL,
+            task_count INTEGER NOT NULL,
+            PRIMARY KEY (status, priority, deadline)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS weekly_task_counts (
+            week_start TEXT PRIMARY KEY,
+            created INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tasks_analytics_insert AFTER INSERT ON tasks BEGIN
+            {_task_counts_sql("NEW", 1)}
+            {_weekly_counts_sql("NEW", 1)}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tasks_analytics_delete AFTER DELETE ON tasks BEGIN
+            {_task_counts_sql("OLD", -1)}
+            {_weekly_counts_sql("OLD", -1)}
+        END
+    """)
+    # UPDATE OF fires whenever a column is assigned, so skip rows whose values did not change
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tasks_analytics_update AFTER UPDATE OF status, priority, deadline ON tasks
+        WHEN OLD.status IS NOT NEW.status OR OLD.priority IS NOT NEW.priority OR OLD.deadline IS NOT NEW.deadline
+        BEGIN
+            {_task_counts_sql("OLD", -1)}
+            {_task_counts_sql("NEW", 1)}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS tasks_analytics_update_weeks AFTER UPDATE OF created_at, completed_at ON tasks
+        WHEN OLD.created_at IS NOT NEW.created_at OR OLD.completed_at IS NOT NEW.completed_at
+        BEGIN
+            {_weekly_counts_sql("OLD", -1)}
+            {_weekly_counts_sql("NEW", 1)}
+        END
+    """)
+    
+    # One grouped scan (about 6 s per million tasks), done in the schema transaction so
+    # no write can reach the triggers before its row has been counted; readers are not
+    # blocked under WAL. The tables are rebuilt rather than added to, so running the
+    # migration again can never count a task twice
+    conn.execute("DELETE FROM task_counts")
+    conn.execute("DELETE FROM weekly_task_counts")
+    for sql in _ANALYTICS_CATCH_UP_SQL:
+        conn.execute(sql, (0,))
+
+# (version, schema change, optional batched data backfill run before the version is recorded)
+MIGRATIONS = (
+    (1, _migrate_v1_create_tasks, None),
+    (2, _migrate_v2_sort_columns, _backfill_v2_sort_columns),
+    (3, _migrate_v3_indexes, None),
+    (4, _migrate_v4_ai_cache, None),
+    (5, _migrate_v5_reminder_schedule, _backfill_v5_reminder_schedule),
+    (6, _migrate_v6_search_index, None),
+    (7, _migrate_v7_subtasks, None),
+    (8, _migrate_v8_reminder_outbox, None),
+    (9, _migrate_v9_analytics, None),
+)
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+@metrics.timed(QUERY_SECONDS)
+def init_db():
+    """Initialize the database and apply any pending schema migrations"""
+    conn = get_connection()
+    
+    with _migration_lock:
+        for version, migrate, backfill in MIGRATIONS:
+            if get_schema_version(conn) >= version:
+                continue
+            
+            # Schema changes are quick; IMMEDIATE takes the write lock up front so two
+            # processes starting together cannot both apply the same migration
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if get_schema_version(conn) >= version:
+                    conn.commit()
+                    continue
+                state = migrate(conn)
+                # Without a backfill the version is recorded in the same transaction, so
+                # another process can never see the schema change but the old version
+                if not backfill:
+                    conn.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            
+            # Data backfills commit in batches so the app keeps serving while they run;
+            # they receive whatever the schema step returned (e.g. a row id boundary)
+            if backfill:
+                backfill(conn, state)
+                with conn:
+                    conn.execute(f"PRAGMA user_version = {version}")
+
+@metrics.timed(QUERY_SECONDS)
 def add_task(title, description, deadline, priority, email):
     """Add a new task to the database"""
     conn = get_connection()
-    cursor = conn.cursor()
     
-    cursor.execute("""
-        INSERT INTO tasks (title, description, deadline, priority, email)
-        VALUES (?, ?, ?, ?, ?)
-    """, (title, description, deadline, priority, email))
+    deadline_ts = deadline_to_epoch(deadline)
     
-    conn.commit()
-    task_id = cursor.lastrowid
-    conn.close()
+    with conn:
+        cursor = conn.execute("""
+            INSERT INTO tasks (title, description, deadline, priority, email,
+                               priority_rank, deadline_ts, next_reminder_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (title, description, deadline, priority, email,
+              priority_rank(priority), deadline_ts, next_reminder_at(deadline_ts, int(time.time()))))
+    _bump_write_version()
     
-    return task_id
+    return cursor.lastrowid
 
-def get_all_tasks(filter_status="All", sort_by="Deadline"):
+@metrics.timed(QUERY_SECONDS)
+def get_all_tasks(filter_status="All", sort_by="Deadline", urgency=None):
     """Retrieve all tasks from the database with filtering and sorting"""
     conn = get_connection()
-    cursor = conn.cursor()
+    today_ts = _today_epoch()
     
-    query = "SELECT * FROM tasks"
+    query = f"SELECT {_TASK_SELECT} FROM tasks"
     
-    # Apply filter
-    if filter_status != "All":
-        query += f" WHERE status = '{filter_status}'"
+    # Apply filters
+    conditions, params = _task_filters(filter_status, urgency, today_ts)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
     
     # Apply sorting
-    if sort_by == "Deadline":
-        query += " ORDER BY deadline ASC"
-    elif sort_by == "Priority":
-        # Custom order: High, Medium, Low
-        query += " ORDER BY CASE priority WHEN 'High' THEN 1 WHEN 'Medium' THEN 2 WHEN 'Low' THEN 3 END"
-    elif sort_by == "Date Added":
-        query += " ORDER BY created_at DESC"
-    
-    cursor.execute(query)
-    tasks = cursor.fetchall()
-    conn.close()
+    if sort_by in SORT_ORDERS:
+        query += f" ORDER BY {SORT_ORDERS[sort_by]}"
     
-    return tasks
+    return [_make_task(row) for row in conn.execute(query, [today_ts] + params)]
+
+# Insert triggers that bulk loads can drop, with the statements that catch up on the
+# rows inserted while they were gone (given the largest id from before the load)
+_DEFERRABLE_TRIGGERS = {
+    "tasks_fts_insert": ("""
+        INSERT INTO tasks_fts (rowid, title, description)
+        SELECT id, title, description FROM tasks WHERE id > ?
+    """,),
+    "tasks_analytics_insert": _ANALYTICS_CATCH_UP_SQL,
+}
+
+def _deferrable_schema(conn):
+    """Secondary indexes and the deferrable insert triggers on tasks, as (kind, name, sql) rows"""
+    triggers = ", ".join(f"'{name}'" for name in _DEFERRABLE_TRIGGERS)
+    return conn.execute(f"""
+        SELECT type, name, sql FROM sqlite_master
+        WHERE tbl_name = 'tasks' AND sql IS NOT NULL
+        AND (type = 'index' OR (type = 'trigger' AND name IN ({triggers})))
+    """).fetchall()
 
+@metrics.timed(QUERY_SECONDS)
+def bulk_insert_tasks(rows, batch_size=5000, defer_indexes=False):
+    """
+    Insert many tasks with executemany in batched transactions
+    
+    With defer_indexes, secondary indexes and the search index and analytics
+    insert triggers are dropped for the duration of the load and rebuilt or
+    caught up once at the end, which is much faster for very large imports.
+    The whole load then runs in a single write transaction, so an interrupted
+    import leaves neither its rows nor a schema missing indexes behind, and
+    other writers wait until it finishes.
+    
+    Args:
+        rows: Iterable of validated (title, description, deadline, priority, email,
+            status, created_at) tuples; created_at may be None for "now"
+        batch_size: Rows per transaction, or per executemany call with defer_indexes
+        defer_indexes: Rebuild indexes after the load instead of maintaining them per row
+    
+    Returns:
+        The number of rows inserted
+    """
+    conn = get_connection()
+    now = int(time.time())
+    
+    def prepared(batch):
+        for title, description, deadline, priority, email, status, created_at in batch:
+            deadline_ts = deadline_to_epoch(deadline)
+            reminder_at = next_reminder_at(deadline_ts, now) if status == "Pending" else None
+            yield (title, description, deadline, priority, status, email, created_at,
+                   priority_rank(priority), deadline_ts, reminder_at)
+    
+    def insert_all(insert):
+        inserted = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                inserted += insert(prepared(batch))
+                batch = []
+        if batch:
+            inserted += insert(prepared(batch))
+        return inserted
+    
+    if not defer_indexes:
+        try:
+            return insert_all(lambda batch: _insert_task_batch(conn, batch))
+        finally:
+            _bump_write_version()
+    
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        first_new_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM tasks").fetchone()[0]
+        deferred = _deferrable_schema(conn)
+        for kind, name, _sql in deferred:
+            conn.execute(f"DROP {kind.upper()} IF EXISTS {name}")
+        
+        inserted = insert_all(lambda batch: _execute_task_batch(conn, batch))
+        
+        # Catch up on everything added while the insert triggers were gone
+        for kind, name, _sql in deferred:
+            if kind == "trigger":
+                for catch_up in _DEFERRABLE_TRIGGERS[name]:
+                    conn.execute(catch_up, (first_new_id,))
+        for _kind, _name, sql in deferred:
+            conn.execute(sql)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        _bump_write_version()
+    
+    return inserted
+
+def _execute_task_batch(conn, rows):
+    cursor = conn.executemany("""
+        INSERT INTO tasks (title, description, deadline, priority, status, email, created_at,
+                           priority_rank, deadline_ts, next_reminder_at)
+        VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?)
+    """, rows)
+    return cursor.rowcount
+
+def _insert_task_batch(conn, rows):
+    with conn:
+        return _execute_task_batch(conn, rows)
+
+@metrics.timed(QUERY_SECONDS)
+def iter_tasks(filter_status="All", batch_size=1000):
+    """
+    Stream tasks in id order without loading them all into memory
+    
+    Yields:
+        Task rows, read from the cursor batch_size at a time
+    """
+    conn = get_connection()
+    
+    query = f"SELECT {TASK_COLUMNS} FROM tasks"
+    params = ()
+    if filter_status != "All":
+        query += " WHERE status = ?"
+        params = (filter_status,)
+    query += " ORDER BY id"
+    
+    cursor = conn.execute(query, params)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield from rows
+
+@metrics.timed(QUERY_SECONDS)
+def count_tasks(filter_status="All", urgency=None):
+    """Count tasks matching a status filter and, optionally, an urgency filter"""
+    conn = get_connection()
+    
+    query = "SELECT COUNT(*) FROM tasks"
+    conditions, params = _task_filters(filter_status, urgency, _today_epoch())
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    return conn.execute(query, params).fetchone()[0]
+
+@metrics.timed(QUERY_SECONDS)
+def get_tasks_page(filter_status="All", sort_by="Deadline", page_size=25, cursor=None, urgency=None):
+    """
+    Retrieve one page of tasks using keyset pagination
+    
+    Rows are read straight from the index for the active sort order, starting
+    after the cursor, so the cost of a page does not grow with how deep it is.
+    
+    Args:
+        filter_status: "All", "Pending" or "Completed"
+        sort_by: "Deadline", "Priority" or "Date Added"
+        page_size: Maximum number of tasks to return
+        cursor: The next_cursor returned for the previous page, or None for the first page
+        urgency: Optional key of URGENCY_DAY_RANGES ("Overdue", "Due today" or "Due soon")
+    
+    Returns:
+        (tasks, next_cursor) where tasks is a list of Task and next_cursor is
+        None on the last page
+    """
+    conn = get_connection()
+    key_column, comparison = _KEYSET_COLUMNS[sort_by]
+    today_ts = _today_epoch()
+    
+    conditions, params = _task_filters(filter_status, urgency, today_ts)
+    if cursor is not None:
+        conditions.append(f"({key_column}, id) {comparison} (?, ?)")
+        params.extend(cursor)
+    
+    query = f"SELECT {_TASK_SELECT}, {key_column} FROM tasks"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {SORT_ORDERS[sort_by]} LIMIT ?"
+    
+    # Fetch one extra row to learn whether another page follows
+    rows = conn.execute(query, [today_ts] + params + [page_size + 1]).fetchall()
+    
+    next_cursor = None
+    if len(rows) > page_size:
+        last = rows[page_size - 1]
+        next_cursor = (last[-1], last[0])
+    
+    return [_make_task(row) for row in rows[:page_size]], next_cursor
+
+@metrics.timed(QUERY_SECONDS)
 def get_task_by_id(task_id):
     """Retrieve a single task by ID"""
     conn = get_connection()
-    cursor = conn.cursor()
     
-    cursor.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-    task = cursor.fetchone()
-    conn.close()
+    row = conn.execute(f"SELECT {_TASK_SELECT} FROM tasks WHERE id = ?", (_today_epoch(), task_id)).fetchone()
+    return _make_task(row) if row else None
+
+@metrics.timed(QUERY_SECONDS)
+def get_task_ids(filter_status="All", urgency=None):
+    """Return the ids of every task matching a status filter and optional urgency filter"""
+    conn = get_connection()
     
-    return task
+    query = "SELECT id FROM tasks"
+    conditions, params = _task_filters(filter_status, urgency, _today_epoch())
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    return [row[0] for row in conn.execute(query, params)]
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+# Ids per "IN (...)" query, well under SQLite's bound-parameter limit
+_ID_CHUNK_SIZE = 500
+
+@metrics.timed(QUERY_SECONDS)
+def get_tasks_by_ids(task_ids, filter_status="All"):
+    """
+    Retrieve several tasks by ID
+    
+    Args:
+        task_ids: Task ids, in the order the tasks should be returned
+        filter_status: "All", "Pending" or "Completed"
+    
+    Returns:
+        A list of Task in the order of task_ids, leaving out ids that no longer
+        exist or do not match filter_status
+    """
+    conn = get_connection()
+    today_ts = _today_epoch()
+    
+    conditions, params = _task_filters(filter_status, None, today_ts)
+    found = {}
+    for chunk in _chunks(list(task_ids), _ID_CHUNK_SIZE):
+        placeholders = ",".join("?" * len(chunk))
+        query = " AND ".join([f"SELECT {_TASK_SELECT} FROM tasks WHERE id IN ({placeholders})"] + conditions)
+        for row in conn.execute(query, [today_ts] + chunk + params):
+            found[row[0]] = _make_task(row)
+    return [found[task_id] for task_id in task_ids if task_id in found]
+
+@metrics.timed(QUERY_SECONDS)
+def iter_task_texts(after_id=0, batch_size=1000):
+    """
+    Stream the title and description of tasks added after a given id
+    
+    Yields:
+        (id, title, description) in id order
+    """
+    conn = get_connection()
+    
+    cursor = conn.execute("SELECT id, title, description FROM tasks WHERE id > ? ORDER BY id", (after_id,))
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield from rows
 
 def update_task_status(task_id, status):
     """Update the status of a task"""
+    update_task_status_many([task_id], status)
+
+@metrics.timed(QUERY_SECONDS)
+def update_task_status_many(task_ids, status):
+    """
+    Update the status of many tasks in a single transaction
+    
+    Args:
+        task_ids: Ids of the tasks to update
+        status: New status ("Pending" or "Completed")
+    
+    Returns:
+        The number of tasks updated
+    """
     conn = get_connection()
-    cursor = conn.cursor()
+    task_ids = list(task_ids)
     
-    cursor.execute("""
-        UPDATE tasks SET status = ? WHERE id = ?
-    """, (status, task_id))
+    with conn:
+        if status == "Completed":
+            # Completed tasks drop out of the reminder schedule
+            # completed_at is kept from the first completion if a task is completed again
+            cursor = conn.executemany("""
+                UPDATE tasks SET status = ?, next_reminder_at = NULL,
+                       completed_at = CASE WHEN status = 'Completed' THEN completed_at ELSE CURRENT_TIMESTAMP END
+                WHERE id = ?
+            """, ((status, task_id) for task_id in task_ids))
+        else:
+            # Reopened tasks resume after the last reminder already sent
+            now = int(time.time())
+            updates = []
+            for chunk in _chunks(task_ids, _ID_CHUNK_SIZE):
+                rows = conn.execute(f"""
+                    SELECT id, deadline_ts,
+                           (SELECT MAX(threshold_at) FROM sent_reminders WHERE task_id = tasks.id)
+                    FROM tasks WHERE id IN ({", ".join("?" * len(chunk))})
+                """, chunk)
+                updates.extend((status, next_reminder_at(deadline_ts, now, last_sent), task_id)
+                               for task_id, deadline_ts, last_sent in rows)
+            cursor = conn.executemany("""
+                UPDATE tasks SET status = ?, next_reminder_at = ?, completed_at = NULL WHERE id = ?
+            """, updates)
+    _bump_write_version()
     
-    conn.commit()
-    conn.close()
+    return cursor.rowcount
 
 def delete_task(task_id):
     """Delete a task from the database"""
+    delete_tasks([task_id])
+
+@metrics.timed(QUERY_SECONDS)
+def delete_tasks(task_ids):
+    """
+    Delete many tasks, with their sent-reminder records and subtasks, in a single transaction
+    
+    Returns:
+        The number of tasks deleted
+    """
     conn = get_connection()
-    cursor = conn.cursor()
+    params = [(task_id,) for task_id in task_ids]
     
-    cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+    with conn:
+        cursor = conn.executemany("DELETE FROM tasks WHERE id = ?", params)
+        conn.executemany("DELETE FROM sent_reminders WHERE task_id = ?", params)
+        # Foreign keys are not enforced on these connections, so cascade by hand
+        conn.executemany("DELETE FROM subtasks WHERE task_id = ?", params)
+    _bump_write_version()
     
-    conn.commit()
-    conn.close()
+    return cursor.rowcount
 
+@metrics.timed(QUERY_SECONDS)
 def get_upcoming_tasks(days_ahead=3):
     """Get tasks with deadlines within specified days"""
     conn = get_connection()
-    cursor = conn.cursor()
     
-    cursor.execute("""
-        SELECT * FROM tasks 
+    # Same cutoff as SQLite's date('now', '+N days'), which is UTC
+    cutoff = datetime.utcnow().date() + timedelta(days=days_ahead)
+    
+    rows = conn.execute(f"""
+        SELECT {_TASK_SELECT} FROM tasks 
         WHERE status = 'Pending' 
-        AND date(deadline) <= date('now', '+' || ? || ' days')
-        ORDER BY deadline ASC
-    """, (days_ahead,))
+        AND deadline_ts <= ?
+        ORDER BY deadline_ts ASC, id ASC
+    """, (_today_epoch(), deadline_to_epoch(str(cutoff))))
+    return [_make_task(row) for row in rows]
+
+@metrics.timed(QUERY_SECONDS)
+def get_scheduled_reminders(until, limit=1000):
+    """
+    Get the earliest scheduled reminders due at or before a time
     
-    tasks = cursor.fetchall()
-    conn.close()
+    Reads only the next_reminder_at index, so the cost is bounded by limit
+    rather than by the number of tasks.
+    
+    Returns:
+        A list of (next_reminder_at, task_id) tuples in due order
+    """
+    conn = get_connection()
+    
+    return conn.execute("""
+        SELECT next_reminder_at, id FROM tasks
+        WHERE next_reminder_at <= ?
+        ORDER BY next_reminder_at ASC
+        LIMIT ?
+    """, (until, limit)).fetchall()
+
+@metrics.timed(QUERY_SECONDS)
+def claim_due_reminders(entries, now=None):
+    """
+    Atomically claim scheduled reminders before they are sent
+    
+    Each claim records the threshold in sent_reminders and advances the task to
+    its next threshold in the same transaction, so a reminder is claimed at
+    most once even across scheduler restarts or concurrent schedulers. Entries
+    whose schedule changed since they were read are skipped.
+    
+    Args:
+        entries: (next_reminder_at, task_id) tuples from get_scheduled_reminders()
+        now: Current time as epoch seconds (defaults to time.time())
+    
+    Returns:
+        The claimed tasks, as Task records, to be sent by the caller
+    """
+    conn = get_connection()
+    now = int(now if now is not None else time.time())
+    claimed_ids = []
+    
+    with conn:
+        for threshold_at, task_id in entries:
+            if threshold_at > now:
+                continue
+            
+            row = conn.execute("""
+                SELECT deadline_ts FROM tasks
+                WHERE id = ? AND next_reminder_at = ? AND status = 'Pending'
+            """, (task_id, threshold_at)).fetchone()
+            if row is None:
+                continue
+            
+            inserted = conn.execute("""
+                INSERT OR IGNORE INTO sent_reminders (task_id, threshold_at, sent_at)
+                VALUES (?, ?, ?)
+            """, (task_id, threshold_at, time.time())).rowcount
+            # A reminder goes out now, so only thresholds after now remain
+            conn.execute("UPDATE tasks SET next_reminder_at = ? WHERE id = ?",
+                         (next_reminder_at(row[0], now, now), task_id))
+            if inserted:
+                claimed_ids.append(task_id)
+    
+    if not claimed_ids:
+        return []
+    
+    placeholders = ", ".join("?" * len(claimed_ids))
+    rows = conn.execute(
+        f"SELECT {_TASK_SELECT} FROM tasks WHERE id IN ({placeholders})", [_today_epoch()] + claimed_ids
+    )
+    return [_make_task(row) for row in rows]
+
+def _fts_query(text):
+    """Turn free text into an FTS5 query: every word must match, as a prefix"""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' for word in words)
+
+@metrics.timed(QUERY_SECONDS)
+def search_tasks(query, status=None, limit=20, urgency=None):
+    """
+    Full-text search over task titles and descriptions
+    
+    Every word in the query must match the start of a word in the task; title
+    matches rank above description matches.
+    
+    Args:
+        query: Free text typed by the user
+        status: Optional status filter ("Pending" or "Completed")
+        limit: Maximum number of results
+        urgency: Optional key of URGENCY_DAY_RANGES
+    
+    Returns:
+        A list of (Task, snippet) pairs, best match first, where snippet is the
+        best matching fragment of the title or description with matches
+        wrapped in ** for markdown
+    """
+    match = _fts_query(query)
+    if not match:
+        return []
+    
+    conn = get_connection()
+    today_ts = _today_epoch()
+    sql = f"""
+        SELECT {_task_select("t.")},
+               snippet(tasks_fts, -1, '**', '**', '…', 12)
+        FROM tasks_fts
+        JOIN tasks t ON t.id = tasks_fts.rowid
+        WHERE tasks_fts MATCH ?
+    """
+    conditions, filter_params = _task_filters(status, urgency, today_ts, "t.")
+    for condition in conditions:
+        sql += f" AND {condition}"
+    sql += " ORDER BY bm25(tasks_fts, 10.0, 1.0) LIMIT ?"
+    params = [today_ts, match] + filter_params + [limit]
+    
+    return [(_make_task(row), row[-1]) for row in conn.execute(sql, params)]
+
+@metrics.timed(QUERY_SECONDS)
+def save_subtasks(task_id, subtasks):
+    """
+    Replace a task's subtasks in a single transaction
+    
+    Args:
+        task_id: The parent task
+        subtasks: Subtask records, e.g. from breakdown.parse_breakdown()
+    """
+    conn = get_connection()
+    
+    with conn:
+        conn.execute("DELETE FROM subtasks WHERE task_id = ?", (task_id,))
+        conn.executemany("""
+            INSERT INTO subtasks (task_id, position, title, estimate_minutes, depends_on, completed)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(task_id, subtask.position, subtask.title, subtask.estimate_minutes,
+               ",".join(str(position) for position in subtask.depends_on), int(subtask.completed))
+              for subtask in subtasks])
+    _bump_write_version()
+
+@metrics.timed(QUERY_SECONDS)
+def get_subtasks(task_id):
+    """Return a task's subtasks in position order (empty if it has no stored breakdown)"""
+    conn = get_connection()
+    
+    rows = conn.execute("""
+        SELECT position, title, estimate_minutes, depends_on, completed
+        FROM subtasks WHERE task_id = ? ORDER BY position
+    """, (task_id,))
+    return [
+        Subtask(position, title, estimate_minutes,
+                tuple(int(p) for p in depends_on.split(",") if p), bool(completed))
+        for position, title, estimate_minutes, depends_on, completed in rows
+    ]
+
+@metrics.timed(QUERY_SECONDS)
+def set_subtask_completed(task_id, position, completed):
+    """Mark one subtask as completed or not"""
+    conn = get_connection()
+    
+    with conn:
+        conn.execute("UPDATE subtasks SET completed = ? WHERE task_id = ? AND position = ?",
+                     (int(completed), task_id, position))
+    _bump_write_version()
+
+@metrics.timed(QUERY_SECONDS)
+def enqueue_reminder(task_id, recipient, title, idempotency_key, body=None, now=None):
+    """
+    Add a reminder to the outbox unless one with the same idempotency key exists
+    
+    Args:
+        task_id: Task the reminder is about
+        recipient: Email address to send it to
+        title: Task title, used in the subject
+        idempotency_key: Identifies the reminder; enqueueing the same key again is a no-op
+        body: Email body, or None to have the worker generate it
+        now: Current time as epoch seconds (defaults to time.time())
+    
+    Returns:
+        (entry id, created) where created is False if the key was already queued
+    """
+    conn = get_connection()
+    now = now if now is not None else time.time()
+    
+    with conn:
+        cursor = conn.execute("""
+            INSERT OR IGNORE INTO reminder_outbox
+                (idempotency_key, task_id, recipient, title, body, next_attempt_at, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (idempotency_key, task_id, recipient, title, body, now, now))
+        if cursor.rowcount:
+            return cursor.lastrowid, True
+        row = conn.execute("SELECT id FROM reminder_outbox WHERE idempotency_key = ?", (idempotency_key,)).fetchone()
+        return row[0], False
+
+@metrics.timed(QUERY_SECONDS)
+def claim_outbox_batch(limit, lease_seconds, now=None):
+    """
+    Claim due outbox entries for sending
+    
+    Claimed entries stay pending but are hidden from other workers for
+    lease_seconds, so an entry whose worker died is picked up again once the
+    lease runs out. Each claim counts as an attempt.
+    
+    Returns:
+        A list of OutboxEntry, earliest due first
+    """
+    conn = get_connection()
+    now = now if now is not None else time.time()
+    
+    # IMMEDIATE takes the write lock before reading, so concurrent workers never claim the same rows
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = conn.execute("""
+            SELECT id, task_id, recipient, title, body, attempts + 1 FROM reminder_outbox
+            WHERE status = 'pending' AND next_attempt_at <= ?
+            ORDER BY next_attempt_at
+            LIMIT ?
+        """, (now, limit)).fetchall()
+        conn.executemany("""
+            UPDATE reminder_outbox SET attempts = attempts + 1, next_attempt_at = ? WHERE id = ?
+        """, [(now + lease_seconds, row[0]) for row in rows])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return [OutboxEntry(*row) for row in rows]
+
+@metrics.timed(QUERY_SECONDS)
+def extend_outbox_lease(entries, lease_seconds, now=None):
+    """
+    Renew the lease on claimed outbox entries
+    
+    An entry whose lease ran out and was claimed again by another worker has a
+    higher attempt count than the claimed OutboxEntry, and is left alone.
+    
+    Args:
+        entries: OutboxEntry records returned by claim_outbox_batch()
+        lease_seconds: How long from now the entries stay hidden from other workers
+        now: Current time as epoch seconds (defaults to time.time())
+    
+    Returns:
+        The set of ids of the entries still held by the caller
+    """
+    conn = get_connection()
+    now = now if now is not None else time.time()
+    
+    held = set()
+    with conn:
+        for entry in entries:
+            cursor = conn.execute("""
+                UPDATE reminder_outbox SET next_attempt_at = ?
+                WHERE id = ? AND status = 'pending' AND attempts = ?
+            """, (now + lease_seconds, entry.id, entry.attempts))
+            if cursor.rowcount:
+                held.add(entry.id)
+    return held
+
+@metrics.timed(QUERY_SECONDS)
+def set_outbox_body(entry_id, body):
+    """Store a generated body so retries resend it instead of generating a new one"""
+    conn = get_connection()
+    
+    with conn:
+        conn.execute("UPDATE reminder_outbox SET body = ? WHERE id = ?", (body, entry_id))
+
+@metrics.timed(QUERY_SECONDS)
+def mark_outbox_sent(entry_id, now=None):
+    """Record that an outbox entry was delivered"""
+    conn = get_connection()
+    
+    with conn:
+        conn.execute("""
+            UPDATE reminder_outbox SET status = 'sent', sent_at = ?, last_error = NULL WHERE id = ?
+        """, (now if now is not None else time.time(), entry_id))
+
+@metrics.timed(QUERY_SECONDS)
+def mark_outbox_failed(entry_id, error, retry_at=None):
+    """Record a failed attempt; the entry is retried at retry_at, or given up on if that is None"""
+    conn = get_connection()
+    
+    with conn:
+        if retry_at is None:
+            conn.execute("UPDATE reminder_outbox SET status = 'failed', last_error = ? WHERE id = ?",
+                         (error, entry_id))
+        else:
+            conn.execute("UPDATE reminder_outbox SET next_attempt_at = ?, last_error = ? WHERE id = ?",
+                         (retry_at, error, entry_id))
+
+@metrics.timed(QUERY_SECONDS)
+def get_outbox_entry_status(entry_id):
+    """Return (status, attempts, last_error) for an outbox entry, or None if it does not exist"""
+    conn = get_connection()
+    
+    return conn.execute("SELECT status, attempts, last_error FROM reminder_outbox WHERE id = ?",
+                        (entry_id,)).fetchone()
+
+@metrics.timed(QUERY_SECONDS)
+def count_outbox(now=None):
+    """
+    Summarize the outbox
+    
+    Returns:
+        A dict with the number of entries that are due now, waiting (scheduled
+        for a retry or leased to a worker), sent and failed
+    """
+    conn = get_connection()
+    now = now if now is not None else time.time()
+    
+    due, waiting = conn.execute("""
+        SELECT COALESCE(SUM(next_attempt_at <= ?), 0), COALESCE(SUM(next_attempt_at > ?), 0)
+        FROM reminder_outbox WHERE status = 'pending'
+    """, (now, now)).fetchone()
+    counts = dict(conn.execute("""
+        SELECT status, COUNT(*) FROM reminder_outbox WHERE status != 'pending' GROUP BY status
+    """).fetchall())
+    return {"due": due, "waiting": waiting, "sent": counts.get("sent", 0), "failed": counts.get("failed", 0)}
+
+@metrics.timed(QUERY_SECONDS)
+def get_priority_stats(today=None):
+    """
+    Task totals, completions and pending tasks by urgency for each priority
+    
+    Reads the task_counts aggregate table, so the cost depends on the number of
+    distinct deadlines rather than the number of tasks.
+    
+    Args:
+        today: The date urgency is measured from (defaults to today)
+    
+    Returns:
+        A list of PriorityStats, High priority first
+    """
+    conn = get_connection()
+    today = today or date.today()
+    
+    # Deadlines are ISO dates, so the urgency day ranges become string comparisons
+    urgency_sums = []
+    params = []
+    for urgency in ("Overdue", "Due today", "Due soon"):
+        conditions = ["status != 'Completed'"]
+        start, end = URGENCY_DAY_RANGES[urgency]
+        if start is not None:
+            conditions.append("deadline >= ?")
+            params.append((today + timedelta(days=start)).isoformat())
+        if end is not None:
+            conditions.append("deadline < ?")
+            params.append((today + timedelta(days=end)).isoformat())
+        urgency_sums.append(f"SUM(CASE WHEN {' AND '.join(conditions)} THEN task_count ELSE 0 END)")
+    
+    rows = conn.execute(f"""
+        SELECT priority, SUM(task_count),
+               SUM(CASE WHEN status = 'Completed' THEN task_count ELSE 0 END),
+               {", ".join(urgency_sums)}
+        FROM task_counts
+        GROUP BY priority
+        ORDER BY {_PRIORITY_RANK_SQL.format("priority")}
+    """, params).fetchall()
+    return [PriorityStats(*row) for row in rows]
+
+@metrics.timed(QUERY_SECONDS)
+def get_weekly_throughput(weeks=12, today=None):
+    """
+    Tasks created and completed per week, read from the weekly_task_counts aggregate table
+    
+    Tasks only count as completed from when completed_at started being
+    recorded; older completions and imported completed tasks have none.
+    
+    Args:
+        weeks: How many weeks to return, ending with the current one
+        today: A date in the last week (defaults to today)
+    
+    Returns:
+        A list of WeekStats, oldest week first, including weeks with no activity
+    """
+    conn = get_connection()
+    today = today or date.today()
+    
+    last_week = today - timedelta(days=today.weekday())
+    first_week = last_week - timedelta(weeks=weeks - 1)
+    counts = {
+        week_start: (created, completed)
+        for week_start, created, completed in conn.execute("""
+            SELECT week_start, created, completed FROM weekly_task_counts
+            WHERE week_start >= ? AND week_start <= ?
+        """, (first_week.isoformat(), last_week.isoformat()))
+    }
     
-    return tasks
+    stats = []
+    for offset in range(weeks):
+        week_start = first_week + timedelta(weeks=offset)
+        stats.append(WeekStats(week_start, *counts.get(week_start.isoformat(), (0, 0))))
+    return stats
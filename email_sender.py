@@ -1,12 +1,218 @@
+import atexit
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import threading
+import time
 import os
 from dotenv import load_dotenv
+import metrics
+from email_templates import render_reminder_message
 
 # Load environment variables
 load_dotenv()
 
+SMTP_SECONDS = metrics.histogram("todo_smtp_seconds", "SMTP connect, send and message render latency", ("operation",))
+MESSAGES = metrics.counter("todo_smtp_messages_total", "Reminder emails by outcome", ("result",))
+RECONNECTS = metrics.counter("todo_smtp_reconnects_total", "Pooled SMTP connections found dead and replaced")
+
+def get_smtp_config():
+    """
+    Read SMTP configuration from environment variables
+    
+    Returns:
+        A dict with server, port, sender, password and use_tls
+    """
+    return {
+        "server": os.getenv("SMTP_SERVER", "smtp.gmail.com"),
+        "port": int(os.getenv("SMTP_PORT", "587")),
+        "sender": os.getenv("SENDER_EMAIL"),
+        "password": os.getenv("SENDER_PASSWORD"),
+        "use_tls": os.getenv("SMTP_USE_TLS", "true").lower() != "false",
+    }
+
+@metrics.timed(SMTP_SECONDS, "connect")
+def open_smtp_session(config=None):
+    """
+    Open an authenticated SMTP session that can send many messages
+    
+    Args:
+        config: SMTP settings from get_smtp_config() (read from the environment if omitted)
+    
+    Returns:
+        A connected, logged-in smtplib.SMTP; the caller must quit() it
+    """
+    config = config or get_smtp_config()
+    
+    server = smtplib.SMTP(config["server"], config["port"])
+    try:
+        if config["use_tls"]:
+            server.starttls()  # Secure the connection
+        server.login(config["sender"], config["password"])
+    except Exception:
+        server.close()
+        raise
+    
+    return server
+
+class SMTPClient:
+    """
+    A small pool of long-lived, authenticated SMTP connections
+    
+    Connections are opened on demand, reused across messages, checked with NOOP
+    after sitting idle, retired after max_messages_per_connection sends, and
+    transparently reopened when the server has dropped them.
+    """
+    
+    def __init__(self, config=None, pool_size=2, max_messages_per_connection=100, idle_check_seconds=30):
+        self.config = config or get_smtp_config()
+        self.max_messages_per_connection = max_messages_per_connection
+        self.idle_check_seconds = idle_check_seconds
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        # Idle connections as [server, messages_sent, last_used]
+        self._idle = []
+    
+    def _connect(self):
+        return [open_smtp_session(self.config), 0, time.monotonic()]
+    
+    def _is_alive(self, server):
+        try:
+            return server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+    
+    def _checkout(self):
+        """Take an idle connection (verifying stale ones) or open a new one"""
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    return self._connect()
+                if time.monotonic() - conn[2] < self.idle_check_seconds or self._is_alive(conn[0]):
+                    return conn
+                RECONNECTS.inc()
+                self._discard(conn)
+        except Exception:
+            self._slots.release()
+            raise
+    
+    def _checkin(self, conn):
+        if conn[1] >= self.max_messages_per_connection:
+            self._quit(conn)
+        else:
+            conn[2] = time.monotonic()
+            with self._lock:
+                self._idle.append(conn)
+        self._slots.release()
+    
+    def _quit(self, conn):
+        try:
+            conn[0].quit()
+        except (smtplib.SMTPException, OSError):
+            self._discard(conn)
+    
+    def _discard(self, conn):
+        try:
+            conn[0].close()
+        except OSError:
+            pass
+    
+    @metrics.timed(SMTP_SECONDS, "send")
+    def _send_on(self, conn, recipient_email, message):
+        """Send on conn, replacing it once if the session turns out to be dead"""
+        try:
+            conn[0].sendmail(self.config["sender"], recipient_email, message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            RECONNECTS.inc()
+            self._discard(conn)
+            conn[:] = self._connect()
+            conn[0].sendmail(self.config["sender"], recipient_email, message)
+        conn[1] += 1
+    
+    def send(self, recipient_email, message):
+        """Send one serialized message (bytes), raising smtplib.SMTPException on failure"""
+        conn = self._checkout()
+        try:
+            self._send_on(conn, recipient_email, message)
+        except BaseException:
+            self._discard(conn)
+            self._slots.release()
+            raise
+        self._checkin(conn)
+    
+    def send_many(self, messages):
+        """
+        Send a batch of messages over one pooled connection
+        
+        Args:
+            messages: Iterable of (recipient_email, message bytes) pairs
+        
+        Returns:
+            A list of (recipient_email, error) pairs in input order; error is None when sent
+        """
+        results = []
+        conn = self._checkout()
+        try:
+            for recipient_email, message in messages:
+                # Rotate connections that reached their message cap mid-batch
+                if conn[1] >= self.max_messages_per_connection:
+                    self._quit(conn)
+                    conn[:] = self._connect()
+                try:
+                    self._send_on(conn, recipient_email, message)
+                    results.append((recipient_email, None))
+                    MESSAGES.inc("sent")
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                    # The session is still usable; only this message failed
+                    results.append((recipient_email, str(e)))
+                    MESSAGES.inc("failed")
+        except BaseException:
+            self._discard(conn)
+            self._slots.release()
+            raise
+        self._checkin(conn)
+        return results
+    
+    def close(self):
+        """Quit every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._quit(conn)
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_smtp_client():
+    """Return the process-wide SMTPClient, created from the environment on first use"""
+    global _client
+    
+    with _client_lock:
+        if _client is None:
+            _client = SMTPClient()
+            atexit.register(_client.close)
+        return _client
+
+def reset_smtp_client():
+    """Close the shared SMTPClient so the next use re-reads the SMTP configuration"""
+    global _client
+    
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+@metrics.timed(SMTP_SECONDS, "render")
+def build_reminder_message(sender_email, recipient_email, task_title, email_body):
+    """
+    Build the multipart (plain text + HTML) reminder message
+    
+    Returns:
+        The serialized message as bytes, ready to send
+    """
+    return render_reminder_message(sender_email, recipient_email, task_title, email_body)
+
 def send_reminder_email(recipient_email, task_title, email_body):
     """
     Send a reminder email to the specified recipient
@@ -19,70 +225,31 @@ def send_reminder_email(recipient_email, task_title, email_body):
     Returns:
         True if email sent successfully, False otherwise
     """
-    # Get SMTP configuration from environment variables
-    SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-    SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
-    SENDER_EMAIL = os.getenv("SENDER_EMAIL")
-    SENDER_PASSWORD = os.getenv("SENDER_PASSWORD")
+    client = get_smtp_client()
     
     # Check if credentials are configured
-    if not SENDER_EMAIL or not SENDER_PASSWORD:
+    if not client.config["sender"] or not client.config["password"]:
         print("Warning: Email credentials not configured in .env file")
         return False
     
     try:
-        # Create message
-        message = MIMEMultipart("alternative")
-        message["Subject"] = f"⏰ Task Reminder: {task_title}"
-        message["From"] = SENDER_EMAIL
-        message["To"] = recipient_email
+        message = build_reminder_message(client.config["sender"], recipient_email, task_title, email_body)
         
-        # Create plain text and HTML versions
-        text = email_body
-        html = f"""
-        <html>
-          <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #ddd; border-radius: 10px;">
-              <h2 style="color: #1f77b4; border-bottom: 2px solid #1f77b4; padding-bottom: 10px;">
-                📋 Task Reminder
-              </h2>
-              <div style="background-color: #f0f8ff; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                {email_body.replace(chr(10), '<br>')}
-              </div>
-              <div style="margin-top: 20px; padding-top: 20px; border-top: 1px solid #ddd; text-align: center; color: #666;">
-                <p style="font-size: 12px;">
-                  This is an automated reminder from your AI-Powered Todo App
-                </p>
-              </div>
-            </div>
-          </body>
-        </html>
-        """
-        
-        # Attach both versions
-        part1 = MIMEText(text, "plain")
-        part2 = MIMEText(html, "html")
-        message.attach(part1)
-        message.attach(part2)
-        
-        # Send email
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()  # Secure the connection
-            server.login(SENDER_EMAIL, SENDER_PASSWORD)
-            server.sendmail(SENDER_EMAIL, recipient_email, message.as_string())
+        # Send email over a pooled, already-authenticated connection
+        client.send(recipient_email, message)
         
+        MESSAGES.inc("sent")
         print(f"Email sent successfully to {recipient_email}")
         return True
     
     except smtplib.SMTPAuthenticationError:
         print("SMTP Authentication Error: Check your email and password")
-        return False
     except smtplib.SMTPException as e:
         print(f"SMTP Error: {str(e)}")
-        return False
     except Exception as e:
         print(f"Error sending email: {str(e)}")
-        return False
+    MESSAGES.inc("failed")
+    return False
 
 def test_email_configuration():
     """
@@ -91,10 +258,9 @@ def test_email_configuration():
     Returns:
         True if configuration is valid, False otherwise
     """
-    SENDER_EMAIL = os.getenv("SENDER_EMAIL")
-    SENDER_PASSWORD = os.getenv("SENDER_PASSWORD")
+    config = get_smtp_client().config
     
-    if not SENDER_EMAIL or not SENDER_PASSWORD:
+    if not config["sender"] or not config["password"]:
         return False
     
     return True
@@ -0,0 +1,127 @@
+import base64
+import html
+import re
+import uuid
+from email.header import Header
+
+# Reminder HTML, compiled once at import. Non-ASCII characters are written as
+# character references so the rendered part is pure ASCII and can be sent as 7bit.
+REMINDER_HTML_TEMPLATE = """<html>
+  <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #ddd; border-radius: 10px;">
+      <h2 style="color: #1f77b4; border-bottom: 2px solid #1f77b4; padding-bottom: 10px;">
+        &#128203; Task Reminder
+      </h2>
+      <div style="background-color: #f0f8ff; padding: 15px; border-radius: 5px; margin: 20px 0;">
+        {{ body }}
+      </div>
+      <div style="margin-top: 20px; padding-top: 20px; border-top: 1px solid #ddd; text-align: center; color: #666;">
+        <p style="font-size: 12px;">
+          This is an automated reminder from your AI-Powered Todo App
+        </p>
+      </div>
+    </div>
+  </body>
+</html>
+"""
+
+REMINDER_SUBJECT_PREFIX = "⏰ Task Reminder: "
+
+# RFC 5321 limits lines to 1000 octets including CRLF
+MAX_LINE_LENGTH = 998
+
+_CRLF = b"\r\n"
+
+def _html_paragraphs(value):
+    """Escape text for HTML and turn its line breaks into <br> tags"""
+    escaped = html.escape(value.replace("\r\n", "\n"), quote=False)
+    return escaped.replace("\n", "<br>\r\n").encode("ascii", "xmlcharrefreplace")
+
+def _html_text(value):
+    return html.escape(value).encode("ascii", "xmlcharrefreplace")
+
+class CompiledTemplate:
+    """
+    A template parsed once into literal byte chunks and field slots
+    
+    Fields are written as {{ name }}. Rendering only escapes the field values
+    and joins them with the pre-encoded literals, so nothing about the template
+    itself is re-processed per message.
+    """
+    
+    _FIELD = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+    
+    def __init__(self, source, filters=None):
+        self._chunks = []
+        self._slots = []
+        self._filters = filters or {}
+        
+        source = source.replace("\r\n", "\n").replace("\n", "\r\n")
+        position = 0
+        for match in self._FIELD.finditer(source):
+            self._chunks.append(source[position:match.start()].encode("ascii", "xmlcharrefreplace"))
+            self._slots.append((len(self._chunks), match.group(1)))
+            self._chunks.append(b"")
+            position = match.end()
+        self._chunks.append(source[position:].encode("ascii", "xmlcharrefreplace"))
+    
+    @property
+    def fields(self):
+        return [name for _, name in self._slots]
+    
+    def render(self, **values):
+        """Return the rendered template as ASCII bytes with CRLF line endings"""
+        chunks = self._chunks.copy()
+        for index, name in self._slots:
+            chunks[index] = self._filters.get(name, _html_text)(values[name])
+        return b"".join(chunks)
+
+REMINDER_HTML = CompiledTemplate(REMINDER_HTML_TEMPLATE, filters={"body": _html_paragraphs})
+
+def _header_value(value):
+    """Encode a header value, refusing line breaks that could inject headers"""
+    value = value.replace("\r", " ").replace("\n", " ")
+    if value.isascii():
+        return value.encode("ascii")
+    return Header(value, "utf-8").encode(linesep="\r\n").encode("ascii")
+
+def _fits_7bit(data):
+    return data.isascii() and all(len(line) <= MAX_LINE_LENGTH for line in data.split(_CRLF))
+
+def _mime_part(content_type, data):
+    """A MIME body part: 7bit when the payload allows it, otherwise base64"""
+    if _fits_7bit(data):
+        encoding, payload = b"7bit", data
+    else:
+        encoding, payload = b"base64", base64.encodebytes(data).replace(b"\n", _CRLF)
+    return (b"Content-Type: " + content_type + b'; charset="utf-8"\r\n'
+            b"Content-Transfer-Encoding: " + encoding + b"\r\n\r\n" + payload + _CRLF)
+
+def render_reminder_message(sender_email, recipient_email, task_title, email_body):
+    """
+    Render a reminder as a complete multipart/alternative message
+    
+    Args:
+        sender_email: Address for the From header
+        recipient_email: Address for the To header
+        task_title: Title of the task (used in subject)
+        email_body: The content of the email (AI-generated, plain text)
+    
+    Returns:
+        The serialized message as bytes with CRLF line endings, ready for SMTP
+    """
+    boundary = b"=_reminder_" + uuid.uuid4().hex.encode("ascii")
+    text = email_body.replace("\r\n", "\n").replace("\n", "\r\n").encode("utf-8")
+    
+    return b"".join((
+        b"Subject: ", _header_value(REMINDER_SUBJECT_PREFIX + task_title), _CRLF,
+        b"From: ", _header_value(sender_email), _CRLF,
+        b"To: ", _header_value(recipient_email), _CRLF,
+        b"MIME-Version: 1.0\r\n",
+        b'Content-Type: multipart/alternative; boundary="', boundary, b'"\r\n\r\n',
+        b"--", boundary, _CRLF,
+        _mime_part(b"text/plain", text),
+        b"--", boundary, _CRLF,
+        _mime_part(b"text/html", REMINDER_HTML.render(body=email_body)),
+        b"--", boundary, b"--\r\n",
+    ))
@@ -0,0 +1,306 @@
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import metrics
+
+# Longest a single model request (or, when streaming, the wait for the next chunk) may take
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+
+# Retries after a timeout, rate-limit or server error, with jittered exponential backoff
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+
+# Client-side request budget, refilled continuously; bursts of up to LLM_BURST are allowed
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+
+# Consecutive failed requests that open the circuit, and how long it stays open
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+LLM_CIRCUIT_RESET_SECONDS = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30"))
+
+# Requests run on these threads so a hung call cannot block the caller past its deadline
+_MAX_WORKERS = 16
+
+ERRORS = metrics.counter("todo_llm_errors_total", "Failed Gemini request attempts by error type", ("error",))
+RETRIES = metrics.counter("todo_llm_retries_total", "Gemini requests retried after a retryable error")
+
+# HTTP status codes worth retrying
+_RATE_LIMIT_CODES = (429,)
+_UNAVAILABLE_CODES = (500, 502, 503, 504)
+
+class LLMError(Exception):
+    """Base class for failed language model requests"""
+    retryable = False
+
+class LLMNotConfiguredError(LLMError):
+    """No API key (or model) is configured"""
+
+class LLMTimeoutError(LLMError):
+    """The request did not finish within its deadline"""
+    retryable = True
+
+class LLMRateLimitError(LLMError):
+    """The API quota, or the client-side request budget, is exhausted"""
+    retryable = True
+
+class LLMUnavailableError(LLMError):
+    """The API returned a server error or could not be reached"""
+    retryable = True
+
+class LLMCircuitOpenError(LLMError):
+    """Recent requests kept failing, so new ones are refused until the cooldown ends"""
+
+class LLMResponseError(LLMError):
+    """The request was rejected or the response had no usable text"""
+
+def classify_error(error):
+    """
+    Map an exception raised by the model client onto the LLMError hierarchy
+    
+    Google API errors carry their HTTP status in a .code attribute; network
+    failures surface as OSError subclasses.
+    """
+    if isinstance(error, LLMError):
+        return error
+    
+    code = getattr(error, "code", None)
+    message = f"{type(error).__name__}: {error}"
+    if code in _RATE_LIMIT_CODES:
+        return LLMRateLimitError(message)
+    if code in _UNAVAILABLE_CODES:
+        return LLMUnavailableError(message)
+    if isinstance(error, (TimeoutError, socket.timeout)):
+        return LLMTimeoutError(message)
+    if isinstance(error, (ConnectionError, OSError)):
+        return LLMUnavailableError(message)
+    return LLMResponseError(message)
+
+class TokenBucket:
+    """Allow rate_per_second requests on average, with bursts of up to capacity"""
+    
+    def __init__(self, rate_per_second, capacity):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, timeout):
+        """
+        Take one token, waiting up to timeout seconds for one to become available
+        
+        Returns:
+            True if a token was taken, False if none would be available in time
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+class CircuitBreaker:
+    """
+    Fail fast while the API is degraded
+    
+    After failure_threshold consecutive failures the circuit opens and requests are
+    refused for reset_seconds; then a single trial request is let through, which
+    closes the circuit on success or re-opens it on failure.
+    """
+    
+    def __init__(self, failure_threshold, reset_seconds):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+    
+    def allow(self):
+        """Return True if a request may be sent now"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+class LLMClient:
+    """
+    Calls the model with deadlines, rate limiting, retries and a circuit breaker
+    
+    Every failure is raised as an LLMError subclass. Retryable errors (timeouts,
+    quota and server errors) are retried with jittered exponential backoff and
+    count towards opening the circuit; rejected requests are raised at once.
+    """
+    
+    def __init__(self, get_model, timeout_seconds=LLM_TIMEOUT_SECONDS, max_retries=LLM_MAX_RETRIES,
+                 requests_per_minute=LLM_REQUESTS_PER_MINUTE, burst=LLM_BURST,
+                 failure_threshold=LLM_CIRCUIT_FAILURE_THRESHOLD, reset_seconds=LLM_CIRCUIT_RESET_SECONDS,
+                 backoff_base_seconds=0.5, backoff_max_seconds=8.0):
+        """
+        Args:
+            get_model: Callable returning the model client to send requests to
+            timeout_seconds: Deadline for each request, or for each streamed chunk
+            max_retries: Retries after a retryable error
+            requests_per_minute: Average request rate allowed
+            burst: Requests that may be sent back to back before rate limiting applies
+            failure_threshold: Consecutive failures that open the circuit
+            reset_seconds: How long the circuit stays open
+            backoff_base_seconds: Upper bound of the first retry delay, doubled per retry
+            backoff_max_seconds: Cap on the retry delay
+        """
+        self.get_model = get_model
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.rate_limiter = TokenBucket(requests_per_minute / 60, burst)
+        self.circuit = CircuitBreaker(failure_threshold, reset_seconds)
+        self._executor = ThreadPoolExecutor(max_workers=_MAX_WORKERS, thread_name_prefix="llm")
+    
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff delay before retry number attempt + 1"""
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+    
+    def _call(self, func, *args, **kwargs):
+        """Run func on a worker thread, raising LLMTimeoutError if it misses the deadline"""
+        future = self._executor.submit(func, *args, **kwargs)
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            # The worker finishes (or fails) on its own; its result is discarded
+            future.cancel()
+            raise LLMTimeoutError(f"no response from the model within {self.timeout_seconds:g}s")
+        except Exception as e:
+            raise classify_error(e) from e
+    
+    def _attempt(self, func, *args, **kwargs):
+        """Make one request through the circuit breaker and rate limiter"""
+        open_error = LLMCircuitOpenError("the AI service is failing; requests are paused, try again shortly")
+        if self.circuit.state == "open":
+            raise open_error
+        if not self.rate_limiter.acquire(self.timeout_seconds):
+            raise LLMRateLimitError("client-side request rate limit reached")
+        # Checked again: while half-open only one caller gets to send the trial request
+        if not self.circuit.allow():
+            raise open_error
+        
+        try:
+            result = func(*args, **kwargs)
+        except LLMError as e:
+            if e.retryable:
+                self.circuit.record_failure()
+            else:
+                # A rejected request still shows the API itself is up
+                self.circuit.record_success()
+            raise
+        self.circuit.record_success()
+        return result
+    
+    def _with_retries(self, func, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._attempt(func, *args, **kwargs)
+            except LLMError as e:
+                ERRORS.inc(type(e).__name__)
+                if not e.retryable or attempt == self.max_retries:
+                    raise
+                RETRIES.inc()
+                time.sleep(self._backoff(attempt))
+    
+    def _request(self, prompt):
+        response = self._call(self.get_model().generate_content, prompt)
+        try:
+            response.text
+        except ValueError as e:
+            # No text parts, e.g. the response was blocked by safety filters
+            raise LLMResponseError(f"the model returned no text: {e}") from e
+        return response
+    
+    def generate(self, prompt):
+        """
+        Send a prompt and return the model's response
+        
+        Returns:
+            The response object; its .text is guaranteed to be readable
+        
+        Raises:
+            LLMError: If the request failed after any retries
+        """
+        return self._with_retries(self._request, prompt)
+    
+    def _next_text(self, chunks):
+        """Return the next chunk's text, skipping chunks without any, or None at the end"""
+        while True:
+            chunk = self._call(next, chunks, None)
+            if chunk is None:
+                return None
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. only safety metadata)
+                continue
+            if text:
+                return text
+    
+    def _open_stream(self, prompt):
+        chunks = iter(self._call(self.get_model().generate_content, prompt, stream=True))
+        return chunks, self._next_text(chunks)
+    
+    def stream(self, prompt):
+        """
+        Send a prompt and yield the response text as the model produces it
+        
+        The request is retried only until its first chunk arrives, so callers never
+        see repeated text; after that each chunk must arrive within the deadline.
+        
+        Yields:
+            Non-empty text chunks
+        
+        Raises:
+            LLMError: If the request failed after any retries, or the stream broke off
+        """
+        chunks, text = self._with_retries(self._open_stream, prompt)
+        while text is not None:
+            yield text
+            try:
+                text = self._next_text(chunks)
+            except LLMError as e:
+                ERRORS.inc(type(e).__name__)
+                if e.retryable:
+                    self.circuit.record_failure()
+                raise
@@ -0,0 +1,270 @@
+import functools
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Port for the Prometheus endpoint started by the app; empty or 0 disables it
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464") or 0)
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+class _HistogramSeries:
+    """Bucket counts, total count and sum for one label combination"""
+    
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+    
+    def observe(self, value):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.buckets[index] += 1
+            self.count += 1
+            self.sum += value
+    
+    def quantile(self, q):
+        """Estimate a quantile by interpolating within the bucket that contains it"""
+        with self._lock:
+            buckets, count = list(self.buckets), self.count
+        if not count:
+            return None
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(buckets):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else lower
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.bounds[-1]
+
+class _CounterSeries:
+    """A monotonically increasing value for one label combination"""
+    
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+class _Metric:
+    kind = None
+    
+    def __init__(self, name, help_text, labelnames):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def _new_series(self):
+        raise NotImplementedError
+    
+    def labels(self, *values, **labels):
+        """Return the series for a label combination, creating it on first use"""
+        if labels:
+            values = tuple(labels[name] for name in self.labelnames)
+        series = self._series.get(values)
+        if series is None:
+            values = tuple(str(value) for value in values)
+            with self._lock:
+                series = self._series.setdefault(values, self._new_series())
+        return series
+    
+    def series(self):
+        """Return (label values, series) pairs, sorted by label"""
+        with self._lock:
+            return sorted(self._series.items())
+
+class Histogram(_Metric):
+    kind = "histogram"
+    
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.bounds = tuple(sorted(buckets))
+    
+    def _new_series(self):
+        return _HistogramSeries(self.bounds)
+    
+    def observe(self, value, *label_values):
+        self.labels(*label_values).observe(value)
+
+class Counter(_Metric):
+    kind = "counter"
+    
+    def _new_series(self):
+        return _CounterSeries()
+    
+    def inc(self, *label_values, amount=1):
+        self.labels(*label_values).inc(amount)
+
+class Gauge(_Metric):
+    """A value read from a callback whenever metrics are exported"""
+    kind = "gauge"
+    
+    def __init__(self, name, help_text, read):
+        super().__init__(name, help_text, ())
+        self.read = read
+
+def _register(metric):
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+def histogram(name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+    """Return the histogram registered under name, creating it if needed"""
+    return _register(Histogram(name, help_text, labelnames, buckets))
+
+def counter(name, help_text, labelnames=()):
+    """Return the counter registered under name, creating it if needed"""
+    return _register(Counter(name, help_text, labelnames))
+
+def gauge(name, help_text, read):
+    """Register a gauge whose value is read(), evaluated at export time"""
+    return _register(Gauge(name, help_text, read))
+
+def timed(metric, *label_values):
+    """
+    Decorator recording how long each call takes in a histogram
+    
+    The series is resolved once, at decoration time; without label_values, a
+    histogram's single label is set to the decorated function's name.
+    Generator functions are timed until they are exhausted or closed, errors
+    included.
+    """
+    def decorate(func):
+        series = metric.labels(*(label_values or (func.__name__,) * len(metric.labelnames)))
+        perf_counter = time.perf_counter
+        
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def timed_generator(*args, **kwargs):
+                start = perf_counter()
+                try:
+                    return (yield from func(*args, **kwargs))
+                finally:
+                    series.observe(perf_counter() - start)
+            return timed_generator
+        
+        @functools.wraps(func)
+        def timed_call(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                series.observe(perf_counter() - start)
+        return timed_call
+    
+    return decorate
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+def render_prometheus():
+    """Return every registered metric in the Prometheus text exposition format"""
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda metric: metric.name)
+    
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if isinstance(metric, Gauge):
+            lines.append(f"{metric.name} {float(metric.read())}")
+            continue
+        for values, series in metric.series():
+            if isinstance(metric, Counter):
+                lines.append(f"{metric.name}{_format_labels(metric.labelnames, values)} {series.value}")
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip(metric.bounds + (None,), series.buckets):
+                cumulative += bucket_count
+                le = "+Inf" if bound is None else repr(float(bound))
+                labels = _format_labels(metric.labelnames, values, [("le", le)])
+                lines.append(f"{metric.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(metric.labelnames, values)
+            lines.append(f"{metric.name}_sum{labels} {series.sum}")
+            lines.append(f"{metric.name}_count{labels} {series.count}")
+    return "\n".join(lines) + "\n"
+
+def snapshot():
+    """
+    Summarize every metric for display
+    
+    Returns:
+        A list of dicts with the metric name, kind, labels and, for histograms,
+        count, mean, p50 and p95 (seconds); for counters and gauges, the value
+    """
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda metric: metric.name)
+    
+    rows = []
+    for metric in metrics:
+        if isinstance(metric, Gauge):
+            rows.append({"metric": metric.name, "kind": metric.kind, "labels": "", "value": metric.read()})
+            continue
+        for values, series in metric.series():
+            row = {"metric": metric.name, "kind": metric.kind,
+                   "labels": ", ".join(f"{name}={value}" for name, value in zip(metric.labelnames, values))}
+            if isinstance(metric, Counter):
+                row["value"] = series.value
+            else:
+                row.update(count=series.count, mean=series.sum / series.count if series.count else None,
+                           p50=series.quantile(0.5), p95=series.quantile(0.95))
+            rows.append(row)
+    return rows
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        # Scrapes are frequent; keep them out of the app's output
+        pass
+
+def start_http_server(port=METRICS_PORT, host="127.0.0.1"):
+    """
+    Serve /metrics in Prometheus format from a background thread
+    
+    Returns:
+        The server, or None if the port is disabled or already in use
+    """
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        print(f"Metrics endpoint not started on port {port}: {str(e)}")
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
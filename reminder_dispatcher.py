@@ -0,0 +1,119 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import NamedTuple, Optional
+
+from ai_features import DEFAULT_BATCH_SIZE, generate_reminder_emails_batch
+from database import init_db, get_upcoming_tasks
+from email_sender import get_smtp_client, send_reminder_email
+from llm_client import LLMError
+
+# Concurrent Gemini requests while generating a batch; keeps bursts inside the API rate limit
+DEFAULT_LLM_CONCURRENCY = 4
+
+class ReminderResult(NamedTuple):
+    """Outcome of one reminder in a batch"""
+    task_id: int
+    recipient: str
+    sent: bool
+    error: Optional[str]
+    generate_seconds: float
+    send_seconds: float
+
+def _generate_chunk(generate_batch, chunk):
+    """Generate bodies for a chunk of task rows with one generate_batch call"""
+    start = time.perf_counter()
+    try:
+        outputs, _stats = generate_batch([(task[1], task[2], task[3], task[4]) for task in chunk])
+        # Items that failed hold their LLMError instead of text
+        bodies = [None if isinstance(output, LLMError) else output for output in outputs]
+        errors = [str(output) if isinstance(output, LLMError) else None for output in outputs]
+    except Exception as e:
+        bodies, errors = [None] * len(chunk), [str(e)] * len(chunk)
+    seconds = time.perf_counter() - start
+    return [(task, body, error, seconds) for task, body, error in zip(chunk, bodies, errors)]
+
+def dispatch_reminders(tasks, generate_email=None, max_llm_concurrency=DEFAULT_LLM_CONCURRENCY,
+                       batch_size=DEFAULT_BATCH_SIZE, generate_batch=None):
+    """
+    Generate and send reminder emails for many tasks
+    
+    Tasks are packed batch_size at a time into single Gemini requests, with at
+    most max_llm_concurrency requests in flight, and each email is delivered as
+    soon as its batch is ready over the shared pool of authenticated SMTP
+    connections from email_sender.get_smtp_client().
+    
+    Args:
+        tasks: Task rows as returned by get_upcoming_tasks()
+        generate_email: Optional per-task callable (title, description, deadline, priority) -> body;
+            when given, each task is generated separately
+        max_llm_concurrency: Maximum concurrent model requests
+        batch_size: Tasks per model request
+        generate_batch: Callable taking a list of (title, description, deadline, priority)
+            and returning (bodies or LLMErrors, stats); defaults to ai_features.generate_reminder_emails_batch
+    
+    Returns:
+        A list of ReminderResult, one per task, in completion order
+    """
+    if generate_email is not None:
+        generate_batch = lambda items: ([generate_email(*item) for item in items], None)
+        batch_size = 1
+    generate_batch = generate_batch or generate_reminder_emails_batch
+    
+    config = get_smtp_client().config
+    if not config["sender"] or not config["password"]:
+        print("Warning: Email credentials not configured in .env file")
+        return [ReminderResult(task[0], task[6], False, "Email credentials not configured", 0.0, 0.0)
+                for task in tasks]
+    
+    results = []
+    
+    with ThreadPoolExecutor(max_workers=max_llm_concurrency) as pool:
+        futures = [
+            pool.submit(_generate_chunk, generate_batch, tasks[start:start + batch_size])
+            for start in range(0, len(tasks), batch_size)
+        ]
+        for future in as_completed(futures):
+            for task, body, error, generate_seconds in future.result():
+                task_id, title, recipient = task[0], task[1], task[6]
+                
+                if error:
+                    results.append(ReminderResult(task_id, recipient, False, error, generate_seconds, 0.0))
+                    continue
+                
+                start = time.perf_counter()
+                sent = send_reminder_email(recipient, title, body)
+                results.append(ReminderResult(
+                    task_id, recipient, sent, None if sent else "SMTP delivery failed",
+                    generate_seconds, time.perf_counter() - start
+                ))
+    
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send AI-generated reminders for upcoming tasks")
+    parser.add_argument("--days", type=int, default=3, help="remind about pending tasks due within this many days")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_LLM_CONCURRENCY,
+                        help="maximum concurrent Gemini requests")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="tasks packed into each Gemini request")
+    args = parser.parse_args(argv)
+    
+    init_db()
+    tasks = get_upcoming_tasks(args.days)
+    print(f"Sending reminders for {len(tasks)} upcoming tasks")
+    
+    start = time.perf_counter()
+    results = dispatch_reminders(tasks, max_llm_concurrency=args.concurrency, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+    
+    for result in results:
+        status = "sent" if result.sent else f"FAILED ({result.error})"
+        print(f"task {result.task_id} -> {result.recipient}: {status}")
+    
+    sent = sum(result.sent for result in results)
+    print(f"{sent}/{len(results)} reminders sent in {elapsed:.1f}s")
+    return 0 if sent == len(results) else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,239 @@
+import argparse
+import os
+import random
+import threading
+import time
+from datetime import date
+from typing import NamedTuple, Optional
+
+import metrics
+from database import (init_db, get_task_by_id, enqueue_reminder, claim_outbox_batch, extend_outbox_lease,
+                      set_outbox_body, mark_outbox_sent, mark_outbox_failed)
+from llm_client import LLMCircuitOpenError, LLMError, LLMUnavailableError
+
+# Entries claimed per drain; their bodies are generated DEFAULT_BATCH_SIZE per model request
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+
+# Attempts before an entry is marked failed, and the retry delay (doubled per attempt, jittered)
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_RETRY_SECONDS = float(os.getenv("OUTBOX_RETRY_SECONDS", "30"))
+OUTBOX_MAX_RETRY_SECONDS = 3600
+
+# How long a claimed entry is hidden from other workers before it is considered abandoned
+OUTBOX_LEASE_SECONDS = 300
+
+# How often an idle worker checks for entries queued by other processes or due for a retry
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "5"))
+
+OUTCOMES = metrics.counter("todo_outbox_reminders_total", "Outbox reminders by outcome", ("outcome",))
+
+class OutboxResult(NamedTuple):
+    """Outcome of one attempt at an outbox entry"""
+    entry_id: int
+    task_id: int
+    recipient: str
+    sent: bool
+    error: Optional[str]
+
+def idempotency_key(task_id, day=None):
+    """The outbox key allowing one manual reminder per task per day"""
+    return f"task-reminder:{task_id}:{(day or date.today()).isoformat()}"
+
+def retry_delay(attempts):
+    """Full-jitter exponential backoff before the attempt after attempt number attempts"""
+    return random.uniform(0.5, 1.0) * min(OUTBOX_MAX_RETRY_SECONDS, OUTBOX_RETRY_SECONDS * 2 ** (attempts - 1))
+
+def enqueue_task_reminder(task, day=None):
+    """
+    Queue a reminder email for a task, at most once per task per day
+    
+    The body is generated and the email sent by the outbox worker, so this
+    returns at once; the running worker, if any, is woken up.
+    
+    Args:
+        task: A Task record
+        day: The day the reminder counts against (defaults to today)
+    
+    Returns:
+        (entry id, created) where created is False if today's reminder was already queued
+    """
+    entry_id, created = enqueue_reminder(task.id, task.email, task.title, idempotency_key(task.id, day))
+    OUTCOMES.inc("queued" if created else "duplicate")
+    if created and _worker is not None:
+        _worker.wake()
+    return entry_id, created
+
+def _fail(entry, error, retryable=True, now=None):
+    now = now if now is not None else time.time()
+    if retryable and entry.attempts < OUTBOX_MAX_ATTEMPTS:
+        mark_outbox_failed(entry.id, error, now + retry_delay(entry.attempts))
+        OUTCOMES.inc("retry")
+    else:
+        mark_outbox_failed(entry.id, error)
+        OUTCOMES.inc("failed")
+    return OutboxResult(entry.id, entry.task_id, entry.recipient, False, error)
+
+def _generate_bodies(entries, generate_batch):
+    """Generate and store bodies for entries that do not have one; returns {entry id: body or LLMError}"""
+    from ai_features import DEFAULT_BATCH_SIZE
+    
+    bodies = {entry.id: entry.body for entry in entries if entry.body is not None}
+    missing = [entry for entry in entries if entry.body is None]
+    
+    for start in range(0, len(missing), DEFAULT_BATCH_SIZE):
+        chunk = missing[start:start + DEFAULT_BATCH_SIZE]
+        tasks = [get_task_by_id(entry.task_id) for entry in chunk]
+        # Tasks deleted after their reminder was queued have nothing to remind about
+        items = [(task.title, task.description, task.deadline, task.priority) for task in tasks if task]
+        try:
+            outputs = iter(generate_batch(items)[0])
+        except Exception as e:
+            outputs = iter([LLMUnavailableError(str(e))] * len(items))
+        for entry, task in zip(chunk, tasks):
+            if task is None:
+                bodies[entry.id] = LLMError("the task was deleted")
+                continue
+            # A batch short of outputs fails only the entries it left out, and they are retried
+            body = next(outputs, None)
+            if body is None:
+                body = LLMUnavailableError("missing output")
+            if not isinstance(body, LLMError):
+                set_outbox_body(entry.id, body)
+            bodies[entry.id] = body
+    return bodies
+
+def drain_once(batch_size=OUTBOX_BATCH_SIZE, generate_batch=None, send=None, now=None):
+    """
+    Claim one batch of due outbox entries, generate any missing bodies and send them
+    
+    Failed sends and retryable generation errors are retried later with
+    backoff; generation errors that cannot succeed on retry fail the entry.
+    The lease is renewed after generation, and entries another worker claimed
+    once it ran out are skipped rather than sent twice.
+    
+    Args:
+        batch_size: Maximum entries to claim
+        generate_batch: Batch body generator (defaults to ai_features.generate_reminder_emails_batch)
+        send: Callable (recipient, title, body) -> bool (defaults to email_sender.send_reminder_email)
+        now: Current time as epoch seconds (defaults to time.time())
+    
+    Returns:
+        A list of OutboxResult, empty when nothing was due
+    """
+    entries = claim_outbox_batch(batch_size, OUTBOX_LEASE_SECONDS, now)
+    if not entries:
+        return []
+    
+    # Imported once there is something to send, so enqueueing from the app stays light
+    if generate_batch is None:
+        from ai_features import generate_reminder_emails_batch as generate_batch
+    if send is None:
+        from email_sender import send_reminder_email as send
+    
+    bodies = _generate_bodies(entries, generate_batch)
+    # Generation can take up most of the lease, so renew it for the sends; an entry
+    # whose lease ran out meanwhile belongs to the worker that claimed it again
+    held = extend_outbox_lease(entries, OUTBOX_LEASE_SECONDS, now)
+    results = []
+    for entry in entries:
+        if entry.id not in held:
+            OUTCOMES.inc("lease_lost")
+            continue
+        body = bodies[entry.id]
+        if isinstance(body, LLMError):
+            # An open circuit closes again after its cooldown, so those entries are retried too
+            retryable = body.retryable or isinstance(body, LLMCircuitOpenError)
+            results.append(_fail(entry, f"Could not generate the email: {body}", retryable, now))
+            continue
+        if not send(entry.recipient, entry.title, body):
+            results.append(_fail(entry, "SMTP delivery failed", now=now))
+            continue
+        mark_outbox_sent(entry.id, now)
+        OUTCOMES.inc("sent")
+        results.append(OutboxResult(entry.id, entry.task_id, entry.recipient, True, None))
+    return results
+
+class OutboxWorker:
+    """
+    Drains the outbox on a background thread
+    
+    The worker drains until nothing is due, then sleeps for poll_seconds or
+    until wake() is called by enqueue_task_reminder(), so a burst of clicks is
+    absorbed by the queue and sent in batches without blocking the caller.
+    """
+    
+    def __init__(self, batch_size=OUTBOX_BATCH_SIZE, poll_seconds=OUTBOX_POLL_SECONDS, drain=drain_once):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.drain = drain
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        self._thread = threading.Thread(target=self.run_forever, name="reminder-outbox", daemon=True)
+        self._thread.start()
+        return self
+    
+    def wake(self):
+        self._wake.set()
+    
+    def stop(self, timeout=None):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def run_forever(self):
+        while not self._stopped.is_set():
+            self._wake.clear()
+            try:
+                while not self._stopped.is_set() and self.drain(self.batch_size):
+                    pass
+            except Exception as e:
+                # Keep the worker alive; claimed entries are retried once their lease runs out
+                print(f"Reminder outbox worker error: {str(e)}")
+            self._wake.wait(self.poll_seconds)
+
+_worker = None
+_worker_lock = threading.Lock()
+
+def start_worker():
+    """Start the process-wide outbox worker on first use and return it"""
+    global _worker
+    
+    with _worker_lock:
+        if _worker is None:
+            _worker = OutboxWorker().start()
+        return _worker
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate and send queued reminder emails")
+    parser.add_argument("--once", action="store_true", help="send everything that is due now and exit")
+    parser.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE, help="entries claimed per batch")
+    parser.add_argument("--poll-seconds", type=float, default=OUTBOX_POLL_SECONDS,
+                        help="how often to check for newly queued reminders")
+    args = parser.parse_args(argv)
+    
+    init_db()
+    if args.once:
+        results = []
+        while True:
+            batch = drain_once(args.batch_size)
+            if not batch:
+                break
+            results.extend(batch)
+        for result in results:
+            status = "sent" if result.sent else f"FAILED ({result.error})"
+            print(f"task {result.task_id} -> {result.recipient}: {status}")
+        return 0
+    
+    print("Reminder outbox worker running (Ctrl+C to stop)")
+    try:
+        OutboxWorker(args.batch_size, args.poll_seconds).run_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+import argparse
+import heapq
+import time
+
+import metrics
+from database import init_db, get_scheduled_reminders, claim_due_reminders
+from reminder_dispatcher import DEFAULT_LLM_CONCURRENCY, dispatch_reminders
+
+class ReminderScheduler:
+    """
+    Sends reminders as tasks cross their reminder thresholds
+    
+    Upcoming (next_reminder_at, task_id) entries are loaded from the
+    next_reminder_at index into a min-heap, so the scheduler sleeps until the
+    earliest one is due instead of polling the tasks table. The heap is refreshed
+    every refresh_seconds to pick up tasks added or changed by the app, and each
+    tick claims at most batch_size reminders, keeping per-tick work bounded no
+    matter how many tasks exist.
+    """
+    
+    def __init__(self, batch_size=200, refresh_seconds=60, lookahead_seconds=3600,
+                 max_llm_concurrency=DEFAULT_LLM_CONCURRENCY, send=None, clock=time.time):
+        self.batch_size = batch_size
+        self.refresh_seconds = refresh_seconds
+        self.lookahead_seconds = lookahead_seconds
+        self.max_llm_concurrency = max_llm_concurrency
+        self.send = send or (lambda tasks: dispatch_reminders(tasks, max_llm_concurrency=self.max_llm_concurrency))
+        self.clock = clock
+        self._heap = []
+        self._queued = set()
+        self._next_refresh = 0
+    
+    def refresh(self):
+        """Load reminders due within the lookahead window into the heap"""
+        now = self.clock()
+        # Bounded so a backlog after downtime is loaded gradually, not all at once
+        limit = self.batch_size * 10
+        for entry in get_scheduled_reminders(int(now + self.lookahead_seconds), limit):
+            if entry not in self._queued:
+                heapq.heappush(self._heap, entry)
+                self._queued.add(entry)
+        self._next_refresh = now + self.refresh_seconds
+    
+    def tick(self):
+        """
+        Claim and send reminders that are due now
+        
+        Returns:
+            The list of send results for this tick (empty when nothing was due)
+        """
+        now = self.clock()
+        if now >= self._next_refresh:
+            self.refresh()
+        
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+            entry = heapq.heappop(self._heap)
+            self._queued.discard(entry)
+            due.append(entry)
+        
+        if not due:
+            return []
+        
+        # Claiming first records each reminder as sent, giving at-most-once delivery
+        tasks = claim_due_reminders(due, now)
+        
+        # A full batch suggests a backlog, so top the heap up again on the next tick
+        if len(due) == self.batch_size:
+            self._next_refresh = now
+        
+        return self.send(tasks) if tasks else []
+    
+    def has_due(self):
+        """Whether a loaded reminder is already due"""
+        return bool(self._heap) and self._heap[0][0] <= self.clock()
+    
+    def seconds_until_next(self):
+        """How long the scheduler can sleep before the next due reminder or refresh"""
+        now = self.clock()
+        wake_at = self._next_refresh
+        if self._heap:
+            wake_at = min(wake_at, self._heap[0][0])
+        return max(0.0, wake_at - now)
+    
+    def run_forever(self):
+        """Tick until interrupted, sleeping between due reminders"""
+        while True:
+            for result in self.tick():
+                status = "sent" if result.sent else f"FAILED ({result.error})"
+                print(f"task {result.task_id} -> {result.recipient}: {status}")
+            time.sleep(self.seconds_until_next())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send reminder emails automatically as task deadlines approach")
+    parser.add_argument("--once", action="store_true", help="send reminders that are due now and exit")
+    parser.add_argument("--batch-size", type=int, default=200, help="maximum reminders claimed per tick")
+    parser.add_argument("--refresh-seconds", type=int, default=60,
+                        help="how often to pick up tasks added or changed by the app")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_LLM_CONCURRENCY,
+                        help="maximum concurrent Gemini requests")
+    parser.add_argument("--metrics-port", type=int, default=0,
+                        help="serve Prometheus metrics on this port (default: off)")
+    args = parser.parse_args(argv)
+    
+    init_db()
+    metrics.start_http_server(args.metrics_port)
+    scheduler = ReminderScheduler(
+        batch_size=args.batch_size,
+        refresh_seconds=args.refresh_seconds,
+        max_llm_concurrency=args.concurrency
+    )
+    
+    if args.once:
+        scheduler.refresh()
+        while scheduler.has_due():
+            results = scheduler.tick()
+            print(f"Sent {sum(r.sent for r in results)}/{len(results)} reminders")
+            scheduler.refresh()
+        return 0
+    
+    print("Reminder scheduler running (Ctrl+C to stop)")
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
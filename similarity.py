@@ -0,0 +1,200 @@
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+
+import metrics
+from database import get_tasks_by_ids, get_tasks_page, iter_task_texts
+
+# Completed tasks sent to the model as context for suggestions
+SUGGESTION_CONTEXT_TASKS = 10
+
+# Pending tasks (soonest deadline first) describing current work when no focus is given
+SUGGESTION_FOCUS_TASKS = 10
+
+# Title words count this many times as much as description words
+TITLE_WEIGHT = 2
+
+# Words too common to say anything about what a task is about
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in into is it its of on or our the this that to was
+    were will with my your me we you i do get make new all any up out about after before
+""".split())
+
+# Terms whose IDF is below this (found in over ~90% of tasks) are left out of the scoring
+# loop; they would add almost nothing to any score but cost a visit to every posting
+MIN_IDF = 0.1
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+LOOKUP_SECONDS = metrics.histogram("todo_similarity_seconds", "Similar-task lookups and index catch-up",
+                                   ("operation",))
+
+def tokenize(text):
+    """Lowercase words of text without stopwords, with plural "s" stripped from longer words"""
+    terms = []
+    for word in _WORD.findall(text.lower()):
+        if len(word) < 2 or word in STOPWORDS:
+            continue
+        if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+class SimilarityIndex:
+    """
+    An in-memory TF-IDF index over task titles and descriptions
+    
+    Documents are weighted by log term frequency and normalized to unit length
+    without IDF, and queries by log term frequency times IDF (the lnc.ltc
+    scheme), so adding a task never changes the weights of the tasks already
+    indexed. Vectors are sparse: each term keeps a posting list of
+    {task id: weight}, and a lookup only visits the postings of its own terms.
+    
+    The index only holds text. Status and deletions are read from the database
+    when results are returned, so completing or deleting a task needs no update.
+    """
+    
+    def __init__(self):
+        self._postings = {}
+        self._terms = {}
+        self._lock = threading.Lock()
+        self.last_id = 0
+    
+    def __len__(self):
+        return len(self._terms)
+    
+    def add(self, task_id, title, description):
+        """Index one task (re-adding a task id is ignored)"""
+        terms = Counter(tokenize(title) * TITLE_WEIGHT + tokenize(description))
+        weights = {term: 1 + math.log(count) for term, count in terms.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        
+        with self._lock:
+            if task_id in self._terms:
+                return
+            for term, weight in weights.items():
+                self._postings.setdefault(term, {})[task_id] = weight / norm
+            self._terms[task_id] = tuple(weights)
+            self.last_id = max(self.last_id, task_id)
+    
+    @metrics.timed(LOOKUP_SECONDS, "refresh")
+    def refresh(self):
+        """Index the tasks added to the database since the last refresh; returns how many"""
+        added = 0
+        for task_id, title, description in iter_task_texts(self.last_id):
+            self.add(task_id, title, description)
+            added += 1
+        return added
+    
+    def search(self, text, exclude=()):
+        """
+        Rank indexed tasks by cosine similarity to text
+        
+        Args:
+            text: The query, e.g. a task's title and description
+            exclude: Task ids to leave out
+        
+        Returns:
+            An iterator of (task id, score) pairs, most similar first; tasks
+            sharing no terms with the query are not included
+        """
+        terms = Counter(tokenize(text))
+        scores = {}
+        with self._lock:
+            count = len(self._terms)
+            query = {}
+            for term, term_count in terms.items():
+                postings = self._postings.get(term)
+                if postings:
+                    idf = math.log((count + 1) / len(postings))
+                    query[term] = ((1 + math.log(term_count)) * idf, idf >= MIN_IDF)
+            norm = math.sqrt(sum(weight * weight for weight, _ in query.values())) or 1.0
+            for term, (weight, scored) in query.items():
+                if not scored:
+                    continue
+                weight /= norm
+                get_score = scores.get
+                for task_id, doc_weight in self._postings[term].items():
+                    scores[task_id] = get_score(task_id, 0.0) + weight * doc_weight
+        
+        for task_id in exclude:
+            scores.pop(task_id, None)
+        # Sort lazily: callers usually stop after the first few hits
+        heap = [(-score, task_id) for task_id, score in scores.items() if score > 0]
+        heapq.heapify(heap)
+        while heap:
+            score, task_id = heapq.heappop(heap)
+            yield task_id, -score
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_index():
+    """Return the process-wide index, built from the database on first use and caught up on every call"""
+    global _index
+    
+    with _index_lock:
+        if _index is None:
+            _index = SimilarityIndex()
+        # Tasks are only ever appended, so catching up is one query on the primary key
+        _index.refresh()
+        return _index
+
+def _ranked_tasks(ranked, limit, filter_status):
+    """Take the first limit tasks from (task id, score) pairs that still exist and match filter_status"""
+    results = []
+    while len(results) < limit:
+        chunk = [pair for _, pair in zip(range(max(limit * 2, 50)), ranked)]
+        if not chunk:
+            break
+        scores = dict(chunk)
+        tasks = get_tasks_by_ids(list(scores), filter_status)
+        results.extend((task, scores[task.id]) for task in tasks)
+    return results[:limit]
+
+@metrics.timed(LOOKUP_SECONDS, "search")
+def find_similar(text, limit=5, filter_status="All", exclude=()):
+    """
+    Find the tasks most similar to a piece of text, without any API call
+    
+    Args:
+        text: Title and/or description to match
+        limit: Maximum number of tasks to return
+        filter_status: "All", "Pending" or "Completed"
+        exclude: Task ids to leave out
+    
+    Returns:
+        A list of (Task, score) pairs, most similar first, with scores in (0, 1]
+    """
+    return _ranked_tasks(get_index().search(text, exclude), limit, filter_status)
+
+def similar_tasks(task, limit=5, filter_status="All"):
+    """Tasks most similar to a given Task, excluding itself"""
+    return find_similar(f"{task.title} {task.description}", limit, filter_status, exclude=(task.id,))
+
+def suggestion_context(focus=None, limit=SUGGESTION_CONTEXT_TASKS):
+    """
+    Pick the completed tasks to show the model when asking for suggestions
+    
+    Instead of every completed task, only the ones most similar to the focus
+    are sent, so the prompt stays the same size however many tasks are done.
+    
+    Args:
+        focus: What to suggest tasks for; defaults to the pending tasks due soonest
+        limit: Maximum number of completed tasks to return
+    
+    Returns:
+        A list of completed task titles, most relevant first
+    """
+    if not focus:
+        pending, _ = get_tasks_page("Pending", "Deadline", SUGGESTION_FOCUS_TASKS)
+        focus = " ".join(f"{task.title} {task.description}" for task in pending)
+    
+    titles = [task.title for task, _ in find_similar(focus, limit, "Completed")]
+    if not titles:
+        # Nothing related has been completed; fall back to the most recently added completed tasks
+        completed, _ = get_tasks_page("Completed", "Date Added", limit)
+        titles = [task.title for task in completed]
+    return titles
@@ -0,0 +1,227 @@
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import time
+from datetime import date, datetime, timezone
+from typing import List, NamedTuple
+
+from database import PRIORITY_RANKS, TASK_COLUMNS, bulk_insert_tasks, init_db, iter_tasks
+
+# Columns written by the exporter; the importer accepts the same layout and ignores id
+EXPORT_COLUMNS = TASK_COLUMNS.split(", ")
+
+FORMATS = ("csv", "jsonl")
+
+# Rows per import transaction
+IMPORT_BATCH_SIZE = 5000
+
+# Rejected rows reported back in detail; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+STATUSES = ("Pending", "Completed")
+
+_DEADLINE_FORMAT = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+def parse_created_at(value):
+    """
+    Normalize an imported created_at to SQLite's CURRENT_TIMESTAMP format (UTC)
+    
+    Any ISO 8601 date or date-time is accepted; times with an offset are
+    converted to UTC, and fractional seconds are dropped.
+    
+    Raises:
+        ValueError: If value is not an ISO 8601 date or date-time
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"created_at must be an ISO date-time (YYYY-MM-DD HH:MM:SS), got {value!r}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat(" ", "seconds")
+
+class ImportReport(NamedTuple):
+    """Outcome of a bulk import"""
+    imported: int
+    rejected: int
+    errors: List[str]
+    seconds: float
+
+def format_for_filename(filename):
+    """Pick csv or jsonl from a file extension, defaulting to csv"""
+    extension = os.path.splitext(filename)[1].lower().lstrip(".")
+    return "jsonl" if extension in ("jsonl", "ndjson") else "csv"
+
+def read_rows(stream, fmt):
+    """
+    Yield (line_number, dict) pairs from a CSV or JSON Lines text stream
+    
+    Lines that cannot be parsed are yielded with a None row so the caller
+    can report them without stopping the import.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+def validate_row(row):
+    """
+    Turn a raw import row into the tuple bulk_insert_tasks expects
+    
+    Raises:
+        ValueError: With a message describing the first problem found
+    """
+    if row is None:
+        raise ValueError("not a valid record")
+    
+    def text(name):
+        value = row.get(name)
+        return "" if value is None else str(value).strip()
+    
+    title = text("title")
+    email = text("email")
+    deadline = text("deadline")
+    priority = text("priority").title()
+    status = text("status").title() or "Pending"
+    created_at = text("created_at") or None
+    
+    if not title:
+        raise ValueError("title is required")
+    if "@" not in email:
+        raise ValueError(f"invalid email {email!r}")
+    try:
+        if not _DEADLINE_FORMAT.fullmatch(deadline):
+            raise ValueError
+        date.fromisoformat(deadline)
+    except ValueError:
+        raise ValueError(f"deadline must be YYYY-MM-DD, got {deadline!r}")
+    if priority not in PRIORITY_RANKS:
+        raise ValueError(f"priority must be one of {', '.join(PRIORITY_RANKS)}, got {priority!r}")
+    if status not in STATUSES:
+        raise ValueError(f"status must be Pending or Completed, got {status!r}")
+    # Stored as-is it would break "Date Added" sorting and its pagination cursors
+    if created_at is not None:
+        created_at = parse_created_at(created_at)
+    
+    return (title, text("description"), deadline, priority, email, status, created_at)
+
+def import_tasks(stream, fmt, batch_size=IMPORT_BATCH_SIZE, defer_indexes=False):
+    """
+    Stream tasks from a CSV or JSON Lines file into the database
+    
+    Rows are validated one at a time as they are read; invalid rows are
+    skipped and reported, valid ones are inserted in batched transactions.
+    
+    Args:
+        stream: Text stream to read from
+        fmt: "csv" or "jsonl"
+        batch_size: Rows per transaction
+        defer_indexes: Rebuild indexes once after the load (faster for very large files)
+    
+    Returns:
+        An ImportReport
+    """
+    errors = []
+    rejected = 0
+    
+    def valid_rows():
+        nonlocal rejected
+        for line_number, row in read_rows(stream, fmt):
+            try:
+                yield validate_row(row)
+            except ValueError as e:
+                rejected += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(f"line {line_number}: {e}")
+    
+    start = time.perf_counter()
+    imported = bulk_insert_tasks(valid_rows(), batch_size=batch_size, defer_indexes=defer_indexes)
+    return ImportReport(imported, rejected, errors, time.perf_counter() - start)
+
+def export_tasks(stream, fmt, filter_status="All"):
+    """
+    Stream tasks to a CSV or JSON Lines text stream
+    
+    Rows are written as they are read from the cursor, so memory use stays
+    flat however many tasks there are.
+    
+    Returns:
+        The number of tasks written
+    """
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(EXPORT_COLUMNS)
+        for task in iter_tasks(filter_status):
+            writer.writerow(task)
+            count += 1
+        return count
+    
+    for task in iter_tasks(filter_status):
+        stream.write(json.dumps(dict(zip(EXPORT_COLUMNS, task)), ensure_ascii=False))
+        stream.write("\n")
+        count += 1
+    return count
+
+def export_tasks_bytes(fmt, filter_status="All"):
+    """Export tasks to UTF-8 bytes for a download button"""
+    buffer = io.BytesIO()
+    stream = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+    export_tasks(stream, fmt, filter_status)
+    stream.flush()
+    return stream.detach().getvalue()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import or export tasks as CSV or JSON Lines")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    import_parser = subparsers.add_parser("import", help="load tasks from a file")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE,
+                               help="rows per transaction")
+    import_parser.add_argument("--defer-indexes", action="store_true",
+                               help="rebuild indexes after the load instead of per row")
+    
+    export_parser = subparsers.add_parser("export", help="write tasks to a file")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    export_parser.add_argument("--status", choices=("All",) + STATUSES, default="All")
+    args = parser.parse_args(argv)
+    
+    init_db()
+    fmt = args.format or format_for_filename(args.path)
+    
+    if args.command == "import":
+        with open(args.path, encoding="utf-8-sig", newline="") as f:
+            report = import_tasks(f, fmt, args.batch_size, args.defer_indexes)
+        for error in report.errors:
+            print(error)
+        rate = report.imported / report.seconds if report.seconds else 0
+        print(f"Imported {report.imported} tasks ({report.rejected} rejected) "
+              f"in {report.seconds:.1f}s, {rate:,.0f} rows/sec")
+        return 0 if not report.rejected else 1
+    
+    start = time.perf_counter()
+    with open(args.path, "w", encoding="utf-8", newline="") as f:
+        count = export_tasks(f, fmt, args.status)
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else 0
+    print(f"Exported {count} tasks in {elapsed:.1f}s, {rate:,.0f} rows/sec")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+# Make the app modules and the benchmark fakes importable
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [REPO_ROOT, os.path.join(REPO_ROOT, "benchmarks")]
+
+import database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh, migrated database file for one test"""
+    database.close_connections()
+    monkeypatch.setattr(database, "DATABASE_NAME", str(tmp_path / "test.db"))
+    database.init_db()
+    yield database
+    database.close_connections()
+
+
+@pytest.fixture
+def fake_model():
+    """Answer every Gemini request with the local fake model, without client-side rate limiting"""
+    import ai_features
+    from fakes import FakeGeminiModel
+    from llm_client import LLMClient
+    
+    model = FakeGeminiModel(request_ms=0, per_token_ms=0)
+    ai_features.set_model(model)
+    ai_features.set_client(LLMClient(ai_features.get_model, requests_per_minute=1e9, burst=10**6,
+                                     backoff_base_seconds=0.001))
+    yield model
+    ai_features.set_model(None)
+    ai_features.set_client(None)
+
+
+@pytest.fixture
+def smtp_sink(monkeypatch):
+    """A local SMTP server that email_sender.py is pointed at"""
+    import email_sender
+    from smtp_sink import SMTPSink
+    
+    with SMTPSink() as sink:
+        for name, value in sink.environ().items():
+            monkeypatch.setenv(name, value)
+        email_sender.reset_smtp_client()
+        yield sink
+        email_sender.reset_smtp_client()
@@ -0,0 +1,150 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import ai_features
+from fakes import FakeAPIError
+from llm_client import (LLMCircuitOpenError, LLMError, LLMRateLimitError, LLMResponseError, LLMTimeoutError,
+                        LLMUnavailableError)
+
+TASKS = [(f"Task {i}", f"Description {i}", "2030-01-01", "High") for i in range(7)]
+
+
+class ReversedBatches:
+    """Answer batch prompts with the items in reverse order, as a model is free to"""
+    
+    def __init__(self, model):
+        self.model = model
+    
+    def generate_content(self, prompt, **kwargs):
+        response = self.model.generate_content(prompt, **kwargs)
+        if "Respond with only a JSON array" not in prompt:
+            return response
+        items = ai_features._parse_json_array(response.text)
+        return SimpleNamespace(text=json.dumps(items[::-1]))
+
+
+class RejectingSingle:
+    """Reject the single (non-batch) request for one task title"""
+    
+    def __init__(self, model, title):
+        self.model = model
+        self.title = title
+    
+    def generate_content(self, prompt, **kwargs):
+        if "Respond with only a JSON array" not in prompt and f"Task: {self.title}\n" in prompt:
+            raise FakeAPIError(400, "request blocked")
+        return self.model.generate_content(prompt, **kwargs)
+
+
+class FailingClient:
+    """LLMClient stand-in whose every request raises the same error"""
+    
+    def __init__(self, error):
+        self.error = error
+        self.requests = 0
+    
+    def generate(self, prompt):
+        self.requests += 1
+        raise self.error
+
+
+def fallbacks_counted():
+    return ai_features.BATCH_FALLBACKS.labels("generate_reminder_emails_batch").value
+
+
+def assert_mapped(outputs, tasks):
+    for output, (title, *_rest) in zip(outputs, tasks):
+        assert f'"{title}"' in output
+
+
+def test_batch_outputs_map_back_by_id(db, fake_model):
+    ai_features.set_model(ReversedBatches(fake_model))
+    
+    outputs, stats = ai_features.generate_reminder_emails_batch(TASKS)
+    
+    assert len(outputs) == len(TASKS)
+    assert_mapped(outputs, TASKS)
+    assert (stats.size, stats.cached, stats.fallbacks) == (len(TASKS), 0, 0)
+    assert fake_model.requests == 1
+
+
+def test_missing_items_fall_back_to_single_requests(db, fake_model):
+    fake_model.drop_every = 3
+    
+    outputs, stats = ai_features.generate_reminder_emails_batch(TASKS)
+    
+    assert_mapped(outputs, TASKS)
+    assert stats.fallbacks == len(TASKS) // 3
+    assert fake_model.requests == 1 + len(TASKS) // 3
+
+
+def test_invalid_batch_response_falls_back_for_every_item(db, fake_model):
+    fake_model.corrupt = True
+    counted = fallbacks_counted()
+    
+    outputs, stats = ai_features.generate_reminder_emails_batch(TASKS)
+    
+    assert_mapped(outputs, TASKS)
+    assert stats.fallbacks == len(TASKS)
+    assert fallbacks_counted() == counted + len(TASKS)
+
+
+def test_rejected_batch_falls_back_for_every_item(db, fake_model):
+    client = FailingClient(LLMResponseError("request blocked"))
+    ai_features.set_client(client)
+    
+    outputs, stats = ai_features.generate_reminder_emails_batch(TASKS)
+    
+    assert stats.fallbacks == len(TASKS)
+    assert client.requests == 1 + len(TASKS)
+    assert all(isinstance(output, LLMResponseError) for output in outputs)
+
+
+@pytest.mark.parametrize("error", [LLMRateLimitError("busy"), LLMTimeoutError("slow"),
+                                   LLMUnavailableError("down"), LLMCircuitOpenError("open")])
+def test_batch_failure_fails_every_item_without_single_requests(db, fake_model, error):
+    client = FailingClient(error)
+    ai_features.set_client(client)
+    counted = fallbacks_counted()
+    
+    outputs, stats = ai_features.generate_reminder_emails_batch(TASKS)
+    
+    assert outputs == [error] * len(TASKS)
+    assert stats.fallbacks == 0
+    assert client.requests == 1
+    assert fallbacks_counted() == counted
+
+
+def test_failed_item_holds_its_error_in_place(db, fake_model):
+    fake_model.drop_every = 3
+    # Task 2 is dropped from the batch response and its single request is rejected
+    ai_features.set_model(RejectingSingle(fake_model, "Task 2"))
+    
+    outputs, _stats = ai_features.generate_reminder_emails_batch(TASKS)
+    
+    assert isinstance(outputs[2], LLMError)
+    others = [(output, task) for index, (output, task) in enumerate(zip(outputs, TASKS)) if index != 2]
+    assert all(isinstance(output, str) for output, _task in others)
+    assert_mapped(*zip(*others))
+
+
+def test_cached_items_are_not_requested_again(db, fake_model):
+    ai_features.generate_reminder_emails_batch(TASKS[:4])
+    
+    outputs, stats = ai_features.generate_reminder_emails_batch(TASKS)
+    
+    assert_mapped(outputs, TASKS)
+    assert stats.cached == 4
+    assert fake_model.requests == 2
+
+
+@pytest.mark.parametrize("title", ["Task 0", "Task 6"])
+def test_breakdown_batches_map_back_by_id(db, fake_model, title):
+    ai_features.set_model(ReversedBatches(fake_model))
+    items = [(task[0], task[1]) for task in TASKS]
+    
+    outputs, _stats = ai_features.generate_task_breakdowns_batch(items)
+    
+    assert f'"{title}"' in outputs[int(title.split()[1])]
@@ -0,0 +1,35 @@
+from datetime import date
+
+
+def add_tasks(db, count):
+    for i in range(count):
+        db.add_task(f"Task {i}", "Analytics test", date.today().isoformat(), "High", "a@example.com")
+
+
+def aggregate_totals(db):
+    conn = db.get_connection()
+    return (conn.execute("SELECT SUM(task_count) FROM task_counts").fetchone()[0],
+            conn.execute("SELECT SUM(created) FROM weekly_task_counts").fetchone()[0])
+
+
+def test_aggregates_follow_writes(db):
+    add_tasks(db, 5)
+    db.update_task_status(1, "Completed")
+    db.delete_task(2)
+    
+    assert aggregate_totals(db) == (4, 4)
+    high = next(stats for stats in db.get_priority_stats() if stats.priority == "High")
+    assert (high.total, high.completed) == (4, 1)
+
+
+def test_analytics_migration_rerun_does_not_double_count(db):
+    add_tasks(db, 5)
+    conn = db.get_connection()
+    
+    # A second process that saw version 8 would apply version 9 again
+    for _ in range(2):
+        with conn:
+            conn.execute("PRAGMA user_version = 8")
+        db.init_db()
+        assert aggregate_totals(db) == (5, 5)
+    assert db.get_schema_version() == db.SCHEMA_VERSION
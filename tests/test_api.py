@@ -0,0 +1,44 @@
+import base64
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api_server import app
+
+
+@pytest.fixture
+def client(db):
+    for i in range(5):
+        db.add_task(f"Task {i}", "API test", f"2030-01-0{i + 1}", "Medium", "")
+    # Without the `with` block the lifespan (and the outbox worker) is not started
+    return TestClient(app)
+
+
+def encoded(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii")
+
+
+def test_cursor_pages_through_every_task(client):
+    first = client.get("/tasks", params={"page_size": 3}).json()
+    second = client.get("/tasks", params={"page_size": 3, "cursor": first["next_cursor"]}).json()
+    
+    titles = [task["title"] for task in first["tasks"] + second["tasks"]]
+    assert titles == [f"Task {i}" for i in range(5)]
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode("ascii"),
+    encoded([1, 2, 3]),
+    encoded("ab"),
+    encoded([[1], 2]),
+    encoded(["2030-01-01", "2"]),
+    encoded(["2030-01-01", True]),
+])
+def test_malformed_cursor_is_rejected(client, cursor):
+    response = client.get("/tasks", params={"cursor": cursor})
+    
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,124 @@
+import pytest
+
+from breakdown import critical_path, format_minutes, parse_breakdown, parse_estimate, topological_order
+from database import Subtask
+
+BREAKDOWN = """## Analysis
+A short launch plan.
+
+## Subtasks
+1. **Write the spec** - Estimated time: 2 hours (depends on: none)
+2. **Build the backend** - Estimated time: 1-2 days (depends on: 1)
+3. **Design the UI** - Estimated time: 3 hours (depends on: 1)
+4. **Build the UI** - Estimated time: 4 hours (depends on: 3)
+5. **Launch** - Estimated time: 30 min (depends on: 2, 4)
+
+## Tips
+1. Ship early
+2. Ask for feedback
+"""
+
+
+def positions(subtasks):
+    return [subtask.position for subtask in subtasks]
+
+
+def test_numbered_list_is_parsed():
+    subtasks = parse_breakdown(BREAKDOWN)
+    
+    assert [subtask.title for subtask in subtasks] == [
+        "Write the spec", "Build the backend", "Design the UI", "Build the UI", "Launch"]
+    assert [subtask.estimate_minutes for subtask in subtasks] == [120, 960, 180, 240, 30]
+    assert [subtask.depends_on for subtask in subtasks] == [(), (1,), (1,), (3,), (2, 4)]
+    assert not any(subtask.completed for subtask in subtasks)
+
+
+def test_bulleted_and_unbolded_items_are_parsed():
+    markdown = """- 1. Gather receipts - 45 minutes
+- 2) Fill in the form (depends on 1) - 1.5h
+- **3.** File the return, depends on step 2 and 1 - 20 min
+"""
+
+    subtasks = parse_breakdown(markdown)
+    
+    assert [(s.title, s.estimate_minutes, s.depends_on) for s in subtasks] == [
+        ("Gather receipts", 45, ()),
+        ("Fill in the form", 90, (1,)),
+        ("File the return", 20, (1, 2)),
+    ]
+
+
+def test_references_to_missing_steps_are_dropped():
+    markdown = """1. Draft (depends on: 7) - 1 hour
+2. Review (depends on: 1, 2, 9) - 30 min
+"""
+
+    assert [subtask.depends_on for subtask in parse_breakdown(markdown)] == [(), (1,)]
+
+
+def test_cycle_keeps_only_dependencies_on_earlier_steps():
+    markdown = """1. Plan (depends on: 3) - 1 hour
+2. Build (depends on: 1) - 2 hours
+3. Test (depends on: 2) - 1 hour
+"""
+
+    subtasks = parse_breakdown(markdown)
+    
+    assert [subtask.depends_on for subtask in subtasks] == [(), (1,), (2,)]
+    assert positions(topological_order(subtasks)) == [1, 2, 3]
+
+
+def test_topological_order_rejects_a_cycle():
+    subtasks = [Subtask(1, "A", 10, (2,), False), Subtask(2, "B", 10, (1,), False)]
+    
+    with pytest.raises(ValueError):
+        topological_order(subtasks)
+
+
+def test_topological_order_puts_lower_positions_first_among_ready_steps():
+    subtasks = [Subtask(1, "A", 10, (3,), False), Subtask(2, "B", 10, (), False), Subtask(3, "C", 10, (), False)]
+    
+    assert positions(topological_order(subtasks)) == [2, 3, 1]
+
+
+def test_critical_path_follows_the_longest_chain():
+    path, minutes = critical_path(parse_breakdown(BREAKDOWN))
+    
+    # 2 h spec + 16 h backend + 30 min launch beats the 2 + 3 + 4 h UI chain
+    assert positions(path) == [1, 2, 5]
+    assert minutes == 120 + 960 + 30
+
+
+def test_critical_path_counts_missing_estimates_as_zero():
+    subtasks = [Subtask(1, "A", None, (), False), Subtask(2, "B", 15, (1,), False)]
+    
+    assert critical_path(subtasks) == (subtasks, 15)
+    assert critical_path([]) == ([], 0)
+
+
+@pytest.mark.parametrize("text, minutes", [
+    ("about 3 hours", 180), ("2-3 days", 1440), ("1 week", 2400), ("no estimate given", None),
+])
+def test_parse_estimate(text, minutes):
+    assert parse_estimate(text) == minutes
+
+
+@pytest.mark.parametrize("minutes, text", [(90, "1h 30m"), (120, "2h"), (45, "45m"), (None, "no estimate")])
+def test_format_minutes(minutes, text):
+    assert format_minutes(minutes) == text
+
+
+def test_subtasks_round_trip_through_the_database(db):
+    task_id = db.add_task("Launch", "Ship it", "2030-01-01", "High", "")
+    subtasks = parse_breakdown(BREAKDOWN)
+    
+    db.save_subtasks(task_id, subtasks)
+    db.set_subtask_completed(task_id, 2, True)
+    
+    stored = db.get_subtasks(task_id)
+    assert stored == [subtask._replace(completed=subtask.position == 2) for subtask in subtasks]
+    
+    # Saving again replaces the previous breakdown
+    db.save_subtasks(task_id, subtasks[:2])
+    assert positions(db.get_subtasks(task_id)) == [1, 2]
+    assert db.get_subtasks(task_id + 1) == []
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+
+def test_connections_close_when_their_threads_exit(db):
+    db.count_tasks()
+    before = db.open_connection_count()
+    
+    def query():
+        db.count_tasks()
+    
+    for _ in range(200):
+        thread = threading.Thread(target=query)
+        thread.start()
+        thread.join()
+    
+    assert db.open_connection_count() <= before + 1
+
+
+def test_connection_is_reused_within_a_thread(db):
+    assert db.get_connection() is db.get_connection()
+
+
+def test_close_connections_reopens_on_next_use(db):
+    conn = db.get_connection()
+    db.close_connections()
+    assert db.get_connection() is not conn
+    assert db.open_connection_count() == 1
+
+
+def test_interrupted_search_index_migration_can_rerun(db):
+    ids = [db.add_task(f"Task {i}", "Search index", "2030-01-01", "High", "") for i in range(5)]
+    conn = db.get_connection()
+    # A process that died part-way through version 6 left some rows indexed twice
+    with conn:
+        conn.execute("""
+            INSERT INTO tasks_fts (rowid, title, description)
+            SELECT id, title, description FROM tasks WHERE id <= ?
+        """, (ids[2],))
+        conn.execute("PRAGMA user_version = 5")
+    
+    db.init_db()
+    
+    assert db.get_schema_version(conn) == db.SCHEMA_VERSION
+    conn.execute("INSERT INTO tasks_fts (tasks_fts, rank) VALUES ('integrity-check', 1)")
+    assert sorted(task.id for task, _snippet in db.search_tasks("Task")) == ids
+
+
+def rows(count, fail_after=None):
+    for i in range(count):
+        if i == fail_after:
+            raise ValueError("unreadable row")
+        yield (f"Imported {i}", "Bulk load", "2030-01-01", "Low", "", "Pending", None)
+
+
+def test_deferred_load_restores_indexes_and_triggers(db):
+    conn = db.get_connection()
+    schema = sorted(db._deferrable_schema(conn))
+    
+    assert db.bulk_insert_tasks(rows(25), batch_size=10, defer_indexes=True) == 25
+    
+    assert sorted(db._deferrable_schema(conn)) == schema
+    conn.execute("INSERT INTO tasks_fts (tasks_fts, rank) VALUES ('integrity-check', 1)")
+    assert len(db.search_tasks("Imported", limit=50)) == 25
+    assert conn.execute("SELECT SUM(task_count) FROM task_counts").fetchone()[0] == 25
+
+
+def test_interrupted_deferred_load_leaves_the_database_unchanged(db):
+    db.add_task("Existing", "Before the load", "2030-01-01", "High", "")
+    conn = db.get_connection()
+    schema = sorted(db._deferrable_schema(conn))
+    
+    with pytest.raises(ValueError):
+        db.bulk_insert_tasks(rows(25, fail_after=15), batch_size=10, defer_indexes=True)
+    
+    assert sorted(db._deferrable_schema(conn)) == schema
+    assert db.count_tasks() == 1
+    db.add_task("After", "Indexed by the restored triggers", "2030-01-01", "High", "")
+    conn.execute("INSERT INTO tasks_fts (tasks_fts, rank) VALUES ('integrity-check', 1)")
+    assert conn.execute("SELECT SUM(task_count) FROM task_counts").fetchone()[0] == 2
@@ -0,0 +1,117 @@
+import time
+
+import pytest
+
+from fakes import FakeAPIError, FakeGeminiModel, FlakyModel
+from llm_client import (LLMCircuitOpenError, LLMClient, LLMRateLimitError, LLMResponseError, LLMTimeoutError,
+                        LLMUnavailableError, TokenBucket)
+
+
+def make_client(model, **settings):
+    settings.setdefault("requests_per_minute", 1e9)
+    settings.setdefault("burst", 1_000_000)
+    settings.setdefault("backoff_base_seconds", 0.001)
+    settings.setdefault("failure_threshold", 10**6)
+    return LLMClient(lambda: model, **settings)
+
+
+@pytest.fixture
+def model():
+    return FakeGeminiModel(request_ms=0, per_token_ms=0)
+
+
+class FailingFirst:
+    """Raise the given errors on the first requests, then answer normally"""
+    
+    def __init__(self, model, *errors):
+        self.model = model
+        self.errors = list(errors)
+        self.requests = 0
+    
+    def generate_content(self, prompt, **kwargs):
+        self.requests += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.model.generate_content(prompt, **kwargs)
+
+
+def test_retryable_errors_are_retried_max_retries_times(model):
+    outage = FlakyModel(model)
+    outage.down = True
+    
+    with pytest.raises(LLMUnavailableError):
+        make_client(outage, max_retries=2).generate("Task: retry\n")
+    assert outage.requests == 3
+
+
+def test_retry_recovers_from_transient_errors(model):
+    flaky = FailingFirst(model, FakeAPIError(503, "overloaded"), FakeAPIError(429, "quota"))
+    
+    response = make_client(flaky, max_retries=3).generate("Task: recover\n")
+    assert "recover" in response.text
+    assert flaky.requests == 3
+
+
+def test_rejected_requests_are_not_retried(model):
+    rejected = FailingFirst(model, FakeAPIError(400, "invalid argument"))
+    
+    with pytest.raises(LLMResponseError):
+        make_client(rejected, max_retries=3).generate("Task: rejected\n")
+    assert rejected.requests == 1
+
+
+def test_circuit_opens_rejects_and_half_opens(model):
+    outage = FlakyModel(model)
+    outage.down = True
+    client = make_client(outage, max_retries=0, failure_threshold=3, reset_seconds=0.2)
+    
+    for _ in range(3):
+        with pytest.raises(LLMUnavailableError):
+            client.generate("Task: outage\n")
+    assert client.circuit.state == "open"
+    
+    # While open, calls fail fast without reaching the model
+    with pytest.raises(LLMCircuitOpenError):
+        client.generate("Task: outage\n")
+    assert outage.requests == 3
+    
+    time.sleep(0.25)
+    assert client.circuit.state == "half-open"
+    # A failed trial request re-opens the circuit at once
+    with pytest.raises(LLMUnavailableError):
+        client.generate("Task: trial\n")
+    assert client.circuit.state == "open"
+    
+    time.sleep(0.25)
+    outage.down = False
+    client.generate("Task: trial\n")
+    assert client.circuit.state == "closed"
+
+
+def test_slow_call_raises_timeout(model):
+    hanging = FlakyModel(model, hang_rate=1.0, hang_seconds=0.5)
+    client = make_client(hanging, max_retries=0, timeout_seconds=0.05)
+    
+    start = time.monotonic()
+    with pytest.raises(LLMTimeoutError):
+        client.generate("Task: slow\n")
+    assert time.monotonic() - start < 0.4
+
+
+def test_token_bucket_throttles_after_burst():
+    bucket = TokenBucket(rate_per_second=20, capacity=2)
+    assert bucket.acquire(0) and bucket.acquire(0)
+    
+    # The next token is 50 ms away
+    assert not bucket.acquire(0.01)
+    start = time.monotonic()
+    assert bucket.acquire(1)
+    assert 0.02 < time.monotonic() - start < 0.2
+
+
+def test_client_rate_limit_rejects_callers_past_the_budget(model):
+    client = make_client(model, requests_per_minute=60, burst=1, timeout_seconds=0.05, max_retries=0)
+    
+    client.generate("Task: first\n")
+    with pytest.raises(LLMRateLimitError):
+        client.generate("Task: second\n")
@@ -0,0 +1,87 @@
+import socket
+from datetime import date, timedelta
+
+import pytest
+
+import ai_features
+import email_sender
+from ai_features import DEFAULT_BATCH_SIZE
+from llm_client import LLMResponseError
+from reminder_dispatcher import dispatch_reminders
+
+DUE_TASKS = 23
+
+
+@pytest.fixture
+def due_tasks(db):
+    """DUE_TASKS pending tasks due within 3 days, plus tasks that must not be reminded"""
+    soon = (date.today() + timedelta(days=1)).isoformat()
+    later = (date.today() + timedelta(days=10)).isoformat()
+    for i in range(DUE_TASKS):
+        db.add_task(f"Due task {i}", f"Description {i}", soon, "High", f"due{i}@example.com")
+    db.add_task("Later task", "Not due yet", later, "Low", "later@example.com")
+    done = db.add_task("Done task", "Already completed", soon, "Low", "done@example.com")
+    db.update_task_status(done, "Completed")
+    return db.get_upcoming_tasks(3)
+
+
+def recording(generate_batch, chunks):
+    def generate(items):
+        chunks.append(len(items))
+        return generate_batch(items)
+    return generate
+
+
+def test_every_due_task_gets_exactly_one_email(due_tasks, fake_model, smtp_sink):
+    chunks = []
+    
+    results = dispatch_reminders(due_tasks, generate_batch=recording(ai_features.generate_reminder_emails_batch,
+                                                                     chunks))
+    
+    assert len(due_tasks) == DUE_TASKS
+    assert all(result.sent for result in results)
+    assert sorted(smtp_sink.recipients) == sorted(f"due{i}@example.com" for i in range(DUE_TASKS))
+    # Bodies are generated DEFAULT_BATCH_SIZE tasks per model request
+    assert sorted(chunks) == sorted([DEFAULT_BATCH_SIZE] * (DUE_TASKS // DEFAULT_BATCH_SIZE)
+                                    + [DUE_TASKS % DEFAULT_BATCH_SIZE])
+    assert fake_model.requests == len(chunks)
+
+
+def test_dropped_smtp_sessions_are_reconnected_without_duplicates(due_tasks, fake_model, smtp_sink):
+    smtp_sink.drop_after = 2
+    
+    results = dispatch_reminders(due_tasks)
+    
+    assert all(result.sent for result in results)
+    assert sorted(smtp_sink.recipients) == sorted(f"due{i}@example.com" for i in range(DUE_TASKS))
+
+
+def test_unreachable_smtp_server_marks_reminders_unsent(due_tasks, fake_model, smtp_sink, monkeypatch):
+    # A port nothing listens on
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    monkeypatch.setenv("SMTP_PORT", str(port))
+    email_sender.reset_smtp_client()
+    
+    results = dispatch_reminders(due_tasks)
+    
+    assert len(results) == DUE_TASKS
+    assert not any(result.sent for result in results)
+    assert {result.error for result in results} == {"SMTP delivery failed"}
+    assert smtp_sink.recipients == []
+
+
+def test_failed_generation_skips_only_that_task(due_tasks, smtp_sink):
+    failing_id, failing_title = due_tasks[4][:2]
+    
+    def generate_batch(items):
+        outputs = [LLMResponseError("blocked") if title == failing_title else f"Body for {title}"
+                   for title, _description, _deadline, _priority in items]
+        return outputs, None
+    
+    results = dispatch_reminders(due_tasks, generate_batch=generate_batch)
+    
+    failed = [result for result in results if not result.sent]
+    assert [(result.task_id, result.error) for result in failed] == [(failing_id, "blocked")]
+    assert len(smtp_sink.recipients) == DUE_TASKS - 1
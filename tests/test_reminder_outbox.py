@@ -0,0 +1,141 @@
+import time
+
+import pytest
+
+import reminder_outbox
+from llm_client import LLMUnavailableError
+from database import claim_outbox_batch
+from reminder_outbox import OUTBOX_LEASE_SECONDS, drain_once, enqueue_task_reminder
+
+
+class Generator:
+    """generate_batch stand-in that fails the first `failures` calls and can drop outputs"""
+    
+    def __init__(self, failures=0, drop_last=False):
+        self.failures = failures
+        self.drop_last = drop_last
+        self.batches = []
+    
+    def __call__(self, items):
+        self.batches.append([item[0] for item in items])
+        if self.failures:
+            self.failures -= 1
+            raise LLMUnavailableError("model overloaded")
+        outputs = [f"Reminder for {title}" for title, *_rest in items]
+        return (outputs[:-1] if self.drop_last else outputs), None
+
+
+class Outbox:
+    """Records sent emails"""
+    
+    def __init__(self):
+        self.sent = []
+    
+    def __call__(self, recipient, title, body):
+        self.sent.append((recipient, title, body))
+        return True
+
+
+@pytest.fixture
+def tasks(db):
+    ids = [db.add_task(f"Task {i}", "Outbox test", "2030-01-01", "High", f"user{i}@example.com") for i in range(3)]
+    return [db.get_task_by_id(task_id) for task_id in ids]
+
+
+def test_duplicate_enqueue_sends_once(db, tasks):
+    first = enqueue_task_reminder(tasks[0])
+    second = enqueue_task_reminder(tasks[0])
+    outbox = Outbox()
+    
+    assert first[1] and not second[1]
+    assert first[0] == second[0]
+    results = drain_once(generate_batch=Generator(), send=outbox)
+    assert [result.sent for result in results] == [True]
+    assert outbox.sent == [("user0@example.com", "Task 0", "Reminder for Task 0")]
+    assert drain_once(generate_batch=Generator(), send=outbox) == []
+
+
+def test_failed_generation_is_retried_with_backoff(db, tasks, monkeypatch):
+    monkeypatch.setattr(reminder_outbox, "OUTBOX_RETRY_SECONDS", 60)
+    entry_id, _ = enqueue_task_reminder(tasks[0])
+    generate, outbox = Generator(failures=1), Outbox()
+    now = time.time()
+    
+    result, = drain_once(generate_batch=generate, send=outbox, now=now)
+    assert not result.sent and "model overloaded" in result.error
+    assert db.get_outbox_entry_status(entry_id) == ("pending", 1, result.error)
+    
+    # Not due again before the backoff (at least half of OUTBOX_RETRY_SECONDS) has passed
+    assert drain_once(generate_batch=generate, send=outbox, now=now + 29) == []
+    result, = drain_once(generate_batch=generate, send=outbox, now=now + 61)
+    assert result.sent
+    assert db.get_outbox_entry_status(entry_id) == ("sent", 2, None)
+
+
+def test_failed_send_keeps_the_generated_body(db, tasks):
+    enqueue_task_reminder(tasks[0])
+    generate = Generator()
+    now = time.time()
+    
+    result, = drain_once(generate_batch=generate, send=lambda *args: False, now=now)
+    assert result.error == "SMTP delivery failed"
+    outbox = Outbox()
+    drain_once(generate_batch=generate, send=outbox, now=now + reminder_outbox.OUTBOX_MAX_RETRY_SECONDS)
+    # The retry resends the stored body instead of generating another
+    assert len(generate.batches) == 1
+    assert outbox.sent == [("user0@example.com", "Task 0", "Reminder for Task 0")]
+
+
+def test_deleted_task_fails_without_retry(db, tasks):
+    entry_id, _ = enqueue_task_reminder(tasks[0])
+    enqueue_task_reminder(tasks[1])
+    db.delete_task(tasks[0].id)
+    outbox = Outbox()
+    
+    results = drain_once(generate_batch=Generator(), send=outbox)
+    
+    assert {result.task_id: result.sent for result in results} == {tasks[0].id: False, tasks[1].id: True}
+    assert db.get_outbox_entry_status(entry_id)[0] == "failed"
+    assert outbox.sent == [("user1@example.com", "Task 1", "Reminder for Task 1")]
+
+
+def test_short_batch_fails_only_the_missing_entries(db, tasks):
+    entry_ids = [enqueue_task_reminder(task)[0] for task in tasks]
+    outbox = Outbox()
+    now = time.time()
+    
+    results = drain_once(generate_batch=Generator(drop_last=True), send=outbox, now=now)
+    
+    assert [result.sent for result in results] == [True, True, False]
+    assert "missing output" in results[2].error
+    # The entry is scheduled for a retry rather than left leased or failed
+    status, attempts, _error = db.get_outbox_entry_status(entry_ids[2])
+    assert (status, attempts) == ("pending", 1)
+    retry_at = now + reminder_outbox.OUTBOX_RETRY_SECONDS
+    assert retry_at < now + OUTBOX_LEASE_SECONDS
+    assert db.count_outbox(retry_at)["due"] == 1
+    result, = drain_once(generate_batch=Generator(), send=outbox, now=retry_at)
+    assert result.sent and result.entry_id == entry_ids[2]
+
+
+def test_entries_reclaimed_during_generation_are_not_sent_twice(db, tasks):
+    entry_id, _ = enqueue_task_reminder(tasks[0])
+    now = time.time()
+    generate = Generator()
+    reclaimed = []
+    
+    def slow_generate(items):
+        # Generation outlasts the lease and a second worker claims the entry meanwhile
+        reclaimed.extend(claim_outbox_batch(10, OUTBOX_LEASE_SECONDS, now + OUTBOX_LEASE_SECONDS))
+        return generate(items)
+    
+    outbox = Outbox()
+    assert drain_once(generate_batch=slow_generate, send=outbox, now=now) == []
+    assert outbox.sent == []
+    assert [entry.id for entry in reclaimed] == [entry_id]
+    # The entry stays leased to the second worker, with the body already stored
+    assert db.get_outbox_entry_status(entry_id) == ("pending", 2, None)
+    assert db.count_outbox(now + OUTBOX_LEASE_SECONDS)["waiting"] == 1
+    result, = drain_once(generate_batch=generate, send=outbox, now=now + 2 * OUTBOX_LEASE_SECONDS)
+    assert result.sent
+    assert len(generate.batches) == 1
@@ -0,0 +1,54 @@
+import io
+
+import pytest
+
+from task_io import export_tasks_bytes, import_tasks, validate_row
+
+ROW = {"title": "Imported", "description": "From a file", "deadline": "2030-01-01", "priority": "high",
+       "email": "a@example.com"}
+
+
+@pytest.mark.parametrize("created_at, stored", [
+    ("", None),
+    ("2026-03-04 05:06:07", "2026-03-04 05:06:07"),
+    ("2026-03-04T05:06:07.891", "2026-03-04 05:06:07"),
+    ("2026-03-04", "2026-03-04 00:00:00"),
+    ("2026-03-04T07:06:07+02:00", "2026-03-04 05:06:07"),
+])
+def test_created_at_is_normalized(created_at, stored):
+    assert validate_row(dict(ROW, created_at=created_at))[-1] == stored
+
+
+@pytest.mark.parametrize("created_at", ["yesterday", "2026-13-01 00:00:00", "04/03/2026"])
+def test_malformed_created_at_is_rejected(created_at):
+    with pytest.raises(ValueError, match="created_at"):
+        validate_row(dict(ROW, created_at=created_at))
+
+
+def test_import_reports_bad_created_at_and_keeps_date_added_order(db):
+    lines = [
+        '{"title": "Old", "deadline": "2030-01-01", "priority": "Low", "email": "a@example.com", '
+        '"created_at": "2025-01-01T09:00:00"}',
+        '{"title": "Broken", "deadline": "2030-01-01", "priority": "Low", "email": "a@example.com", '
+        '"created_at": "last tuesday"}',
+        '{"title": "New", "deadline": "2030-01-01", "priority": "Low", "email": "a@example.com", '
+        '"created_at": "2025-06-01"}',
+    ]
+    
+    report = import_tasks(io.StringIO("\n".join(lines)), "jsonl")
+    
+    assert (report.imported, report.rejected) == (2, 1)
+    assert report.errors[0].startswith("line 2: created_at")
+    tasks, _cursor = db.get_tasks_page(sort_by="Date Added")
+    assert [(task.title, task.created_at) for task in tasks] == [("New", "2025-06-01 00:00:00"),
+                                                                 ("Old", "2025-01-01 09:00:00")]
+
+
+def test_export_round_trips(db):
+    import_tasks(io.StringIO("title,deadline,priority,email,created_at\nA,2030-01-01,Low,a@example.com,"
+                             "2025-01-01 09:00:00\n"), "csv")
+    exported = export_tasks_bytes("csv").decode("utf-8")
+    
+    report = import_tasks(io.StringIO(exported), "csv")
+    
+    assert (report.imported, report.rejected) == (1, 0)
@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def mixed(db):
+    """A pending and a completed task in each urgency bucket"""
+    today = date.today()
+    deadlines = {"Overdue": today - timedelta(days=2), "Due today": today, "Due soon": today + timedelta(days=2)}
+    ids = {}
+    for urgency, deadline in deadlines.items():
+        pending = db.add_task(f"{urgency} pending", "", deadline.isoformat(), "High", "a@example.com")
+        done = db.add_task(f"{urgency} done", "", deadline.isoformat(), "High", "a@example.com")
+        db.update_task_status(done, "Completed")
+        ids[urgency] = pending
+    return ids
+
+
+@pytest.mark.parametrize("urgency", ["Overdue", "Due today", "Due soon"])
+@pytest.mark.parametrize("status", ["All", "Pending"])
+def test_urgency_filters_only_match_pending_tasks(db, mixed, urgency, status):
+    tasks, _cursor = db.get_tasks_page(status, urgency=urgency)
+    
+    assert [task.id for task in tasks] == [mixed[urgency]]
+    assert db.count_tasks(status, urgency) == 1
+    assert db.get_task_ids(status, urgency) == [mixed[urgency]]
+    assert [task.id for task, _snippet in db.search_tasks(urgency.split()[0], status, urgency=urgency)] \
+        == [mixed[urgency]]
+
+
+def test_completed_filter_with_urgency_is_empty(db, mixed):
+    assert db.count_tasks("Completed", "Overdue") == 0
+    assert db.get_tasks_page("Completed", urgency="Overdue")[0] == []